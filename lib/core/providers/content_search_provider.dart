@@ -37,20 +37,22 @@ class ExtractedContent {
   });
 
   factory ExtractedContent.fromJson(Map<String, dynamic> json) {
+    final fullTextByPage = Map<int, String>.from(
+      (json['full_text_by_page'] as Map?)?.map(
+            (k, v) => MapEntry(int.parse(k.toString()), v.toString()),
+      ) ??
+          {},
+    );
+    final spansMode = json['content_spans_mode'] as String?;
     return ExtractedContent(
       fileName: json['file_name'] ?? '',
       totalPages: json['total_pages'] ?? 0,
       sections:
       (json['sections'] as List?)
-          ?.map((s) => ContentSection.fromJson(s))
+          ?.map((s) => ContentSection.fromJson(s, fullTextByPage, spansMode))
           .toList() ??
           [],
-      fullTextByPage: Map<int, String>.from(
-        (json['full_text_by_page'] as Map?)?.map(
-              (k, v) => MapEntry(int.parse(k.toString()), v.toString()),
-        ) ??
-            {},
-      ),
+      fullTextByPage: fullTextByPage,
       headings:
       (json['headings'] as List?)
           ?.map((h) => ContentHeading.fromJson(h))
@@ -77,16 +79,54 @@ class ContentSection {
     required this.keywords,
   });
 
-  factory ContentSection.fromJson(Map<String, dynamic> json) {
+  factory ContentSection.fromJson(
+    Map<String, dynamic> json, [
+    Map<int, String> fullTextByPage = const {},
+    String? spansMode,
+  ]) {
     return ContentSection(
       heading: json['heading'] ?? '',
       level: json['level'] ?? 1,
       pageStart: json['page_start'] ?? 1,
       pageEnd: json['page_end'] ?? 1,
-      content: json['content'] ?? '',
+      content: json['content_spans'] != null
+          ? _resolveSpans(json, fullTextByPage, spansMode)
+          : json['content'] ?? '',
       keywords: List<String>.from(json['keywords'] ?? []),
     );
   }
+
+  // Sections extracted with --content-spans reference the page text as
+  // [page, start, end] instead of carrying a copy of it. Offsets count
+  // Unicode code points (Python string indices), not UTF-16 code units.
+  static String _resolveSpans(
+    Map<String, dynamic> json,
+    Map<int, String> fullTextByPage,
+    String? spansMode,
+  ) {
+    final buffer = StringBuffer();
+    final runesByPage = <int, List<int>>{};
+    for (final span in json['content_spans'] as List) {
+      final page = span[0] as int;
+      final runes = runesByPage.putIfAbsent(
+        page,
+        () => (fullTextByPage[page] ?? '').runes.toList(),
+      );
+      final start = (span[1] as int).clamp(0, runes.length);
+      final end = (span[2] as int).clamp(start, runes.length);
+      final chunk = String.fromCharCodes(runes, start, end);
+      if (spansMode == 'raw') {
+        buffer.write(chunk);
+        continue;
+      }
+      for (final line in chunk.split('\n')) {
+        final trimmed = line.trim();
+        if (trimmed.isNotEmpty) buffer.write('$trimmed ');
+      }
+    }
+    buffer.write(json['content_suffix'] ?? '');
+    return buffer.toString();
+  }
 }
 
 class ContentHeading {
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Content Format Benchmark
+Size and decode time of each content encoding for the extracted standards
+Run: python bench_content_format.py [--content-dir assets/extracted_content]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import content_format
+
+def timed(func, repeat):
+    """Best-of-N wall time of func()"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+# (label, format, indent) for every encoding compared
+CANDIDATES = [
+    ("json (indent=2)", "json", 2),
+    ("json (--compact)", "json", None),
+    ("json.gz", "json.gz", None),
+    ("msgpack", "msgpack", None),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content encodings")
+    parser.add_argument("--content-dir", default="assets/extracted_content")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content_files = content_format.find_content_files(Path(args.content_dir))
+    if not content_files:
+        print(f"Error: No content files found in {args.content_dir}. Run the extractor first.")
+        return
+
+    msgpack_impl = "msgpack package" if content_format.msgpack is not None else "pure-Python fallback"
+    print(f"📊 Content formats ({msgpack_impl} for msgpack, best of {args.repeat})")
+    print("=" * 72)
+    print(f"{'file':<24} {'format':<18} {'size':>10} {'ratio':>7} {'encode':>10} {'decode':>10}")
+
+    totals = {}
+    for file_path in content_files:
+        content = content_format.load(file_path)
+        base_size = None
+        for label, fmt, indent in CANDIDATES:
+            encode_time, data = timed(lambda: content_format.encode(content, fmt, indent), args.repeat)
+            decode_time, decoded = timed(lambda: content_format.decode(data), args.repeat)
+            assert decoded == content, f"{label} does not round-trip {file_path.name}"
+            base_size = base_size or len(data)
+            total = totals.setdefault(label, [0, 0.0, 0.0])
+            total[0] += len(data)
+            total[1] += encode_time
+            total[2] += decode_time
+            print(f"{file_path.name:<24} {label:<18} {len(data) / 1024:8.0f} KB {len(data) / base_size:6.0%} "
+                  f"{encode_time * 1000:7.1f} ms {decode_time * 1000:7.1f} ms")
+
+    print("-" * 72)
+    base_size = None
+    for label, (size, encode_time, decode_time) in totals.items():
+        base_size = base_size or size
+        print(f"{'total':<24} {label:<18} {size / 1024:8.0f} KB {size / base_size:6.0%} "
+              f"{encode_time * 1000:7.1f} ms {decode_time * 1000:7.1f} ms")
+    print("✓ Every format decodes to the same content")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+LLM Generation Benchmark
+Wall time of answering N comparison prompts with the offline stub backend at
+several concurrency limits
+Run: python bench_llm_generation.py [--topics 50] [--latency 0.2]
+"""
+
+import argparse
+import math
+
+from llm_generation import GenerationStats, StubBackend, run_prompts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent generation")
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per request")
+    parser.add_argument("--fail-every", type=int, default=0, help="Make every n-th stub call fail once")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests per second (0 = unlimited)")
+    args = parser.parse_args()
+
+    prompts = [f"COMPARISON\nTopic: Topic {i}\nStandard: a\nStandard: b" for i in range(args.topics)]
+    print(f"📊 {args.topics} prompts, {args.latency * 1000:.0f} ms per request"
+          f"{f', {args.rate:g} req/s' if args.rate else ''}")
+    print("=" * 64)
+    print(f"{'concurrency':>11} {'elapsed':>10} {'batches x latency':>18} {'requests':>9} {'retries':>8}")
+
+    baseline = None
+    for concurrency in (1, 4, 10, 25, 50):
+        backend = StubBackend(latency=args.latency, fail_every=args.fail_every)
+        stats = GenerationStats()
+        results = run_prompts(backend, prompts, concurrency=concurrency, rate=args.rate or None,
+                              base_delay=0.05, stats=stats)
+        assert not any(isinstance(result, Exception) for result in results), "generation failed"
+        bound = math.ceil(args.topics / concurrency) * args.latency
+        baseline = baseline or stats.elapsed
+        print(f"{concurrency:>11} {stats.elapsed:9.2f}s {bound:17.2f}s {stats.requests:>9} {stats.retries:>8}"
+              f"   {baseline / stats.elapsed:5.1f}x")
+
+if __name__ == "__main__":
+    main()
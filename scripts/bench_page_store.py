@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Page Store Benchmark
+Open time and page/preview read latency of the memory-mapped page store
+against loading the *_content.json files, on a synthetic corpus
+Run: python bench_page_store.py [--pages 10000] [--documents 4] [--reads 2000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import content_format
+from content_writer import dump_content
+from page_store import PageStore, write_page_store
+
+WORDS = ("project risk stakeholder governance quality schedule benefit tailoring change control "
+         "lifecycle delivery value principle performance domain plan register issue tolerance").split()
+
+def synthetic_corpus(directory: Path, pages: int, documents: int, words_per_page: int, seed: int = 7):
+    """Write `documents` content files sharing `pages` pages, one section per page"""
+    rng = random.Random(seed)
+    for doc_id in range(documents):
+        count = pages // documents + (1 if doc_id < pages % documents else 0)
+        texts = {page: " ".join(rng.choice(WORDS) for _ in range(words_per_page)) + " — §"
+                 for page in range(1, count + 1)}
+        content = {
+            "file_name": f"synthetic_{doc_id + 1}.pdf",
+            "total_pages": count,
+            "sections": [{"heading": f"{page}. Section", "level": 1, "page_start": page, "page_end": page,
+                          "content": text, "keywords": []} for page, text in texts.items()],
+            "full_text_by_page": {str(page): text for page, text in texts.items()},
+            "headings": [{"text": f"{page}. Section", "page": page, "level": 1} for page in texts]
+        }
+        dump_content(content, directory / f"synthetic_{doc_id + 1}_content.json")
+
+def timed(function, repeat: int = 5) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-mapped page store")
+    parser.add_argument("--pages", type=int, default=10000, help="Total pages in the corpus")
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--words", type=int, default=400, help="Words per page")
+    parser.add_argument("--reads", type=int, default=2000, help="Random pages and previews read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        synthetic_corpus(directory, args.pages, args.documents, args.words)
+        content_files = content_format.find_content_files(directory)
+        json_bytes = sum(path.stat().st_size for path in content_files)
+
+        started = time.perf_counter()
+        stats = write_page_store(content_files, directory)
+        build = time.perf_counter() - started
+
+        load_json = timed(lambda: [content_format.load(path) for path in content_files], repeat=1)
+        open_store = timed(lambda: PageStore(directory).close(), repeat=20)
+
+        with PageStore(directory) as store:
+            rng = random.Random(1)
+            targets = []
+            for _ in range(args.reads):
+                standard = rng.choice(store.standards())
+                document = store.documents[store.standards().index(standard)]
+                targets.append((standard, rng.randint(1, document["pages"])))
+            page_reads = timed(lambda: [store.page(standard, page) for standard, page in targets])
+            previews = timed(lambda: [store.preview(standard, page - 1) for standard, page in targets])
+
+    print(f"📊 Page store: {args.pages:,} pages in {args.documents} documents, {args.words} words/page")
+    print("=" * 60)
+    print(f"{'JSON content files':<28} {json_bytes / 1024 / 1024:>9.1f} MiB")
+    print(f"{'page store text':<28} {stats['bytes'] / 1024 / 1024:>9.1f} MiB  ({stats['records']:,} records)")
+    print(f"{'build store':<28} {build * 1000:>9.1f} ms")
+    print(f"{'load every JSON file':<28} {load_json * 1000:>9.1f} ms")
+    print(f"{'open store':<28} {open_store * 1000:>9.3f} ms")
+    print(f"{'read one page':<28} {page_reads / args.reads * 1e6:>9.1f} µs")
+    print(f"{'read one 200-char preview':<28} {previews / args.reads * 1e6:>9.1f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Section Builder Micro-benchmark
+Compares dict sections with string += against SectionRecord buffering
+Run: python bench_section_builder.py [--pages 1000] [--section-pages 50]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from section_builder import HeadingRecord, SectionRecord
+
+LINE = "Project governance defines the structure, roles and decision rights for delivery"
+
+def synthetic_pages(pages: int, lines_per_page: int, section_pages: int):
+    """Yield (page_num, lines, is_heading_flags) for a document with long sections"""
+    for page_num in range(1, pages + 1):
+        lines = []
+        flags = []
+        for line_num in range(lines_per_page):
+            starts_section = line_num == 0 and (page_num - 1) % section_pages == 0
+            lines.append(f"{page_num}.1 Heading {page_num}" if starts_section else f"{LINE} {line_num}")
+            flags.append(starts_section)
+        yield page_num, lines, flags
+
+def build_with_dicts(pages):
+    """The original loop: one dict per section, content grown with +="""
+    sections = []
+    headings = []
+    current_section = None
+    for page_num, lines, flags in pages:
+        for line, is_heading in zip(lines, flags):
+            if is_heading:
+                if current_section:
+                    sections.append(current_section)
+                current_section = {
+                    "heading": line,
+                    "level": 1,
+                    "page_start": page_num,
+                    "page_end": page_num,
+                    "content": "",
+                    "keywords": []
+                }
+                headings.append({"text": line, "page": page_num, "level": 1})
+            elif current_section:
+                current_section["content"] += line + " "
+                current_section["page_end"] = page_num
+    if current_section:
+        sections.append(current_section)
+    return sections, headings
+
+def build_with_records(pages):
+    """SectionRecord/HeadingRecord with buffered lines joined at close"""
+    sections = []
+    headings = []
+    current_section = None
+    for page_num, lines, flags in pages:
+        for line, is_heading in zip(lines, flags):
+            if is_heading:
+                if current_section:
+                    current_section.finish()
+                    sections.append(current_section)
+                current_section = SectionRecord(line, 1, page_num)
+                headings.append(HeadingRecord(line, page_num, 1))
+            elif current_section:
+                current_section.add_line(line, page_num, 0, len(line))
+    if current_section:
+        current_section.finish()
+        sections.append(current_section)
+    return sections, headings
+
+def measure(builder, args):
+    """Return (seconds, peak traced bytes, retained traced bytes, result)"""
+    pages = list(synthetic_pages(args.pages, args.lines_per_page, args.section_pages))
+    started = time.perf_counter()
+    builder(pages)
+    elapsed = time.perf_counter() - started
+
+    # Memory is traced in a separate run so tracing overhead does not skew timing
+    tracemalloc.start()
+    result = builder(pages)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, retained, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark section accumulation strategies")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--lines-per-page", type=int, default=45)
+    parser.add_argument("--section-pages", type=int, default=50,
+                        help="Pages per section (longer sections make += slower)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"📊 Section builder: {args.pages} pages, {args.lines_per_page} lines/page, "
+          f"{args.section_pages} pages/section")
+    print("=" * 60)
+
+    results = {}
+    for name, builder in (("dict + str +=", build_with_dicts), ("SectionRecord", build_with_records)):
+        runs = [measure(builder, args) for _ in range(args.repeat)]
+        elapsed = min(run[0] for run in runs)
+        peak = min(run[1] for run in runs)
+        retained = min(run[2] for run in runs)
+        results[name] = (elapsed, peak, retained, runs[0][3])
+        scale = 1000 / args.pages
+        print(f"{name:<16} {elapsed * scale * 1000:8.1f} ms   "
+              f"peak {peak * scale / 1024 / 1024:6.2f} MiB   "
+              f"retained {retained * scale / 1024 / 1024:6.2f} MiB   (per 1000 pages)")
+
+    old_sections = [s["content"] for s in results["dict + str +="][3][0]]
+    new_sections = [s.content for s in results["SectionRecord"][3][0]]
+    assert old_sections == new_sections, "section text differs"
+
+    old_time, old_peak, old_retained, _ = results["dict + str +="]
+    new_time, new_peak, new_retained, _ = results["SectionRecord"]
+    scale = 1000 / args.pages / 1024 / 1024
+    print("-" * 60)
+    print(f"Speed-up: {old_time / new_time:.1f}x   "
+          f"peak saved: {(old_peak - new_peak) * scale:.2f} MiB   "
+          f"retained saved: {(old_retained - new_retained) * scale:.2f} MiB   (per 1000 pages)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Section Similarity Benchmark
+Throughput and peak memory of the chunked cross-standard cosine similarity
+against corpus size, on synthetic standards with a Zipf vocabulary
+Run: python bench_section_similarity.py [--sizes 1000,2000,4000,8000] [--engine both]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from section_similarity import compute_similarity, sparse
+
+STANDARDS = 3
+
+def word(term_id: int) -> str:
+    """Distinct 5+ letter word per id (the tokenizer keeps 4+ letter words)"""
+    letters = ""
+    while True:
+        term_id, digit = divmod(term_id, 26)
+        letters = chr(ord('a') + digit) + letters
+        if term_id == 0:
+            break
+    return "q" + letters.rjust(4, 'a')
+
+def synthetic_corpus(sections: int, words: int, vocab: int, seed: int = 7):
+    """STANDARDS content dicts sharing `sections` sections drawn from one Zipf vocabulary"""
+    rng = np.random.default_rng(seed)
+    vocabulary = [word(i) for i in range(vocab)]
+    all_content = []
+    for std_id in range(STANDARDS):
+        count = sections // STANDARDS + (1 if std_id < sections % STANDARDS else 0)
+        ids = (rng.zipf(1.3, size=(count, words)) - 1) % vocab
+        all_content.append({
+            "file_name": f"synthetic_{std_id + 1}.pdf",
+            "sections": [
+                {"heading": f"{std_id + 1}.{i + 1} Section", "page_start": 1,
+                 "content": " ".join(vocabulary[term] for term in row)}
+                for i, row in enumerate(ids.tolist())
+            ]
+        })
+    return all_content
+
+def measure(all_content, args, engine: str):
+    """(best seconds, peak traced bytes) of compute_similarity"""
+    best = None
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        compute_similarity(all_content, args.top_k, engine=engine, chunk_bytes=int(args.chunk_mb * 1024 * 1024))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Memory is traced in a separate run so tracing overhead does not skew timing
+    tracemalloc.start()
+    compute_similarity(all_content, args.top_k, engine=engine, chunk_bytes=int(args.chunk_mb * 1024 * 1024))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked section similarity")
+    parser.add_argument("--sizes", default="1000,2000,4000,8000", help="Comma-separated total section counts")
+    parser.add_argument("--words", type=int, default=150, help="Words per section")
+    parser.add_argument("--vocab", type=int, default=20000, help="Vocabulary size")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-mb", type=float, default=64)
+    parser.add_argument("--engine", choices=["auto", "scipy", "numpy", "both"], default="auto")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.engine == "both":
+        engines = ["scipy", "numpy"] if sparse is not None else ["numpy"]
+    else:
+        engines = [args.engine]
+
+    print(f"📊 Section similarity: {STANDARDS} standards, {args.words} words/section, "
+          f"{args.vocab} word vocabulary, top {args.top_k}, {args.chunk_mb:g} MB chunks")
+    print("=" * 78)
+    print(f"{'engine':<7} {'sections':>9} {'cells':>13} {'seconds':>9} {'sections/s':>11} "
+          f"{'Mcells/s':>9} {'peak MiB':>9}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        all_content = synthetic_corpus(size, args.words, args.vocab)
+        counts = [len(content["sections"]) for content in all_content]
+        # Every section is scored against every section of the other standards
+        cells = sum(count * (size - count) for count in counts)
+        for engine in engines:
+            elapsed, peak = measure(all_content, args, engine)
+            print(f"{engine:<7} {size:>9,} {cells:>13,} {elapsed:>9.2f} {size / elapsed:>11,.0f} "
+                  f"{cells / elapsed / 1e6:>9.1f} {peak / 1024 / 1024:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Throughput and memory of the extractors and the comparison stage over the
+bundled standards and generated PDFs, with a JSON baseline for regressions
+
+Run:      python benchmark_suite.py --save bench_baseline.json
+Compare:  python benchmark_suite.py --compare bench_baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SUITE_VERSION = 1
+
+BENCHMARKS = ["pdf_content_extractor", "simple_extractor", "simple_comparison"]
+
+# (name, pages, lines per page) of the generated documents
+SYNTHETIC_DOCUMENTS = [
+    ("synthetic_small", 20, 40),
+    ("synthetic_large", 300, 45),
+]
+
+BODY_LINES = [
+    "The project manager shall ensure that the risk register is maintained and reviewed.",
+    "Stakeholder engagement activities are planned, monitored and adjusted throughout delivery.",
+    "Quality requirements are defined early and verified against acceptance criteria.",
+    "Governance arrangements assign decision rights for scope, schedule and budget changes.",
+]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def create_synthetic_pdf(filename, title, pages, lines_per_page):
+    """Multi-page PDF with numbered, upper-case and colon headings (create_test_pdf.py style)"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    c = canvas.Canvas(str(filename), pagesize=letter)
+    width, height = letter
+    for page in range(1, pages + 1):
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, height - 50, f"{page}. {title} Chapter {page}")
+        c.setFont("Helvetica", 9)
+        y_position = height - 80
+        for line_num in range(lines_per_page):
+            if line_num % 15 == 7:
+                line = f"{page}.{line_num // 15 + 1} Managing Delivery Area {line_num}"
+            elif line_num % 15 == 14:
+                line = "KEY CONCEPTS AND PRINCIPLES"
+            else:
+                line = BODY_LINES[(page + line_num) % len(BODY_LINES)]
+            c.drawString(50, y_position, line)
+            y_position -= 15
+        c.showPage()
+    c.save()
+
+def find_pdf_dir():
+    """Locate the bundled PDFs the same way simple_extractor does"""
+    for path in (Path("assets/pdfs"), Path("../assets/pdfs")):
+        if path.exists() and list(path.glob("*.pdf")):
+            return path
+    return None
+
+def build_corpus(pdf_dir, work_dir: Path, synthetic: bool = True) -> List[Path]:
+    """Bundled PDFs plus generated ones (when reportlab is installed)"""
+    corpus = sorted(Path(pdf_dir).glob("*.pdf")) if pdf_dir else []
+    if synthetic:
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            print("reportlab not installed, skipping generated documents (pip install reportlab)")
+            return corpus
+        for name, pages, lines_per_page in SYNTHETIC_DOCUMENTS:
+            path = work_dir / f"{name}.pdf"
+            create_synthetic_pdf(path, name.replace("_", " ").title(), pages, lines_per_page)
+            corpus.append(path)
+    return corpus
+
+def count_lines(content: Dict[str, Any]) -> int:
+    """Non-empty lines over every page of extracted content"""
+    return sum(
+        sum(1 for line in text.split('\n') if line.strip())
+        for text in content.get('full_text_by_page', {}).values()
+    )
+
+def output_bytes(content: Dict[str, Any]) -> int:
+    from content_format import encode
+    return len(encode(content, "json", 2))
+
+def best_of(func, repeat: int):
+    """(best wall time, last result) over repeat runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_case(benchmark: str, pdf_paths: List[str], repeat: int) -> Dict[str, Any]:
+    """Run one benchmark in this process (called in a fresh interpreter per case)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if benchmark == "pdf_content_extractor":
+            from pdf_content_extractor import PDFContentExtractor
+            path = pdf_paths[0]
+            extractor = PDFContentExtractor(Path(path).stem)
+            seconds, content = best_of(lambda: extractor.extract_pdf_content(path), repeat)
+            contents = [content]
+        elif benchmark == "simple_extractor":
+            from simple_extractor import process_pdf
+            path = pdf_paths[0]
+            seconds, content = best_of(lambda: process_pdf(path), repeat)
+            contents = [content]
+        elif benchmark == "simple_comparison":
+            from simple_comparison import create_comparison_data, generate_simple_topics
+            from simple_extractor import process_pdf
+            contents = [process_pdf(path) for path in pdf_paths]
+            topics = generate_simple_topics(contents)
+            seconds, comparison = best_of(lambda: create_comparison_data(topics, contents), repeat)
+        else:
+            raise ValueError(f"Unknown benchmark: {benchmark}")
+
+    pages = sum(content.get('total_pages', 0) for content in contents)
+    lines = sum(count_lines(content) for content in contents)
+    result = {
+        "pages": pages,
+        "lines": lines,
+        "seconds": round(seconds, 4),
+        "pages_per_sec": round(pages / seconds, 1) if seconds else None,
+        "lines_per_sec": round(lines / seconds, 1) if seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if benchmark == "simple_comparison":
+        result["sections"] = sum(len(content.get('sections', [])) for content in contents)
+        result["topics"] = len(comparison['topics'])
+        result["output_bytes"] = output_bytes(comparison)
+    else:
+        result["sections"] = len(contents[0].get('sections', []))
+        result["output_bytes"] = output_bytes(contents[0])
+    return result
+
+def run_isolated(benchmark: str, pdf_paths: List[str], repeat: int) -> Dict[str, Any]:
+    """Run a case in a new interpreter so peak RSS belongs to that case alone"""
+    command = [sys.executable, str(Path(__file__).resolve()), "--run-case", benchmark,
+               "--repeat", str(repeat), *pdf_paths]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=Path(__file__).resolve().parent)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run_suite(corpus: List[Path], repeat: int, benchmarks: List[str]) -> Dict[str, Any]:
+    results = {}
+    failures = {}
+    for benchmark in benchmarks:
+        cases = [(pdf.stem, [str(pdf.resolve())]) for pdf in corpus]
+        if benchmark == "simple_comparison":
+            cases = [("corpus", [str(pdf.resolve()) for pdf in corpus])]
+        for case_name, paths in cases:
+            key = f"{benchmark}/{case_name}"
+            try:
+                results[key] = run_isolated(benchmark, paths, repeat)
+            except Exception as e:
+                print(f"✗ {key}: {e}")
+                failures[key] = str(e)
+                continue
+            result = results[key]
+            rss = f"{result['peak_rss_mb']:7.1f} MB" if result['peak_rss_mb'] is not None else "      n/a"
+            print(f"{key:<46} {result['pages_per_sec']:>9,.0f} pg/s {result['lines_per_sec']:>11,.0f} ln/s "
+                  f"{rss} {result['output_bytes'] / 1024:8.0f} KB")
+    return {
+        "suite_version": SUITE_VERSION,
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "benchmarks": benchmarks,
+        "results": results,
+        "failures": failures,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Cases whose pages/sec fell more than threshold (a fraction) below the baseline.
+
+    Cases that crashed, are missing from the current run or have no
+    pages/sec to compare count as regressions too. Baseline cases of
+    benchmarks left out with --benchmark are skipped.
+    """
+    regressions = []
+    ran = set(current.get("benchmarks", BENCHMARKS))
+    failures = current.get("failures", {})
+    print("-" * 78)
+    for key, error in failures.items():
+        print(f"✗ {key:<46} failed: {error}")
+        regressions.append(key)
+    for key, base in baseline.get("results", {}).items():
+        if key in failures:
+            continue
+        if key.split("/", 1)[0] not in ran:
+            print(f"↷ {key:<46} not run, not compared")
+            continue
+        result = current["results"].get(key)
+        if not result:
+            print(f"✗ {key:<46} missing from this run")
+            regressions.append(key)
+            continue
+        if not base.get("pages_per_sec") or not result.get("pages_per_sec"):
+            print(f"✗ {key:<46} no pages/sec to compare")
+            regressions.append(key)
+            continue
+        if result["pages"] != base["pages"]:
+            print(f"↷ {key:<46} input changed ({base['pages']} -> {result['pages']} pages), not compared")
+            continue
+        change = result["pages_per_sec"] / base["pages_per_sec"] - 1.0
+        marker = "✗" if change < -threshold else "✓"
+        print(f"{marker} {key:<46} {base['pages_per_sec']:>9,.0f} -> {result['pages_per_sec']:>9,.0f} pg/s "
+              f"({change:+.1%})")
+        if change < -threshold:
+            regressions.append(key)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction and comparison benchmark suite")
+    parser.add_argument("--pdf-dir", default=None, help="Directory with the bundled PDFs")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best time is kept)")
+    parser.add_argument("--no-synthetic", action="store_true", help="Skip the reportlab-generated documents")
+    parser.add_argument("--benchmark", action="append", choices=BENCHMARKS, help="Run only these benchmarks")
+    parser.add_argument("--save", metavar="FILE", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Fail when throughput regresses against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed pages/sec drop before --compare fails (fraction, default 0.15)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("pdfs", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.pdfs, args.repeat)))
+        return 0
+
+    pdf_dir = Path(args.pdf_dir) if args.pdf_dir else find_pdf_dir()
+    print("📊 Benchmark Suite")
+    print("=" * 78)
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus = build_corpus(pdf_dir, Path(work_dir), not args.no_synthetic)
+        if not corpus:
+            print("Error: No PDFs to benchmark. Add PDFs to assets/pdfs or install reportlab.")
+            return 1
+        current = run_suite(corpus, args.repeat, args.benchmark or BENCHMARKS)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"✓ Saved baseline: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} case(s) failed or regressed more than {args.threshold:.0%}")
+            return 1
+        print(f"✓ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
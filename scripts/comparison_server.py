@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Comparison Server
+Local asyncio HTTP API over the extracted content and comparisons, loaded
+once into memory instead of being parsed by every client on startup
+
+Run:  python comparison_server.py [--port 8765]
+
+GET  /search?q=risk+register[&standard=pmbok7][&page=12][&phrase=1][&limit=10]
+GET  /section?standard=pmbok7&id=12
+GET  /compare[?topic=topic_1][&standard=pmbok7&standard=prince2]
+POST /reload[?force=1]      re-read the artifacts when they have changed
+GET  /metrics               request counts, latency histograms, cache stats
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import content_format
+from content_spans import section_text
+from search_index import INDEX_NAME, SearchIndex, build_index, find_content_dir, standard_name
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class LatencyHistogram:
+    """Request counts per latency bucket, plus count, sum and max"""
+
+    def __init__(self, bounds_ms: List[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float):
+        self.counts[bisect.bisect_left(self.bounds_ms, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th request (None past the last bound)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds_ms + [None], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound:g}ms": count for bound, count in zip(self.bounds_ms, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": buckets
+        }
+
+class ResultCache:
+    """LRU cache of encoded responses, keyed by endpoint and normalized query"""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Optional[Tuple[int, bytes]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value: Tuple[int, bytes]):
+        if self.capacity <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+def find_comparisons(assets_dir: Path) -> Optional[Path]:
+    """ai_comparisons in whichever format was written last"""
+    candidates = [assets_dir / content_format.output_name("ai_comparisons", fmt) for fmt in content_format.FORMATS]
+    existing = [path for path in candidates if path.exists()]
+    return max(existing, key=lambda path: path.stat().st_mtime_ns) if existing else None
+
+class Library:
+    """Everything the server answers from, loaded once and then read-only"""
+
+    def __init__(self, content_dir: Path):
+        started = time.perf_counter()
+        self.content_dir = content_dir
+        self.signature = artifact_signature(content_dir)
+        self.content = {}
+        for file_path in content_format.find_content_files(content_dir):
+            content = content_format.load(file_path)
+            self.content[standard_name(content)] = content
+
+        # A search_index.json newer than every content file is reused, otherwise rebuilt in memory
+        index_file = content_dir / INDEX_NAME
+        newest_content = max((mtime for path, mtime in self.signature.items() if "_content." in path), default=0)
+        if index_file.exists() and index_file.stat().st_mtime_ns >= newest_content:
+            self.index = SearchIndex.load(index_file)
+        else:
+            self.index = SearchIndex(build_index(list(self.content.values())))
+
+        comparisons_file = find_comparisons(content_dir.parent)
+        comparisons = content_format.load(comparisons_file) if comparisons_file else {"topics": []}
+        self.comparisons = comparisons
+        self.topics = {topic['id']: topic for topic in comparisons.get('topics', [])}
+        self.loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.load_seconds = time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 3),
+            "standards": sorted(self.content),
+            "sections": sum(len(content.get('sections', [])) for content in self.content.values()),
+            "terms": self.index.stats["terms"],
+            "topics": len(self.topics)
+        }
+
+    def search(self, query: str, standard: Optional[str], page: Optional[int], phrase: bool,
+               limit: int) -> Dict[str, Any]:
+        if standard is not None and standard not in self.content:
+            raise HTTPError(404, f"unknown standard: {standard}")
+        if limit < 1:
+            raise HTTPError(400, "limit must be at least 1")
+        if phrase:
+            matches = self.index.phrase(query, standard, page)
+            return {"query": query, "phrase": True, "total": len(matches), "results": [
+                {"standard": match.standard, "page": match.page, "offset": match.offset, "section": match.section,
+                 "heading": self._heading(match.standard, match.section)}
+                for match in matches[:limit]
+            ]}
+        # Ranked sections; a page filter keeps those spanning that page
+        results = self.index.search(query, standard, limit if page is None else self.index.stats["sections"])
+        if page is not None:
+            results = [result for result in results if result["page_start"] <= page <= result["page_end"]]
+        return {"query": query, "phrase": False, "total": len(results), "results": results[:limit]}
+
+    def _heading(self, standard: str, section_id: int) -> Optional[str]:
+        sections = self.content[standard].get('sections', [])
+        return sections[section_id].get('heading', '') if 0 <= section_id < len(sections) else None
+
+    def section(self, standard: str, section_id: int) -> Dict[str, Any]:
+        content = self.content.get(standard)
+        if content is None:
+            raise HTTPError(404, f"unknown standard: {standard}")
+        sections = content.get('sections', [])
+        if not 0 <= section_id < len(sections):
+            raise HTTPError(404, f"{standard} has no section {section_id}")
+        section = sections[section_id]
+        return {
+            "standard": standard,
+            "section": section_id,
+            "heading": section.get('heading', ''),
+            "level": section.get('level'),
+            "page_start": section.get('page_start'),
+            "page_end": section.get('page_end'),
+            "keywords": section.get('keywords', []),
+            "content": section_text(content, section)
+        }
+
+    def compare(self, topic_id: Optional[str], standards: List[str]) -> Dict[str, Any]:
+        for standard in standards:
+            if standard not in self.content:
+                raise HTTPError(404, f"unknown standard: {standard}")
+        if topic_id is None:
+            return {"standards": self.comparisons.get('standards', []), "topics": [
+                {"id": topic['id'], "title": topic['title'], "standards": sorted(topic.get('references', {}))}
+                for topic in self.topics.values()
+                if all(standard in topic.get('references', {}) for standard in standards)
+            ]}
+        topic = self.topics.get(topic_id)
+        if topic is None:
+            raise HTTPError(404, f"unknown topic: {topic_id}")
+        if not standards:
+            return topic
+        topic = dict(topic)
+        topic['references'] = {name: reference for name, reference in topic.get('references', {}).items()
+                               if name in standards}
+        return topic
+
+def artifact_signature(content_dir: Path) -> Dict[str, int]:
+    """mtime of every file the Library loads, to tell whether a reload is needed"""
+    paths = list(content_format.find_content_files(content_dir)) + [content_dir / INDEX_NAME]
+    comparisons_file = find_comparisons(content_dir.parent)
+    if comparisons_file:
+        paths.append(comparisons_file)
+    return {str(path): path.stat().st_mtime_ns for path in paths if path.exists()}
+
+def _one(query: Dict[str, List[str]], name: str, required: bool = False) -> Optional[str]:
+    values = query.get(name)
+    if not values:
+        if required:
+            raise HTTPError(400, f"missing parameter: {name}")
+        return None
+    return values[-1]
+
+def _int(query: Dict[str, List[str]], name: str, required: bool = False, default: Optional[int] = None) -> Optional[int]:
+    value = _one(query, name, required)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+
+def _json(status: int, payload: Any) -> Tuple[int, bytes]:
+    return status, json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+class ComparisonServer:
+    """Routes requests to the current Library through the LRU cache and records latencies"""
+
+    def __init__(self, content_dir: Path, cache_size: int = 1024):
+        self.content_dir = content_dir
+        self.library = Library(content_dir)
+        self.cache = ResultCache(cache_size)
+        self.histograms = {}
+        self.statuses = {}
+        self.reloads = 0
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._reload_lock = asyncio.Lock()
+
+    async def handle(self, method: str, target: str) -> Tuple[int, bytes]:
+        """Response (status, JSON body) for one request"""
+        started = time.perf_counter()
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        try:
+            status, body = await self._route(method, path, parse_qs(url.query))
+        except HTTPError as e:
+            status, body = _json(e.status, {"error": str(e)})
+        except Exception as e:
+            status, body = _json(500, {"error": f"{type(e).__name__}: {e}"})
+        endpoint = path if path in ROUTES else "other"
+        self.histograms.setdefault(endpoint, LatencyHistogram()).observe((time.perf_counter() - started) * 1000)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        return status, body
+
+    async def _route(self, method: str, path: str, query: Dict[str, List[str]]) -> Tuple[int, bytes]:
+        allowed = ROUTES.get(path)
+        if allowed is None:
+            raise HTTPError(404, f"no such endpoint: {path}")
+        if method not in allowed:
+            raise HTTPError(405, f"{path} accepts {', '.join(allowed)}")
+        if path == "/reload":
+            return _json(200, await self.reload(_one(query, "force") in ("1", "true")))
+        if path == "/metrics":
+            return _json(200, self.metrics())
+        if path == "/":
+            return _json(200, {"endpoints": sorted(ROUTES), **self.library.stats()})
+
+        # Same parameters in any order share a cache entry
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        library = self.library
+        if path == "/search":
+            payload = library.search(_one(query, "q", required=True), _one(query, "standard"), _int(query, "page"),
+                                     _one(query, "phrase") in ("1", "true"), _int(query, "limit", default=10))
+        elif path == "/section":
+            payload = library.section(_one(query, "standard", required=True), _int(query, "id", required=True))
+        else:
+            payload = library.compare(_one(query, "topic"), query.get("standard", []))
+        response = _json(200, payload)
+        # Answers computed from a library replaced meanwhile are not cached
+        if library is self.library:
+            self.cache.put(key, response)
+        return response
+
+    async def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Load changed artifacts in a worker thread, then swap them in and clear the cache"""
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            signature = await loop.run_in_executor(None, artifact_signature, self.content_dir)
+            if not force and signature == self.library.signature:
+                return {"reloaded": False, "reason": "artifacts unchanged", **self.library.stats()}
+            library = await loop.run_in_executor(None, Library, self.content_dir)
+            self.library = library
+            self.cache.clear()
+            self.reloads += 1
+            return {"reloaded": True, **library.stats()}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "reloads": self.reloads,
+            "library": self.library.stats(),
+            "cache": self.cache.stats(),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "latency": {endpoint: histogram.to_dict() for endpoint, histogram in sorted(self.histograms.items())}
+        }
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 with keep-alive: one request at a time per connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, *_json(413, {"error": "request headers too large"}), keep_alive=False)
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, *_json(400, {"error": "malformed request line"}), keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    await self._respond(writer, *_json(400, {"error": "bad Content-Length"}), keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, *_json(413, {"error": "request body too large"}), keep_alive=False)
+                    break
+                if length:
+                    # No endpoint takes a body; read it to keep the connection usable
+                    await reader.readexactly(length)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                status, body = await self.handle(method.upper(), target)
+                await self._respond(writer, status, body, keep_alive, head_only=method.upper() == "HEAD")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool,
+                       head_only: bool = False):
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Error')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                # The Flutter web build calls the API from another origin
+                "Access-Control-Allow-Origin: *\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + (b"" if head_only else body))
+        await writer.drain()
+
+ROUTES = {
+    "/": ("GET", "HEAD"),
+    "/search": ("GET", "HEAD"),
+    "/section": ("GET", "HEAD"),
+    "/compare": ("GET", "HEAD"),
+    "/reload": ("POST",),
+    "/metrics": ("GET", "HEAD"),
+}
+
+async def serve(args) -> int:
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    if not content_format.find_content_files(content_dir):
+        print(f"Error: No content files found in {content_dir}. Run the extractor first.")
+        return 1
+    server = ComparisonServer(content_dir, args.cache_size)
+    stats = server.library.stats()
+    print(f"✓ Loaded {stats['sections']} sections of {', '.join(stats['standards'])}, "
+          f"{stats['topics']} topics in {stats['load_seconds']:.2f}s")
+
+    listener = await asyncio.start_server(server.serve_connection, args.host, args.port,
+                                          limit=MAX_HEADER_BYTES)
+    print(f"🌐 Serving on http://{args.host}:{args.port} (POST /reload after re-running the pipeline)")
+    async with listener:
+        await listener.serve_forever()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local search and comparison API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Query results kept in the LRU cache")
+    args = parser.parse_args(argv)
+
+    print("🛰  Comparison Server")
+    print("=" * 40)
+    try:
+        return asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
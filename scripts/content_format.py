@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Content Formats
+Pluggable encodings for extracted content: JSON (default), gzip-compressed
+JSON and MessagePack
+
+Every format is recognizable from its first bytes, so readers never need to
+be told which one a file uses: gzip starts with 1f 8b, JSON with "{" or "[",
+and a MessagePack document with a map or array marker.
+"""
+
+import gzip
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS = ["json", "json.gz", "msgpack"]
+
+EXTENSIONS = {
+    "json": ".json",
+    "json.gz": ".json.gz",
+    "msgpack": ".msgpack",
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+def output_name(stem: str, fmt: str = "json") -> str:
+    """File name for a document in the given format, e.g. pmbok7_content.json.gz"""
+    return stem + EXTENSIONS[fmt]
+
+def _str_keys(value: Any) -> Any:
+    """Stringify dict keys as JSON does, so every format decodes to the same data"""
+    if isinstance(value, dict):
+        return {(key if isinstance(key, str) else json.dumps(key).strip('"')): _str_keys(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_str_keys(item) for item in value]
+    return value
+
+# Pure-Python MessagePack (used when the msgpack package is not installed)
+
+def _pack(value: Any, out: List[bytes]):
+    if value is None:
+        out.append(b"\xc0")
+    elif value is True:
+        out.append(b"\xc3")
+    elif value is False:
+        out.append(b"\xc2")
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(struct.pack("B", value))
+        elif -0x20 <= value < 0:
+            out.append(struct.pack("b", value))
+        elif value >= 0:
+            if value <= 0xff:
+                out.append(struct.pack(">BB", 0xcc, value))
+            elif value <= 0xffff:
+                out.append(struct.pack(">BH", 0xcd, value))
+            elif value <= 0xffffffff:
+                out.append(struct.pack(">BI", 0xce, value))
+            else:
+                out.append(struct.pack(">BQ", 0xcf, value))
+        elif value >= -0x80:
+            out.append(struct.pack(">Bb", 0xd0, value))
+        elif value >= -0x8000:
+            out.append(struct.pack(">Bh", 0xd1, value))
+        elif value >= -0x80000000:
+            out.append(struct.pack(">Bi", 0xd2, value))
+        else:
+            out.append(struct.pack(">Bq", 0xd3, value))
+    elif isinstance(value, float):
+        out.append(struct.pack(">Bd", 0xcb, value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        size = len(data)
+        if size < 32:
+            out.append(struct.pack("B", 0xa0 | size))
+        elif size <= 0xff:
+            out.append(struct.pack(">BB", 0xd9, size))
+        elif size <= 0xffff:
+            out.append(struct.pack(">BH", 0xda, size))
+        else:
+            out.append(struct.pack(">BI", 0xdb, size))
+        out.append(data)
+    elif isinstance(value, (bytes, bytearray)):
+        size = len(value)
+        if size <= 0xff:
+            out.append(struct.pack(">BB", 0xc4, size))
+        elif size <= 0xffff:
+            out.append(struct.pack(">BH", 0xc5, size))
+        else:
+            out.append(struct.pack(">BI", 0xc6, size))
+        out.append(bytes(value))
+    elif isinstance(value, (list, tuple)):
+        size = len(value)
+        if size < 16:
+            out.append(struct.pack("B", 0x90 | size))
+        elif size <= 0xffff:
+            out.append(struct.pack(">BH", 0xdc, size))
+        else:
+            out.append(struct.pack(">BI", 0xdd, size))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 16:
+            out.append(struct.pack("B", 0x80 | size))
+        elif size <= 0xffff:
+            out.append(struct.pack(">BH", 0xde, size))
+        else:
+            out.append(struct.pack(">BI", 0xdf, size))
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+# (struct format, size) of the fixed-width scalars, keyed by marker byte
+_SCALARS = {
+    0xca: (">f", 4), 0xcb: (">d", 8),
+    0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+    0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8),
+}
+
+# Length prefix (struct format, size) for str/bin/array/map markers
+_LENGTHS = {
+    0xd9: (">B", 1), 0xda: (">H", 2), 0xdb: (">I", 4),
+    0xc4: (">B", 1), 0xc5: (">H", 2), 0xc6: (">I", 4),
+    0xdc: (">H", 2), 0xdd: (">I", 4),
+    0xde: (">H", 2), 0xdf: (">I", 4),
+}
+
+def _unpack(data: bytes, pos: int) -> Tuple[Any, int]:
+    marker = data[pos]
+    pos += 1
+    if marker < 0x80:
+        return marker, pos
+    if marker >= 0xe0:
+        return marker - 0x100, pos
+    if 0xa0 <= marker <= 0xbf:
+        end = pos + (marker & 0x1f)
+        return data[pos:end].decode("utf-8"), end
+    if 0x90 <= marker <= 0x9f:
+        return _unpack_array(data, pos, marker & 0x0f)
+    if 0x80 <= marker <= 0x8f:
+        return _unpack_map(data, pos, marker & 0x0f)
+    if marker == 0xc0:
+        return None, pos
+    if marker == 0xc2:
+        return False, pos
+    if marker == 0xc3:
+        return True, pos
+    if marker in _SCALARS:
+        fmt, size = _SCALARS[marker]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if marker in _LENGTHS:
+        fmt, size = _LENGTHS[marker]
+        length = struct.unpack_from(fmt, data, pos)[0]
+        pos += size
+        if marker >= 0xde:
+            return _unpack_map(data, pos, length)
+        if marker >= 0xdc:
+            return _unpack_array(data, pos, length)
+        end = pos + length
+        if marker >= 0xd9:
+            return data[pos:end].decode("utf-8"), end
+        return data[pos:end], end
+    raise ValueError(f"Unsupported MessagePack marker 0x{marker:02x} at byte {pos - 1}")
+
+def _unpack_array(data: bytes, pos: int, length: int) -> Tuple[List[Any], int]:
+    items = []
+    for _ in range(length):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+def _unpack_map(data: bytes, pos: int, length: int) -> Tuple[Dict[Any, Any], int]:
+    items = {}
+    for _ in range(length):
+        key, pos = _unpack(data, pos)
+        items[key], pos = _unpack(data, pos)
+    return items, pos
+
+def msgpack_dumps(value: Any) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True)
+    out = []
+    _pack(value, out)
+    return b"".join(out)
+
+def msgpack_loads(data: bytes) -> Any:
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, pos = _unpack(data, 0)
+    if pos != len(data):
+        raise ValueError(f"Trailing data after MessagePack document ({len(data) - pos} bytes)")
+    return value
+
+def encode(content: Any, fmt: str = "json", indent: Optional[int] = 2) -> bytes:
+    """Serialize content; indent applies to the JSON-based formats"""
+    if fmt == "msgpack":
+        return msgpack_dumps(_str_keys(content))
+    separators = (",", ":") if indent is None else None
+    text = json.dumps(content, indent=indent, ensure_ascii=False, separators=separators)
+    data = text.encode("utf-8")
+    if fmt == "json.gz":
+        # mtime=0 keeps the output reproducible for the same content
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if fmt != "json":
+        raise ValueError(f"Unknown content format: {fmt}")
+    return data
+
+def detect_format(data: bytes) -> str:
+    """Name of the format a document's leading bytes belong to"""
+    if data[:2] == GZIP_MAGIC:
+        return "json.gz"
+    head = data.lstrip()[:1]
+    if head in (b"{", b"["):
+        return "json"
+    if head and (0x80 <= head[0] <= 0x9f or head[0] in (0xdc, 0xdd, 0xde, 0xdf)):
+        return "msgpack"
+    raise ValueError("Unrecognized content format")
+
+def decode(data: bytes) -> Any:
+    """Deserialize a document in any supported format"""
+    fmt = detect_format(data)
+    if fmt == "msgpack":
+        return msgpack_loads(data)
+    if fmt == "json.gz":
+        data = gzip.decompress(data)
+    return json.loads(data.decode("utf-8"))
+
+def sniff(path) -> Tuple[str, Optional[int]]:
+    """(format, JSON indent) of an existing file, so it can be rewritten the same way"""
+    with open(path, 'rb') as f:
+        head = f.read(2)
+    fmt = detect_format(head)
+    if fmt == "json.gz":
+        with gzip.open(path, 'rb') as f:
+            head = f.read(2)
+    elif fmt == "msgpack":
+        return fmt, None
+    return fmt, 2 if head == b"{\n" else None
+
+def dump(content: Any, path, fmt: str = "json", indent: Optional[int] = 2):
+    """Write content to path in the given format.
+
+    The data goes to a sibling .tmp file that then replaces path, so a
+    failed write never leaves path truncated.
+    """
+    data = encode(content, fmt, indent)
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def load(path) -> Any:
+    """Read a document written in any supported format"""
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+def find_content_files(content_dir) -> List[Path]:
+    """Every *_content file in content_dir, whatever its format.
+
+    When one document exists in several formats (after switching --format)
+    the most recently written file wins.
+    """
+    newest = {}
+    for fmt, extension in EXTENSIONS.items():
+        for path in Path(content_dir).glob(f"*_content{extension}"):
+            stem = path.name[:-len(extension)]
+            current = newest.get(stem)
+            if current is None or path.stat().st_mtime_ns > current.stat().st_mtime_ns:
+                newest[stem] = path
+    return [newest[stem] for stem in sorted(newest)]
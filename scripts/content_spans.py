@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Content Spans
+Resolves section text stored as [page, start, end] spans into full_text_by_page
+"""
+
+from typing import Any, Dict, List
+
+def resolve_span(page_text: str, start: int, end: int, mode: str = "lines") -> str:
+    """Text of one span.
+
+    "lines" (pdf_content_extractor) rebuilds the section text the way the
+    extractor does: every non-empty stripped line followed by a space.
+    "raw" (simple_extractor) is the plain slice of the page text.
+    """
+    chunk = page_text[start:end]
+    if mode == "raw":
+        return chunk
+    return "".join(line.strip() + " " for line in chunk.split('\n') if line.strip())
+
+def _page_text(pages: Dict[Any, str], page: int) -> str:
+    text = pages.get(str(page))
+    if text is None:
+        text = pages.get(page, "")
+    return text
+
+def section_text(content: Dict[str, Any], section: Dict[str, Any]) -> str:
+    """A section's content whether it is stored inline or as spans"""
+    spans: List[List[int]] = section.get('content_spans')
+    if spans is None:
+        return section.get('content', '')
+    mode = content.get('content_spans_mode', 'lines')
+    pages = content.get('full_text_by_page', {})
+    text = "".join(resolve_span(_page_text(pages, page), start, end, mode) for page, start, end in spans)
+    return text + section.get('content_suffix', '')
+
+def materialize(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace content_spans with inline content in every section (in place)"""
+    if 'content_spans_mode' not in content:
+        return content
+    sections = []
+    for section in content.get('sections', []):
+        if 'content_spans' not in section:
+            sections.append(section)
+            continue
+        text = section_text(content, section)
+        inline = {}
+        for key, value in section.items():
+            if key == 'content_spans':
+                inline['content'] = text
+            elif key != 'content_suffix':
+                inline[key] = value
+        sections.append(inline)
+    content['sections'] = sections
+    del content['content_spans_mode']
+    return content
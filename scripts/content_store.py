@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Content Store
+Optional SQLite storage for extracted content: documents, pages, headings and
+sections in plain tables plus an FTS5 index over page and section text, so
+search and lookups no longer need every *_content file loaded into memory
+
+Build:  python content_store.py build [--db assets/extracted_content/content.db]
+Query:  python content_store.py query "risk register" [--standard pmbok7] [--kind section]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import content_format
+from content_spans import section_text
+from search_index import find_content_dir, standard_name
+
+STORE_NAME = "content.db"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    standard TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    total_pages INTEGER NOT NULL,
+    source TEXT,
+    source_mtime_ns INTEGER,
+    source_size INTEGER,
+    loaded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    document_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (document_id, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS headings (
+    document_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    page INTEGER,
+    level INTEGER,
+    PRIMARY KEY (document_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sections (
+    document_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    level INTEGER,
+    page_start INTEGER,
+    page_end INTEGER,
+    content TEXT NOT NULL,
+    keywords TEXT,
+    PRIMARY KEY (document_id, position)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS text_fts USING fts5(
+    heading, text, kind UNINDEXED, document_id UNINDEXED, ref UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# FTS rows of document d have rowids in [d << 32, (d + 1) << 32): sections
+# first, then pages from PAGE_ROWID_BASE, so one document's rows can be
+# replaced with a rowid range delete instead of a scan of the whole index
+PAGE_ROWID_BASE = 1 << 31
+
+def _fts_rowid(document_id: int, kind: str, ref: int) -> int:
+    return (document_id << 32) + (PAGE_ROWID_BASE if kind == "page" else 0) + ref
+
+def source_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+class ContentStore:
+    """Read-write handle on a content database (created on first use)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are opened explicitly so a whole import is one commit
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self.conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self.conn.close()
+            raise RuntimeError(f"SQLite {sqlite3.sqlite_version} was built without FTS5 ({e})")
+        # Headings weigh four times as much as body text in bm25() ranking
+        self.conn.execute("INSERT INTO text_fts(text_fts, rank) VALUES('rank', 'bm25(4.0, 1.0)')")
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _document_ids(self) -> Dict[str, Tuple[int, Optional[int], Optional[int]]]:
+        """standard -> (id, source mtime_ns, source size)"""
+        rows = self.conn.execute("SELECT standard, id, source_mtime_ns, source_size FROM documents")
+        return {standard: (doc_id, mtime_ns, size) for standard, doc_id, mtime_ns, size in rows}
+
+    def _delete(self, document_id: int):
+        for table in ("pages", "headings", "sections"):
+            self.conn.execute(f"DELETE FROM {table} WHERE document_id = ?", (document_id,))
+        self.conn.execute("DELETE FROM text_fts WHERE rowid >= ? AND rowid < ?",
+                          (document_id << 32, (document_id + 1) << 32))
+        self.conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+    def _insert(self, content: Dict[str, Any], source: Optional[Path] = None) -> int:
+        mtime_ns, size = source_signature(source) if source else (None, None)
+        cursor = self.conn.execute(
+            "INSERT INTO documents (standard, file_name, total_pages, source, source_mtime_ns, source_size, loaded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (standard_name(content), content.get('file_name', ''), content.get('total_pages', 0),
+             str(source) if source else None, mtime_ns, size, time.strftime("%Y-%m-%d %H:%M:%S")))
+        doc_id = cursor.lastrowid
+
+        pages = content.get('full_text_by_page', {})
+        self.conn.executemany("INSERT INTO pages VALUES (?, ?, ?)",
+                              ((doc_id, int(page), text) for page, text in pages.items()))
+        self.conn.executemany("INSERT INTO headings VALUES (?, ?, ?, ?, ?)", (
+            (doc_id, position, heading.get('text', ''), heading.get('page'), heading.get('level'))
+            for position, heading in enumerate(content.get('headings', []))))
+
+        sections = content.get('sections', [])
+        texts = [section_text(content, section) for section in sections]
+        self.conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+            (doc_id, position, section.get('heading', ''), section.get('level'), section.get('page_start'),
+             section.get('page_end'), text, json.dumps(section.get('keywords', []), ensure_ascii=False))
+            for position, (section, text) in enumerate(zip(sections, texts))))
+
+        self.conn.executemany(
+            "INSERT INTO text_fts (rowid, heading, text, kind, document_id, ref) VALUES (?, ?, ?, ?, ?, ?)",
+            ((_fts_rowid(doc_id, "section", position), section.get('heading', ''), text, "section", doc_id, position)
+             for position, (section, text) in enumerate(zip(sections, texts))))
+        self.conn.executemany(
+            "INSERT INTO text_fts (rowid, heading, text, kind, document_id, ref) VALUES (?, ?, ?, ?, ?, ?)",
+            ((_fts_rowid(doc_id, "page", int(page)), "", text, "page", doc_id, int(page))
+             for page, text in pages.items()))
+        return doc_id
+
+    def write_content(self, content: Dict[str, Any], source: Optional[Path] = None) -> int:
+        """Insert or replace one document in its own transaction; returns its id"""
+        self.conn.execute("BEGIN")
+        try:
+            existing = self._document_ids().get(standard_name(content))
+            if existing:
+                self._delete(existing[0])
+            doc_id = self._insert(content, source)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return doc_id
+
+    def sync(self, content_files: List[Path], force: bool = False, prune: bool = True) -> Dict[str, int]:
+        """Load every changed content file (and drop vanished documents) in one transaction.
+
+        Files are read one at a time, so memory is bounded by the largest
+        document. Returns counts of loaded, unchanged and removed documents.
+        """
+        counts = {"loaded": 0, "unchanged": 0, "removed": 0}
+        self.conn.execute("BEGIN")
+        try:
+            existing = self._document_ids()
+            seen = set()
+            for path in content_files:
+                path = Path(path)
+                stem = path.name.split("_content.")[0]
+                previous = existing.get(stem)
+                if previous and not force and previous[1:] == source_signature(path):
+                    seen.add(stem)
+                    counts["unchanged"] += 1
+                    continue
+                content = content_format.load(path)
+                name = standard_name(content)
+                seen.add(name)
+                if name in existing:
+                    self._delete(existing[name][0])
+                self._insert(content, path)
+                counts["loaded"] += 1
+            if prune:
+                for name, (doc_id, _, _) in existing.items():
+                    if name not in seen:
+                        self._delete(doc_id)
+                        counts["removed"] += 1
+            if counts["loaded"] or counts["removed"]:
+                self.conn.execute("INSERT INTO text_fts(text_fts) VALUES('optimize')")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return counts
+
+    def stats(self) -> Dict[str, int]:
+        return {table: self.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                for table in ("documents", "pages", "headings", "sections")}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite/FTS5 store for extracted content")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    parser.add_argument("--db", default=None, help=f"Database file (default: <content dir>/{STORE_NAME})")
+    subparsers = parser.add_subparsers(dest="command")
+    build_parser = subparsers.add_parser("build", help="Load changed content files into the database (default)")
+    build_parser.add_argument("--force", action="store_true", help="Reload every document")
+    query_parser = subparsers.add_parser("query", help="Ranked full-text search")
+    query_parser.add_argument("text")
+    query_parser.add_argument("--standard", default=None)
+    query_parser.add_argument("--kind", choices=["page", "section"], default=None)
+    query_parser.add_argument("--phrase", action="store_true", help="Match the words as an exact phrase")
+    query_parser.add_argument("--any", action="store_true", help="Match sections containing any of the words")
+    query_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    db_path = Path(args.db) if args.db else content_dir / STORE_NAME
+
+    if args.command == "query":
+        from store_query import StoreQuery
+        if not db_path.exists():
+            print(f"Error: {db_path} not found. Run: python content_store.py build")
+            return 1
+        with StoreQuery(db_path) as store:
+            results = store.search(args.text, args.standard, args.kind, args.limit, args.phrase, args.any)
+        for result in results:
+            where = f"p.{result['page']}" if result['kind'] == "page" else \
+                f"§{result['section']} p.{result['page']}  {result['heading']}"
+            print(f"  {result['score']:7.3f}  {result['standard']} {where}")
+            print(f"           {' '.join(result['snippet'].split())}")
+        if not results:
+            print(f"No matches for \"{args.text}\"")
+        return 0
+
+    print("💾 Content Store")
+    print("=" * 40)
+    content_files = content_format.find_content_files(content_dir)
+    if not content_files:
+        print(f"Error: No content files found in {content_dir}. Run the extractor first.")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        with ContentStore(db_path) as store:
+            counts = store.sync(content_files, force=args.command == "build" and args.force)
+            stats = store.stats()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"✓ Loaded {counts['loaded']}, unchanged {counts['unchanged']}, removed {counts['removed']} "
+          f"documents in {elapsed:.2f}s")
+    print(f"✓ {stats['documents']} documents, {stats['pages']} pages, {stats['sections']} sections "
+          f"in {db_path} ({db_path.stat().st_size / 1024:.0f} KB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Content Writers
+Incremental writers for the *_content.json schema read by ContentSearchNotifier
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import content_format
+
+class ContentCollector:
+    """In-memory writer: builds the content dict the extractors have always returned"""
+
+    def __init__(self, file_name: str, total_pages: int, extra: Optional[Dict[str, Any]] = None):
+        self.content = {
+            "file_name": file_name,
+            "total_pages": total_pages,
+            "sections": [],
+            "full_text_by_page": {},
+            "headings": []
+        }
+        # Optional top-level fields (e.g. content_spans_mode) follow the standard ones
+        self.content.update(extra or {})
+
+    def set_total_pages(self, total_pages: int):
+        self.content["total_pages"] = total_pages
+
+    def write_page(self, page_num: int, text: str):
+        self.content["full_text_by_page"][page_num] = text
+
+    def write_heading(self, heading: Dict[str, Any]):
+        self.content["headings"].append(heading)
+
+    def write_section(self, section: Dict[str, Any]):
+        self.content["sections"].append(section)
+
+class NullWriter:
+    """Writer that drops everything (for callers that only want the sections)"""
+
+    def set_total_pages(self, total_pages: int):
+        pass
+
+    def write_page(self, page_num: int, text: str):
+        pass
+
+    def write_heading(self, heading: Dict[str, Any]):
+        pass
+
+    def write_section(self, section: Dict[str, Any]):
+        pass
+
+class _Spool:
+    """Disk-backed buffer for the items of one JSON array or object"""
+
+    def __init__(self, directory: Path, indent: Optional[int], depth: int):
+        self.file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', dir=directory)
+        self.count = 0
+        self.indent = indent
+        self.depth = depth
+
+    def add(self, encoded: str):
+        if self.indent is None:
+            self.file.write(("," if self.count else "") + encoded)
+        else:
+            pad = " " * (self.indent * self.depth)
+            # Encoded JSON never contains raw newlines inside strings, so
+            # re-indenting nested lines is a plain replace
+            self.file.write(("," if self.count else "") + "\n" + pad + encoded.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def copy_to(self, out, open_char: str, close_char: str):
+        out.write(open_char)
+        if self.count:
+            self.file.seek(0)
+            while True:
+                chunk = self.file.read(1 << 16)
+                if not chunk:
+                    break
+                out.write(chunk)
+            if self.indent is not None:
+                out.write("\n" + " " * (self.indent * (self.depth - 1)))
+        out.write(close_char)
+        self.file.close()
+
+class StreamingContentWriter:
+    """Writes *_content.json incrementally while extraction runs.
+
+    Pages, headings and sections are encoded as soon as they are produced and
+    spooled to temporary files beside the output, so memory stays bounded by
+    the largest single item. close() assembles the final file in the usual key
+    order; with indent=2 it is byte-identical to json.dump(content, indent=2).
+    indent=None writes compact JSON without whitespace, and compress=True
+    gzips the assembled file (the "json.gz" format).
+    """
+
+    def __init__(self, output_file, file_name: str, total_pages: int, indent: Optional[int] = 2,
+                 extra: Optional[Dict[str, Any]] = None, compress: bool = False):
+        self.output_file = Path(output_file)
+        self.compress = compress
+        self.extra = extra or {}
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self.file_name = file_name
+        self.total_pages = total_pages
+        self.indent = indent
+        self.separators = (",", ":") if indent is None else (",", ": ")
+        directory = self.output_file.parent
+        self.sections = _Spool(directory, indent, 2)
+        self.pages = _Spool(directory, indent, 2)
+        self.headings = _Spool(directory, indent, 2)
+        self.closed = False
+
+    def _encode(self, value: Any) -> str:
+        return json.dumps(value, indent=self.indent, ensure_ascii=False, separators=self.separators)
+
+    def set_total_pages(self, total_pages: int):
+        self.total_pages = total_pages
+
+    def write_page(self, page_num: int, text: str):
+        key_sep = self.separators[1]
+        self.pages.add(self._encode(str(page_num)) + key_sep + self._encode(text))
+
+    def write_heading(self, heading: Dict[str, Any]):
+        self.headings.add(self._encode(heading))
+
+    def write_section(self, section: Dict[str, Any]):
+        self.sections.add(self._encode(section))
+
+    def close(self):
+        """Assemble the spooled parts into the output file (atomically replaced)"""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.indent is None:
+            newline, pad = "", ""
+        else:
+            newline, pad = "\n", " " * self.indent
+        key_sep = self.separators[1]
+
+        tmp_path = self.output_file.with_name(self.output_file.name + ".tmp")
+        with self._open(tmp_path) as out:
+            out.write("{" + newline)
+            out.write(pad + self._encode("file_name") + key_sep + self._encode(self.file_name) + "," + newline)
+            out.write(pad + self._encode("total_pages") + key_sep + self._encode(self.total_pages) + "," + newline)
+            out.write(pad + self._encode("sections") + key_sep)
+            self.sections.copy_to(out, "[", "]")
+            out.write("," + newline + pad + self._encode("full_text_by_page") + key_sep)
+            self.pages.copy_to(out, "{", "}")
+            out.write("," + newline + pad + self._encode("headings") + key_sep)
+            self.headings.copy_to(out, "[", "]")
+            for key, value in self.extra.items():
+                out.write("," + newline + pad + self._encode(key) + key_sep +
+                          self._encode(value).replace("\n", "\n" + pad))
+            out.write(newline + "}")
+        os.replace(tmp_path, self.output_file)
+
+    def _open(self, path):
+        if not self.compress:
+            return open(path, 'w', encoding='utf-8')
+        raw = gzip.GzipFile(path, mode='wb', compresslevel=6, mtime=0)
+        return io.TextIOWrapper(raw, encoding='utf-8')
+
+    def abort(self):
+        """Discard everything written so far"""
+        if not self.closed:
+            self.closed = True
+            for spool in (self.sections, self.pages, self.headings):
+                spool.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+def dump_content(content: Dict[str, Any], output_file, indent: Optional[int] = 2, fmt: str = "json"):
+    """Write a fully built content dict, compact when indent is None.
+
+    fmt selects one of content_format.FORMATS; JSON is written as before.
+    Like StreamingContentWriter, the file is written to a sibling .tmp and
+    atomically replaced, so an existing file is never left truncated.
+    """
+    if fmt != "json":
+        content_format.dump(content, output_file, fmt, indent)
+        return
+    separators = (",", ":") if indent is None else None
+    output_file = Path(output_file)
+    tmp_path = output_file.with_name(output_file.name + ".tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=indent, ensure_ascii=False, separators=separators)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Extraction Cache
+On-disk manifest that lets the extractors skip PDFs that have not changed
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = "extraction_manifest.json"
+MANIFEST_VERSION = 1
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    """Hash a file's contents without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def rules_fingerprint(rules: Any) -> str:
+    """Stable hash of a heading-rule configuration (any JSON-serializable value)"""
+    encoded = json.dumps(rules, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+class ExtractionCache:
+    """Tracks which PDFs were extracted, by which extractor and with which rules.
+
+    A PDF is fresh when its manifest entry matches the current extractor name,
+    version and heading-rule fingerprint and its output file still exists.
+    Size and mtime are compared first; the content hash is only recomputed
+    when they differ, so checking an unchanged library costs one stat() per file.
+    """
+
+    def __init__(self, output_dir, extractor: str, version: str, rules: Any):
+        self.output_dir = Path(output_dir)
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.extractor = extractor
+        self.version = version
+        self.rules_hash = rules_fingerprint(rules)
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the manifest, treating a missing or unreadable one as empty"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("manifest_version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def save(self):
+        """Atomically write the manifest next to the extracted content"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"manifest_version": MANIFEST_VERSION, "files": self.entries}
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_fresh(self, pdf_path, output_file) -> bool:
+        """Return True when pdf_path can be skipped"""
+        pdf_path = Path(pdf_path)
+        entry = self.entries.get(pdf_path.name)
+        if not entry or not Path(output_file).exists():
+            return False
+        if (entry.get("extractor") != self.extractor or
+                entry.get("extractor_version") != self.version or
+                entry.get("rules_hash") != self.rules_hash or
+                entry.get("output_file") != Path(output_file).name):
+            return False
+
+        stat = pdf_path.stat()
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+
+        # Touched or copied but possibly unchanged: fall back to the content hash
+        if entry.get("size") != stat.st_size or entry.get("sha256") != file_sha256(pdf_path):
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self.save()
+        return True
+
+    def record(self, pdf_path, output_file, sha256: Optional[str] = None, output_format: str = "json"):
+        """Store the manifest entry for a successful extraction and persist it.
+
+        output_format names the encoding of output_file (see content_format.py).
+        """
+        pdf_path = Path(pdf_path)
+        stat = pdf_path.stat()
+        self.entries[pdf_path.name] = {
+            "sha256": sha256 or file_sha256(pdf_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "extractor": self.extractor,
+            "extractor_version": self.version,
+            "rules_hash": self.rules_hash,
+            "output_file": Path(output_file).name,
+            "format": output_format,
+        }
+        self.save()
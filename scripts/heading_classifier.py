@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Heading Classifier
+Single-pass heading detection with rules configurable per standard
+"""
+
+import copy
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_RULES_FILE = Path(__file__).with_name("heading_rules.json")
+
+# Backreferences and conditionals on a group, which point at other rules'
+# groups once patterns are joined into one alternation
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+_DEFAULT_FLAGS = re.compile("").flags
+
+# Built-in rules, identical to the original PDFContentExtractor heuristics.
+# Patterns are tried in order and their position gives the heading level
+# unless a rule sets "level" explicitly.
+DEFAULT_RULES = {
+    "patterns": [
+        {"pattern": r'^(\d+\.?\d*\.?\d*)\s+([A-Z][^.]*)'},  # Numbered headings
+        {"pattern": r'^([A-Z][A-Z\s]{10,})'},  # ALL CAPS headings
+        {"pattern": r'^(Chapter|Section|Part)\s+(\d+)'},  # Chapter/Section patterns
+        {"pattern": r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):'},  # Title case with colon
+    ],
+    "uppercase": {"level": 2, "max_length": 100, "min_words": 2},
+    "colon_ending": {"level": 3, "max_length": 80}
+}
+
+def load_heading_rules(path=None, standard: Optional[str] = None) -> Dict[str, Any]:
+    """Load the rule set for a standard from a JSON config.
+
+    The config has a "default" rule set and optional per-standard overrides
+    under "standards" (keyed by PDF file stem) whose keys replace the
+    defaults. A missing config file means the built-in rules.
+    """
+    config = load_rules_config(path)
+    rules = copy.deepcopy(config.get("default", DEFAULT_RULES))
+    if standard:
+        rules.update(copy.deepcopy(config.get("standards", {}).get(standard, {})))
+    return rules
+
+def load_rules_config(path=None) -> Dict[str, Any]:
+    """Read the whole rules config (used for cache fingerprints)"""
+    path = Path(path) if path else DEFAULT_RULES_FILE
+    if not path.exists():
+        return {"default": copy.deepcopy(DEFAULT_RULES), "standards": {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class HeadingClassifier:
+    """Classifies lines as headings with one compiled matcher.
+
+    All patterns are compiled into a single alternation of named groups. The
+    regex engine tries alternatives left to right at the start of the line,
+    so the first group that participates in the match is the same rule the
+    old loop of re.match calls would have returned. Rule sets that cannot be
+    joined without changing their meaning (inline flags, backreferences,
+    named groups) are matched one pattern at a time instead.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        rules = rules if rules is not None else DEFAULT_RULES
+        self.patterns = [rule["pattern"] for rule in rules.get("patterns", [])]
+        self._levels = [rule.get("level", i + 1) for i, rule in enumerate(rules.get("patterns", []))]
+        self._groups = [f"_rule{i}" for i in range(len(self.patterns))]
+        compiled = []
+        for pattern in self.patterns:
+            try:
+                compiled.append(re.compile(pattern))
+            except re.error as e:
+                raise ValueError(f"Invalid heading pattern {pattern!r}: {e}") from e
+        self._matcher = None
+        self._matchers = None
+        if compiled and self.combinable(compiled):
+            combined = "|".join(f"(?P<{group}>{pattern})" for group, pattern in zip(self._groups, self.patterns))
+            self._matcher = re.compile(combined).match
+        elif compiled:
+            self._matchers = [regex.match for regex in compiled]
+
+        self.uppercase = rules.get("uppercase")
+        self.colon_ending = rules.get("colon_ending")
+
+    @staticmethod
+    def combinable(compiled: List[re.Pattern]) -> bool:
+        """Whether the patterns keep their meaning inside one alternation"""
+        return all(regex.flags == _DEFAULT_FLAGS and not regex.groupindex
+                   and not _BACKREFERENCE.search(regex.pattern) for regex in compiled)
+
+    def classify(self, line: str) -> Optional[Dict[str, Any]]:
+        """Return {"text", "level", "pattern_matched"} for a heading line, else None"""
+        if self._matcher:
+            match = self._matcher(line)
+            if match:
+                for i, group in enumerate(self._groups):
+                    if match.group(group) is not None:
+                        return {"text": line, "level": self._levels[i], "pattern_matched": self.patterns[i]}
+        elif self._matchers:
+            for i, match in enumerate(self._matchers):
+                if match(line):
+                    return {"text": line, "level": self._levels[i], "pattern_matched": self.patterns[i]}
+
+        # Additional heuristics
+        uppercase = self.uppercase
+        if uppercase and len(line) < uppercase["max_length"] and line.isupper() \
+                and len(line.split()) >= uppercase["min_words"]:
+            return {"text": line, "level": uppercase["level"], "pattern_matched": "uppercase"}
+
+        colon_ending = self.colon_ending
+        if colon_ending and len(line) < colon_ending["max_length"] and line.endswith(':') \
+                and not line.startswith(' '):
+            return {"text": line, "level": colon_ending["level"], "pattern_matched": "colon_ending"}
+
+        return None
+
+    def classify_lines(self, lines: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Classify a page's (stripped, non-empty) lines in one call"""
+        classify = self.classify
+        return [classify(line) for line in lines]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+Stage timings, counters and optional cProfile/tracemalloc profiling shared by
+the extractors and the comparison generator
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+class Profiler:
+    """cProfile and tracemalloc per stage.
+
+    Each stage gets one cProfile.Profile, enabled for every call of that
+    stage and dumped to <output_dir>/<stage>.prof (load with pstats or
+    snakeviz). While a nested stage runs the enclosing stage's profile is
+    paused, so every .prof holds the time of its own stage only. tracemalloc
+    runs for the whole process; each stage records how far traced memory
+    peaked above where it started (nested stages included) and the largest
+    allocation sites at that point.
+    """
+
+    def __init__(self, output_dir, top_allocations: int = 10):
+        self.output_dir = Path(output_dir)
+        self.top_allocations = top_allocations
+        self.profiles = {}
+        self.memory = {}
+        # [name, traced bytes at start, highest peak seen before the last nested stage]
+        self._active = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self, name: str):
+        if self._active:
+            enclosing = self._active[-1]
+            self.profiles[enclosing[0]].disable()
+            enclosing[2] = max(enclosing[2], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._active.append([name, tracemalloc.get_traced_memory()[0], 0])
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        profile.enable()
+
+    def stop(self, name: str):
+        self.profiles[name].disable()
+        _, started_bytes, earlier_peak = self._active.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, earlier_peak)
+        if self._active:
+            enclosing = self._active[-1]
+            enclosing[2] = max(enclosing[2], peak)
+            self.profiles[enclosing[0]].enable()
+        self._record(name, peak - started_bytes, current)
+
+    def _record(self, name: str, growth: int, current: int):
+        entry = self.memory.setdefault(name, {"peak_bytes": 0, "current_bytes": 0})
+        entry["current_bytes"] = current
+        if growth <= entry["peak_bytes"]:
+            return
+        # Snapshots are slow: stages that run once per page only take one
+        # when their peak grows by half again
+        snapshot = growth > entry["peak_bytes"] * 1.5
+        entry["peak_bytes"] = growth
+        if not snapshot:
+            return
+        top = tracemalloc.take_snapshot().statistics('lineno')[:self.top_allocations]
+        entry["top_allocations"] = [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size,
+             "blocks": stat.count}
+            for stat in top
+        ]
+
+    def save(self) -> List[str]:
+        """Write one .prof file per stage and return their paths"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, profile in self.profiles.items():
+            path = self.output_dir / f"{name}.prof"
+            profile.dump_stats(str(path))
+            paths.append(str(path))
+        return paths
+
+class Metrics:
+    """Wall time per stage, counters and latency samples for one run.
+
+    Stages nest; with a profiler every stage is profiled on its own (see
+    Profiler). snapshot() and merge()
+    let worker processes send their metrics back to the parent.
+    """
+
+    def __init__(self, profiler: Optional[Profiler] = None):
+        self.stages = {}
+        self.counters = {}
+        self.samples = {}
+        self.profiler = profiler
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.profiler is not None:
+            self.profiler.start(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.profiler is not None:
+                self.profiler.stop(name)
+            entry = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+
+    def timed(self, iterable, name: str):
+        """Yield from iterable, timing each next() as one call of stage name"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Record one sample (e.g. a request latency in seconds)"""
+        self.samples.setdefault(name, []).append(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: dict(entry) for name, entry in self.stages.items()},
+            "counters": dict(self.counters),
+            "samples": {name: list(values) for name, values in self.samples.items()},
+        }
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """Add another Metrics' snapshot (from a worker process) into this one"""
+        if not snapshot:
+            return
+        for name, entry in snapshot.get("stages", {}).items():
+            mine = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            mine["calls"] += entry["calls"]
+            mine["seconds"] += entry["seconds"]
+        for name, value in snapshot.get("counters", {}).items():
+            self.count(name, value)
+        for name, values in snapshot.get("samples", {}).items():
+            self.samples.setdefault(name, []).extend(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report with rounded stage times and sample summaries"""
+        report = {
+            "stages": {
+                name: {"calls": entry["calls"], "seconds": round(entry["seconds"], 4)}
+                for name, entry in self.stages.items()
+            },
+            "counters": dict(self.counters),
+            "samples": {name: summarize(values) for name, values in self.samples.items()},
+        }
+        if self.profiler is not None:
+            report["memory"] = self.profiler.memory
+        return report
+
+    def write(self, path, extra: Optional[Dict[str, Any]] = None):
+        """Write the report (plus extra top-level fields) as JSON, atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {"generated_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        report.update(extra or {})
+        report.update(self.to_dict())
+        if self.profiler is not None:
+            report["profiles"] = self.profiler.save()
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        """One line per stage, slowest first"""
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            print(f"  ⏱ {name:<20} {entry['seconds']:8.3f}s  ({entry['calls']} calls)")
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "total": round(sum(ordered), 4),
+        "min": round(ordered[0], 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+_current = Metrics()
+
+def metrics() -> Metrics:
+    """The Metrics instrumented code records into"""
+    return _current
+
+@contextlib.contextmanager
+def recording(target: Metrics):
+    """Make target the current Metrics for the duration of the block"""
+    global _current
+    previous = _current
+    _current = target
+    try:
+        yield target
+    finally:
+        _current = previous
+
+def configure(profile_dir=None) -> Metrics:
+    """Start a fresh current Metrics, profiled into profile_dir when given"""
+    global _current
+    _current = Metrics(Profiler(profile_dir) if profile_dir else None)
+    return _current
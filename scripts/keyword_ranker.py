@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Corpus Keyword Ranker
+Scores every section's terms against the whole library (TF-IDF or BM25) and
+rewrites each section's keywords as a ranked list with scores
+
+Run after the extractor: python keyword_ranker.py [--scheme bm25] [--top-k 20]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not found. Install with: pip install numpy")
+    sys.exit(1)
+
+import content_format
+from content_spans import section_text
+from content_writer import dump_content
+
+TOKEN_PATTERN = re.compile(r'\b[A-Za-z]{4,}\b')
+
+# Union of the stop lists used by the extractors
+STOP_WORDS = {
+    'this', 'that', 'with', 'have', 'will', 'from', 'they', 'been',
+    'were', 'said', 'each', 'which', 'their', 'time', 'would', 'there',
+    'could', 'other', 'more', 'very', 'what', 'know', 'just', 'first',
+    'into', 'over', 'think', 'also', 'your', 'work', 'life', 'only',
+    'can', 'still', 'should', 'after', 'being', 'now', 'made', 'before',
+    'must', 'shall', 'requirements', 'standard', 'specification'
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case terms of 4+ letters without stop words (the extractors' rule)"""
+    return [word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+class TermMatrix:
+    """Sparse section x term count matrix in coordinate form.
+
+    Tokenization is the only per-section Python work; everything after it
+    operates on whole NumPy arrays.
+    """
+
+    def __init__(self, texts: List[str]):
+        vocab = {}
+        term_ids = []
+        doc_ids = []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            term_ids.extend(vocab.setdefault(token, len(vocab)) for token in tokens)
+            doc_ids.extend([doc_id] * len(tokens))
+
+        self.n_docs = len(texts)
+        self.n_terms = len(vocab)
+        self.terms = np.empty(self.n_terms, dtype=object)
+        for term, term_id in vocab.items():
+            self.terms[term_id] = term
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        keys, counts = np.unique(doc_ids * max(self.n_terms, 1) + term_ids, return_counts=True)
+        self.doc = keys // max(self.n_terms, 1)
+        self.term = keys % max(self.n_terms, 1)
+        self.count = counts.astype(np.float64)
+        self.doc_length = np.bincount(doc_ids, minlength=self.n_docs).astype(np.float64)
+        self.df = np.bincount(self.term, minlength=self.n_terms).astype(np.float64)
+
+    def tfidf(self) -> np.ndarray:
+        """L2-normalized TF-IDF weight per nonzero entry (smoothed idf)"""
+        tf = self.count / self.doc_length[self.doc]
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.df)) + 1.0
+        weights = tf * idf[self.term]
+        norms = np.sqrt(np.bincount(self.doc, weights=weights * weights, minlength=self.n_docs))
+        return weights / norms[self.doc]
+
+    def bm25(self, k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+        """Okapi BM25 term weight per nonzero entry"""
+        idf = np.log(1.0 + (self.n_docs - self.df + 0.5) / (self.df + 0.5))
+        avg_length = self.doc_length.mean() if self.n_docs else 0.0
+        length_norm = 1.0 - b + b * self.doc_length[self.doc] / (avg_length or 1.0)
+        return idf[self.term] * self.count * (k1 + 1.0) / (self.count + k1 * length_norm)
+
+    def top_k(self, weights: np.ndarray, k: int):
+        """Per section, the k highest-weighted (term, weight) pairs.
+
+        Ties are broken alphabetically so output is deterministic.
+        """
+        alpha_rank = np.empty(self.n_terms, dtype=np.int64)
+        alpha_rank[np.argsort(self.terms.astype(str), kind='stable')] = np.arange(self.n_terms)
+        order = np.lexsort((alpha_rank[self.term], -weights, self.doc))
+        doc_sorted = self.doc[order]
+        group_start = np.searchsorted(doc_sorted, np.arange(self.n_docs))
+        rank = np.arange(len(order)) - group_start[doc_sorted]
+        keep = order[rank < k]
+
+        kept_docs = self.doc[keep]
+        kept_terms = self.terms[self.term[keep]]
+        kept_weights = weights[keep]
+        bounds = np.searchsorted(kept_docs, np.arange(self.n_docs + 1))
+        return [
+            (kept_terms[bounds[i]:bounds[i + 1]].tolist(), kept_weights[bounds[i]:bounds[i + 1]].tolist())
+            for i in range(self.n_docs)
+        ]
+
+def rank_keywords(all_content: List[Dict[str, Any]], scheme: str = "tfidf", top_k: int = 20):
+    """Replace each section's keywords with corpus-ranked terms and add keyword_scores"""
+    sections = []
+    texts = []
+    for content in all_content:
+        for section in content.get('sections', []):
+            sections.append(section)
+            texts.append(f"{section.get('heading', '')} {section_text(content, section)}")
+    matrix = TermMatrix(texts)
+    weights = matrix.bm25() if scheme == "bm25" else matrix.tfidf()
+    for section, (terms, scores) in zip(sections, matrix.top_k(weights, top_k)):
+        section['keywords'] = terms
+        section['keyword_scores'] = [round(score, 4) for score in scores]
+    return matrix
+
+def find_content_dir() -> Path:
+    """Locate assets/extracted_content the same way the extractors do"""
+    for path in (Path("assets/extracted_content"), Path("../assets/extracted_content")):
+        if path.exists():
+            return path
+    return Path("assets/extracted_content")
+
+def main(argv=None):
+    """Rank keywords across every *_content.json"""
+    parser = argparse.ArgumentParser(description="Corpus-wide keyword ranking for extracted content")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    parser.add_argument("--scheme", choices=["tfidf", "bm25"], default="tfidf")
+    parser.add_argument("--top-k", type=int, default=20, help="Keywords kept per section")
+    args = parser.parse_args(argv)
+
+    print("🔑 Corpus Keyword Ranker")
+    print("=" * 40)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    content_files = content_format.find_content_files(content_dir)
+    if not content_files:
+        print(f"Error: No content files found in {content_dir}. Run the extractor first.")
+        return 1
+
+    loaded = []
+    for file_path in content_files:
+        # Keep each file's encoding and formatting (pretty or --compact)
+        fmt, indent = content_format.sniff(file_path)
+        loaded.append((file_path, content_format.load(file_path), fmt, indent))
+
+    started = time.perf_counter()
+    matrix = rank_keywords([content for _, content, _, _ in loaded], args.scheme, args.top_k)
+    elapsed = time.perf_counter() - started
+    print(f"✓ Scored {matrix.n_docs} sections, {matrix.n_terms} terms ({args.scheme}) in {elapsed:.2f}s")
+
+    for file_path, content, fmt, indent in loaded:
+        dump_content(content, file_path, indent, fmt)
+        print(f"✓ Updated: {file_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
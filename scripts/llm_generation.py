@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+LLM Generation
+Concurrent, rate-limited prompt generation over pluggable backends (Gemini or
+a deterministic offline stub)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from instrumentation import metrics
+
+class GenerationError(Exception):
+    """A prompt that could not be answered"""
+
+class PermanentGenerationError(GenerationError):
+    """A failure that retrying will not fix (bad request, missing permission)"""
+
+class GenerationBackend:
+    """Interface for text generation backends"""
+
+    name = "backend"
+    model_name = ""
+    # Generation settings that change the response (part of the cache key)
+    params = {}
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        """An answer available without a request (e.g. cached), checked before rate limiting.
+
+        Raises PermanentGenerationError when no request could answer the prompt either.
+        """
+        return None
+
+    def fallback(self, prompt: str) -> Optional[str]:
+        """An answer to use once every attempt at prompt has failed (e.g. an expired cached one)"""
+        return None
+
+    async def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+class GeminiBackend(GenerationBackend):
+    """google-generativeai backend.
+
+    The blocking client runs on a dedicated thread pool, so one backend can be
+    used from several asyncio.run() calls and up to max_workers requests are
+    in flight at once.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = "gemini-pro", max_workers: int = 8):
+        import google.generativeai as genai
+        from concurrent.futures import ThreadPoolExecutor
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def generate(self, prompt: str) -> str:
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.executor, self.model.generate_content, prompt)
+        except Exception as e:
+            # Invalid requests and auth failures will not succeed on retry
+            if type(e).__name__ in ("InvalidArgument", "PermissionDenied", "Unauthenticated", "NotFound"):
+                raise PermanentGenerationError(str(e)) from e
+            raise
+        return response.text
+
+class StubBackend(GenerationBackend):
+    """Deterministic offline backend for tests and benchmarks.
+
+    Answers topic prompts with the most frequent heading words and comparison
+    prompts with a summary built from the prompt itself. latency simulates a
+    network round trip, and fail_every makes every n-th call raise a transient
+    error so retries can be exercised.
+    """
+
+    name = "stub"
+    model_name = "stub-1"
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        call = self.calls
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_every and call % self.fail_every == 0:
+            raise GenerationError(f"stub transient failure (call {call})")
+        if "COMPARISON" in prompt:
+            return self._comparison(prompt)
+        return self._topics(prompt)
+
+    def _topics(self, prompt: str) -> str:
+        counts = {}
+        for heading in re.findall(r'^\s*- (.+)$', prompt, re.MULTILINE):
+            for word in re.findall(r'[A-Za-z]{5,}', heading):
+                word = word.lower()
+                counts[word] = counts.get(word, 0) + 1
+        words = sorted(counts, key=lambda word: (-counts[word], word))[:5]
+        return json.dumps([
+            {"title": word.title(), "description": f"How each standard covers {word}", "keywords": [word]}
+            for word in words
+        ])
+
+    def _comparison(self, prompt: str) -> str:
+        title = re.search(r'^Topic: (.+)$', prompt, re.MULTILINE)
+        title = title.group(1) if title else "this topic"
+        standards = re.findall(r'^Standard: (.+)$', prompt, re.MULTILINE)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return json.dumps({
+            "summary": f"{title} is covered by {', '.join(standards)} ({digest})",
+            "similarities": [f"{', '.join(standards)} each describe {title.lower()}"],
+            "differences": [f"{name} covers it in its own sections" for name in standards],
+            "recommendations": f"Read the referenced sections on {title.lower()} side by side"
+        })
+
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of `capacity` (one second's worth by default)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+class GenerationStats:
+    """Counters for one generation run"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "retries": self.retries, "failures": self.failures,
+                "elapsed": round(self.elapsed, 3)}
+
+async def generate_one(backend: GenerationBackend, prompt: str, semaphore: asyncio.Semaphore,
+                       bucket: Optional[TokenBucket], stats: GenerationStats, max_retries: int = 3,
+                       base_delay: float = 1.0, max_delay: float = 30.0):
+    """Answer one prompt, retrying transient failures with exponential backoff and jitter.
+
+    Returns the response text, or the last exception when every attempt
+    failed and the backend has no fallback answer.
+    """
+    try:
+        answer = backend.lookup(prompt)
+    except PermanentGenerationError as e:
+        stats.failures += 1
+        return e
+    if answer is not None:
+        return answer
+    error = None
+    for attempt in range(max(0, max_retries) + 1):
+        async with semaphore:
+            if bucket:
+                await bucket.acquire()
+            stats.requests += 1
+            recorder = metrics()
+            recorder.count("llm_requests")
+            started = time.perf_counter()
+            try:
+                response = await backend.generate(prompt)
+                recorder.observe("llm_latency", time.perf_counter() - started)
+                return response
+            except PermanentGenerationError as e:
+                recorder.count("llm_failures")
+                error = e
+                break
+            except Exception as e:
+                recorder.count("llm_errors")
+                error = e
+        if attempt < max_retries:
+            stats.retries += 1
+            # Back off outside the semaphore so other prompts keep flowing
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+    answer = backend.fallback(prompt)
+    if answer is not None:
+        metrics().count("llm_fallbacks")
+        return answer
+    stats.failures += 1
+    return error
+
+async def generate_all(backend: GenerationBackend, prompts: List[str], concurrency: int = 4,
+                       rate: Optional[float] = None, max_retries: int = 3, base_delay: float = 1.0,
+                       stats: Optional[GenerationStats] = None) -> List[Any]:
+    """Answer prompts concurrently; results (text or exception) keep the prompts' order"""
+    stats = stats or GenerationStats()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # The bucket starts with a full batch of tokens, so a rate limit slows
+    # sustained traffic without also serializing the first `concurrency` requests
+    bucket = TokenBucket(rate, max(1.0, rate, concurrency)) if rate else None
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        generate_one(backend, prompt, semaphore, bucket, stats, max_retries, base_delay)
+        for prompt in prompts
+    ))
+    stats.elapsed += time.perf_counter() - started
+    return results
+
+def run_prompts(backend: GenerationBackend, prompts: List[str], **options) -> List[Any]:
+    """Synchronous entry point for generate_all"""
+    return asyncio.run(generate_all(backend, prompts, **options))
+
+def create_backend(name: str, model_name: str = "gemini-pro", stub_latency: float = 0.0,
+                   concurrency: int = 4) -> Optional[GenerationBackend]:
+    """Backend by name, or None when Gemini is selected but not usable"""
+    if name == "stub":
+        return StubBackend(latency=stub_latency)
+    if name == "none":
+        return None
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        print("Warning: GEMINI_API_KEY not set.")
+        return None
+    try:
+        return GeminiBackend(api_key, model_name, max_workers=max(1, concurrency))
+    except ImportError:
+        print("google-generativeai not installed.")
+        return None
+
+def extract_json(text: str, open_char: str, close_char: str) -> Any:
+    """Parse the outermost JSON array/object in a model response"""
+    start_idx = text.find(open_char)
+    end_idx = text.rfind(close_char) + 1
+    if start_idx == -1 or end_idx <= start_idx:
+        raise ValueError("no JSON in response")
+    return json.loads(text[start_idx:end_idx])
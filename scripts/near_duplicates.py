@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Sections
+Finds sections of different standards that say nearly the same thing: MinHash
+signatures over word shingles, LSH banding for candidate pairs, and an
+estimated Jaccard similarity per pair
+
+Run after the extractor: python near_duplicates.py [--threshold 0.3]
+"""
+
+import argparse
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not found. Install with: pip install numpy")
+    sys.exit(1)
+
+import content_format
+from content_spans import section_text
+from section_index import standard_name, tokenize
+
+# Largest prime below 2**31: a * hash + b stays below 2**64 for 32-bit hashes
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Shingles hashed per block, bounding the (shingles x permutations) array
+HASH_BLOCK = 4096
+
+def shingle_hashes(text: str, size: int) -> np.ndarray:
+    """Distinct CRC-32 hashes of the text's `size`-word shingles"""
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = (" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+    return np.unique(np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64))
+
+class MinHasher:
+    """num_perm universal hash functions (a * x + b) mod p, fixed by seed"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """Minimum of each hash function over a set of shingle hashes"""
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(hashes), HASH_BLOCK):
+            block = hashes[start:start + HASH_BLOCK, None]
+            np.minimum(signature, ((block * self.a + self.b) % MERSENNE_PRIME).min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+def candidate_pairs(signatures: np.ndarray, groups: np.ndarray, bands: int) -> np.ndarray:
+    """(i, j) rows, i < j in different groups, that share a bucket in any band.
+
+    Each band's rows are hashed by sorting their bytes, so finding candidates
+    costs a sort per band plus the pairs themselves instead of comparing
+    every section with every other.
+    """
+    n_rows, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = set()
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], n_rows]
+        for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            members = np.sort(order[start:end])
+            for offset, i in enumerate(members[:-1]):
+                for j in members[offset + 1:]:
+                    if groups[i] != groups[j]:
+                        pairs.add((int(i), int(j)))
+    return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+def find_near_duplicates(all_content: List[Dict[str, Any]], shingle_size: int = 3, num_perm: int = 128,
+                         bands: int = 64, threshold: float = 0.3, min_words: int = 20) -> Dict[str, Any]:
+    """Cross-standard section pairs with estimated Jaccard similarity >= threshold"""
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+
+    hasher = MinHasher(num_perm)
+    refs = []
+    groups = []
+    signatures = []
+    for std_id, content in enumerate(all_content):
+        for section_id, section in enumerate(content.get('sections', [])):
+            text = section_text(content, section)
+            # Short sections share too few shingles to say anything
+            if len(text.split()) < min_words:
+                continue
+            refs.append((content, section_id, section))
+            groups.append(std_id)
+            signatures.append(hasher.signature(shingle_hashes(text, shingle_size)))
+    signatures = np.array(signatures, dtype=np.uint32).reshape(-1, num_perm)
+
+    candidates = candidate_pairs(signatures, np.array(groups), bands)
+    similarity = (signatures[candidates[:, 0]] == signatures[candidates[:, 1]]).mean(axis=1)
+    keep = np.flatnonzero(similarity >= threshold)
+    # Most similar first, then document order
+    keep = keep[np.lexsort((candidates[keep, 1], candidates[keep, 0], -similarity[keep]))]
+
+    def describe(row: int) -> Dict[str, Any]:
+        content, section_id, section = refs[row]
+        return {
+            "standard": standard_name(content),
+            "section": section_id,
+            "heading": section.get('heading', ''),
+            "page": section.get('page_start', 1)
+        }
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "shingle_size": shingle_size,
+        "num_perm": num_perm,
+        "bands": bands,
+        "threshold": threshold,
+        "sections_hashed": len(refs),
+        "candidates": len(candidates),
+        "pairs": [
+            {"similarity": round(float(similarity[i]), 4), "a": describe(candidates[i, 0]),
+             "b": describe(candidates[i, 1])}
+            for i in keep
+        ]
+    }
+
+def pairs_by_section(duplicates: Dict[str, Any], all_content: List[Dict[str, Any]]) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+    """(standard, section index) -> the pairs it belongs to.
+
+    Pairs whose headings no longer match the loaded content (it was
+    re-extracted after near_duplicates.py ran) are dropped.
+    """
+    headings = {
+        (standard_name(content), section_id): section.get('heading', '')
+        for content in all_content
+        for section_id, section in enumerate(content.get('sections', []))
+    }
+    lookup = {}
+    for pair in duplicates.get('pairs', []):
+        keys = [(side['standard'], side['section']) for side in (pair['a'], pair['b'])]
+        if all(headings.get(key) == side['heading'] for key, side in zip(keys, (pair['a'], pair['b']))):
+            for key in keys:
+                lookup.setdefault(key, []).append(pair)
+    return lookup
+
+def find_content_dir() -> Path:
+    """Locate assets/extracted_content the same way the extractors do"""
+    for path in (Path("assets/extracted_content"), Path("../assets/extracted_content")):
+        if path.exists():
+            return path
+    return Path("assets/extracted_content")
+
+def main(argv=None):
+    """Write near-duplicate section pairs for every *_content.json"""
+    parser = argparse.ArgumentParser(description="Find near-duplicate sections across standards")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    parser.add_argument("--output", default=None, help="Pairs JSON (default: assets/near_duplicates.json)")
+    parser.add_argument("--shingle-size", type=int, default=3, help="Words per shingle")
+    parser.add_argument("--num-perm", type=int, default=128, help="MinHash functions per signature")
+    parser.add_argument("--bands", type=int, default=64, help="LSH bands (num-perm must be a multiple)")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Lowest estimated Jaccard similarity kept")
+    parser.add_argument("--min-words", type=int, default=20, help="Skip sections with fewer words")
+    args = parser.parse_args(argv)
+
+    print("🔎 Near-Duplicate Sections")
+    print("=" * 40)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    content_files = content_format.find_content_files(content_dir)
+    if len(content_files) < 2:
+        print(f"Error: Need at least 2 content files in {content_dir}. Run the extractor first.")
+        return 1
+    all_content = [content_format.load(file_path) for file_path in content_files]
+
+    started = time.perf_counter()
+    try:
+        duplicates = find_near_duplicates(all_content, args.shingle_size, args.num_perm, args.bands,
+                                          args.threshold, args.min_words)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"✓ Hashed {duplicates['sections_hashed']} sections, {duplicates['candidates']} candidate pairs, "
+          f"{len(duplicates['pairs'])} at or above {args.threshold:g} in {elapsed:.2f}s")
+
+    output_file = Path(args.output) if args.output else content_dir.parent / "near_duplicates.json"
+    content_format.dump(duplicates, output_file, "json")
+    print(f"✓ Saved to: {output_file}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Page Store
+All page and section text of a corpus in one UTF-8 blob (page_text.bin) plus a
+fixed-width offset table (page_text.idx) mapping (document, page or section)
+to a byte range. PageStore memory-maps both, so opening costs a header read
+and a page or preview decodes only the bytes it returns
+
+Build:  python page_store.py build
+Read:   python page_store.py show pmbok7 --page 12 | --section 40 [--preview 200]
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import content_format
+from content_spans import section_text
+from search_index import find_content_dir, standard_name
+
+BLOB_NAME = "page_text.bin"
+INDEX_NAME = "page_text.idx"
+
+MAGIC = b"PTX1"
+# magic, document count, record count, blob size, length of the documents JSON
+HEADER = struct.Struct("<4sIIQI")
+# document id, kind, page or section number, byte offset, byte length
+RECORD = struct.Struct("<IIIQI")
+
+PAGE = 0
+SECTION = 1
+
+# Longest UTF-8 encoding of one character
+MAX_CHAR_BYTES = 4
+
+def write_page_store(content_files: List[Path], directory) -> Dict[str, Any]:
+    """Write the blob and offset table for content_files into directory.
+
+    Documents are loaded one at a time and their text is appended to the
+    blob as it is encoded, so memory is bounded by the largest document plus
+    the records. Both files are replaced atomically, blob first, so readers
+    holding the old maps keep working.
+    """
+    directory = Path(directory)
+    blob_path, index_path = directory / BLOB_NAME, directory / INDEX_NAME
+    blob_tmp = blob_path.with_name(blob_path.name + ".tmp")
+    documents = []
+    records = []
+    offset = 0
+    with open(blob_tmp, 'wb') as blob:
+        for doc_id, path in enumerate(content_files):
+            path = Path(path)
+            content = content_format.load(path)
+            stat = path.stat()
+            pages = content.get('full_text_by_page', {})
+            sections = content.get('sections', [])
+            documents.append({"standard": standard_name(content), "source": path.name,
+                              "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                              "pages": len(pages), "sections": len(sections)})
+            items = [(PAGE, int(page), text) for page, text in pages.items()]
+            items += [(SECTION, number, section_text(content, section)) for number, section in enumerate(sections)]
+            for kind, number, text in items:
+                data = text.encode('utf-8')
+                blob.write(data)
+                records.append((doc_id, kind, number, offset, len(data)))
+                offset += len(data)
+
+    records.sort()
+    names = json.dumps(documents, ensure_ascii=False).encode('utf-8')
+    index_tmp = index_path.with_name(index_path.name + ".tmp")
+    with open(index_tmp, 'wb') as index:
+        index.write(HEADER.pack(MAGIC, len(documents), len(records), offset, len(names)))
+        index.write(names)
+        packed = bytearray(RECORD.size * len(records))
+        for i, record in enumerate(records):
+            RECORD.pack_into(packed, i * RECORD.size, *record)
+        index.write(packed)
+
+    os.replace(blob_tmp, blob_path)
+    os.replace(index_tmp, index_path)
+    return {"documents": len(documents), "records": len(records), "bytes": offset}
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    with open(path, 'rb') as f:
+        # Empty files cannot be mapped (a corpus without any text)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+
+class _Keys:
+    """The (document, kind, number) keys of the mapped records as a lazy sequence for bisect"""
+
+    def __init__(self, index: mmap.mmap, start: int, count: int):
+        self.index = index
+        self.start = start
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int]:
+        return RECORD.unpack_from(self.index, self.start + i * RECORD.size)[:3]
+
+class PageStore:
+    """Read-only, memory-mapped view of a page store"""
+
+    def __init__(self, directory):
+        directory = Path(directory)
+        self.index = _map(directory / INDEX_NAME)
+        if self.index is None or len(self.index) < HEADER.size:
+            raise ValueError(f"{directory / INDEX_NAME} is not a page store index")
+        magic, n_docs, n_records, blob_size, names_size = HEADER.unpack_from(self.index, 0)
+        if magic != MAGIC:
+            self.index.close()
+            raise ValueError(f"{directory / INDEX_NAME} is not a page store index")
+        self.documents = json.loads(self.index[HEADER.size:HEADER.size + names_size].decode('utf-8'))
+        self._ids = {document["standard"]: doc_id for doc_id, document in enumerate(self.documents)}
+        self._keys = _Keys(self.index, HEADER.size + names_size, n_records)
+        self.blob = _map(directory / BLOB_NAME)
+        # Slices of the view decode straight from the mapped pages, without a bytes copy
+        self._view = memoryview(self.blob) if self.blob is not None else memoryview(b"")
+        if len(self._view) != blob_size:
+            self.close()
+            raise ValueError(f"{directory / BLOB_NAME} does not match its index (rebuild the page store)")
+
+    def close(self):
+        self._view.release()
+        for mapped in (self.blob, self.index):
+            if mapped is not None:
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def standards(self) -> List[str]:
+        return list(self._ids)
+
+    def is_current(self, content_files: List[Path]) -> bool:
+        """True when the store was built from exactly these content files, unchanged since"""
+        if len(content_files) != len(self.documents):
+            return False
+        for path, document in zip(content_files, self.documents):
+            stat = Path(path).stat()
+            if (Path(path).name, stat.st_mtime_ns, stat.st_size) != \
+                    (document["source"], document["mtime_ns"], document["size"]):
+                return False
+        return True
+
+    def _range(self, standard: str, kind: int, number: int) -> Optional[Tuple[int, int]]:
+        doc_id = self._ids.get(standard)
+        if doc_id is None:
+            return None
+        key = (doc_id, kind, number)
+        slot = bisect.bisect_left(self._keys, key)
+        if slot == len(self._keys) or self._keys[slot] != key:
+            return None
+        _, _, _, offset, length = RECORD.unpack_from(self.index, self._keys.start + slot * RECORD.size)
+        return offset, length
+
+    def _text(self, byte_range: Optional[Tuple[int, int]], chars: Optional[int] = None) -> Optional[str]:
+        if byte_range is None:
+            return None
+        offset, length = byte_range
+        if chars is None:
+            return str(self._view[offset:offset + length], 'utf-8')
+        # chars characters take at most MAX_CHAR_BYTES bytes each; a character
+        # cut at the end of the slice is dropped by errors="ignore"
+        length = min(length, chars * MAX_CHAR_BYTES)
+        return str(self._view[offset:offset + length], 'utf-8', 'ignore')[:chars]
+
+    def page(self, standard: str, page: int, chars: Optional[int] = None) -> Optional[str]:
+        """Text of one page (its first chars characters when given), None if absent"""
+        return self._text(self._range(standard, PAGE, page), chars)
+
+    def section(self, standard: str, section: int, chars: Optional[int] = None) -> Optional[str]:
+        """Text of one section by index, as content_spans.section_text returns it"""
+        return self._text(self._range(standard, SECTION, section), chars)
+
+    def preview(self, standard: str, section: int, chars: int = 200) -> Optional[str]:
+        """First chars characters of a section, decoding nothing beyond them"""
+        return self.section(standard, section, chars)
+
+    def page_numbers(self, standard: str) -> List[int]:
+        """Stored page numbers of a document, in order"""
+        doc_id = self._ids.get(standard)
+        if doc_id is None:
+            return []
+        first = bisect.bisect_left(self._keys, (doc_id, PAGE, 0))
+        last = bisect.bisect_left(self._keys, (doc_id, SECTION, 0))
+        return [self._keys[i][2] for i in range(first, last)]
+
+def open_page_store(directory, content_files: Optional[List[Path]] = None) -> Optional[PageStore]:
+    """The page store in directory, or None when it is missing, unreadable or
+    (given content_files) older than the content it was built from"""
+    try:
+        store = PageStore(directory)
+    except (OSError, ValueError):
+        return None
+    if content_files is not None and not store.is_current(content_files):
+        store.close()
+        return None
+    return store
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped page and section text store")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files (and the store)")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("build", help="Write page_text.bin and page_text.idx (default)")
+    show_parser = subparsers.add_parser("show", help="Print one page or section")
+    show_parser.add_argument("standard")
+    target = show_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--page", type=int)
+    target.add_argument("--section", type=int)
+    show_parser.add_argument("--preview", type=int, default=None, help="Only the first N characters")
+    args = parser.parse_args(argv)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+
+    if args.command == "show":
+        started = time.perf_counter()
+        try:
+            store = PageStore(content_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}. Run: python page_store.py build")
+            return 1
+        opened = time.perf_counter() - started
+        with store:
+            if args.page is not None:
+                text = store.page(args.standard, args.page, args.preview)
+            else:
+                text = store.section(args.standard, args.section, args.preview)
+        if text is None:
+            print(f"Error: {args.standard} has no {'page' if args.page is not None else 'section'} "
+                  f"{args.page if args.page is not None else args.section}")
+            return 1
+        print(text)
+        print(f"⏱ Opened store in {opened * 1000:.2f} ms", file=sys.stderr)
+        return 0
+
+    print("📄 Page Store")
+    print("=" * 40)
+    content_files = content_format.find_content_files(content_dir)
+    if not content_files:
+        print(f"Error: No content files found in {content_dir}. Run the extractor first.")
+        return 1
+
+    started = time.perf_counter()
+    stats = write_page_store(content_files, content_dir)
+    elapsed = time.perf_counter() - started
+    print(f"✓ Stored {stats['records']} pages and sections of {stats['documents']} documents "
+          f"({stats['bytes'] / 1024:.0f} KB of text) in {elapsed:.2f}s")
+    print(f"✓ Saved: {content_dir / BLOB_NAME}, {content_dir / INDEX_NAME}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
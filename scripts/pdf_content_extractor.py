@@ -4,40 +4,66 @@ PDF Content Extractor for Standards Comparison
 Extracts headings, content, and page numbers from PDF files
 """
 
-import json
 import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 
-# Try to import required libraries with error handling
-try:
-    import fitz  # PyMuPDF - better for text extraction
-    HAS_PYMUPDF = True
-except ImportError:
-    print("Warning: PyMuPDF not found. Install with: pip install PyMuPDF")
-    HAS_PYMUPDF = False
+from content_format import FORMATS, find_content_files, output_name
+from content_writer import ContentCollector, NullWriter, StreamingContentWriter, dump_content
+from extraction_cache import ExtractionCache
+from heading_classifier import HeadingClassifier, load_heading_rules, load_rules_config
+from instrumentation import Metrics, configure, metrics, recording
+from pdf_outline import Outline, load_outline
+from pdf_pages import BACKENDS, HAS_PYMUPDF, HAS_PYPDF2, PageBackend, available_backends, get_backend
+from section_builder import HeadingRecord, SectionRecord, add_span
+
+# Bump when a change to the extraction logic alters the output
+EXTRACTOR_VERSION = "1.0"
 
-try:
-    import PyPDF2
-    HAS_PYPDF2 = True
-except ImportError:
+# Page text comes from pdf_pages.py backends (PyMuPDF, pypdf/PyPDF2, pdftotext)
+if not HAS_PYMUPDF:
+    print("Warning: PyMuPDF not found. Install with: pip install PyMuPDF")
+if not HAS_PYPDF2:
     print("Warning: PyPDF2 not found. Install with: pip install PyPDF2")
-    HAS_PYPDF2 = False
 
-if not HAS_PYMUPDF and not HAS_PYPDF2:
+if not available_backends():
     print("Error: No PDF processing library available. Please install PyMuPDF or PyPDF2")
     sys.exit(1)
 
 class PDFContentExtractor:
-    def __init__(self):
-        self.heading_patterns = [
-            r'^(\d+\.?\d*\.?\d*)\s+([A-Z][^.]*)',  # Numbered headings
-            r'^([A-Z][A-Z\s]{10,})',  # ALL CAPS headings
-            r'^(Chapter|Section|Part)\s+(\d+)',  # Chapter/Section patterns
-            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',  # Title case with colon
-        ]
+    def __init__(self, standard: str = None, rules_path: str = None, content_spans: bool = False,
+                 backend=None, outline: bool = False):
+        # Heading rules come from heading_rules.json (per-standard overrides
+        # keyed by PDF file stem), falling back to the built-in defaults
+        self.classifier = HeadingClassifier(load_heading_rules(rules_path, standard))
+        self.heading_patterns = self.classifier.patterns
+        # Write section text as [page, start, end] spans into full_text_by_page
+        self.content_spans = content_spans
+        # Every backend feeds the same heading and section engine
+        self.backend = backend if isinstance(backend, PageBackend) else get_backend(backend)
+        # Take headings from the PDF's bookmarks where it has usable ones
+        self.use_outline = outline
+    
+    def output_fields(self) -> Dict[str, Any]:
+        """Extra top-level fields describing the output format"""
+        return {"content_spans_mode": "lines"} if self.content_spans else {}
+    
+    def load_outline(self, pdf_path: str) -> Outline:
+        """The PDF's usable bookmark outline, or None to classify every line"""
+        if not self.use_outline:
+            return None
+        with metrics().stage("outline"):
+            try:
+                outline = load_outline(self.backend.outline(pdf_path))
+            except Exception as e:
+                # A damaged outline must not fail the document; classify lines instead
+                print(f"Warning: could not read the outline of {os.path.basename(pdf_path)} ({e}), "
+                      f"classifying lines instead")
+                outline = None
+        metrics().count("outline_documents" if outline else "outline_fallbacks")
+        return outline
     
     def extract_pdf_content(self, pdf_path: str):
         """Extract structured content from PDF"""
@@ -46,136 +72,192 @@ class PDFContentExtractor:
             return None
             
         try:
-            if HAS_PYMUPDF:
-                return self._extract_with_pymupdf(pdf_path)
-            elif HAS_PYPDF2:
-                return self._extract_with_pypdf2(pdf_path)
-            else:
-                print("Error: No PDF processing library available")
-                return None
+            total_pages = self.backend.page_count(pdf_path)
+            shard = self._extract_page_range(pdf_path, 0, total_pages)
+            return self.merge_shards(pdf_path, total_pages, [shard])
         except Exception as e:
             print(f"Error extracting content from {pdf_path}: {e}")
             return None
     
-    def _extract_with_pymupdf(self, pdf_path: str):
-        """Extract content using PyMuPDF"""
-        doc = fitz.open(pdf_path)
-        content = {
-            "file_name": os.path.basename(pdf_path),
-            "total_pages": len(doc),
-            "sections": [],
-            "full_text_by_page": {},
-            "headings": []
-        }
+    def extract_pdf_streaming(self, pdf_path: str, output_file: str, indent=2, compress=False) -> bool:
+        """Extract, writing pages, headings and sections to disk as they complete"""
+        total_pages = self.backend.page_count(pdf_path)
+        with StreamingContentWriter(output_file, os.path.basename(pdf_path), total_pages, indent,
+                                    self.output_fields(), compress) as writer:
+            for section in self.iter_sections(pdf_path, writer):
+                writer.write_section(section)
+        return True
+    
+    def iter_sections(self, pdf_path: str, writer=None) -> Iterator[Dict[str, Any]]:
+        """Completed sections of a PDF, one at a time in document order.
         
+        Pages are read one at a time and each section is yielded as soon as the
+        next heading closes it, so memory is bounded by the largest section.
+        Pages and headings go to writer when one is given and are dropped
+        otherwise.
+        """
+        outline = self.load_outline(pdf_path)
+        pages = self.backend.iter_pages(pdf_path)
+        try:
+            shard = new_shard(0, None)
+            for section in self._iter_page_range(pages, shard, writer or NullWriter(), leading=False,
+                                                 outline=outline):
+                yield section.to_dict(self.content_spans)
+            if shard["open_section"]:
+                section = shard["open_section"]
+                self._finish_section(section)
+                yield section.to_dict(self.content_spans)
+        finally:
+            pages.close()
+    
+    def _extract_page_range(self, pdf_path: str, start: int, end: int, writer=None) -> Dict[str, Any]:
+        """Extract pages [start, end) of a PDF into a shard.
+        
+        Lines that appear before the first heading of the range belong to the
+        section left open by the previous shard, so they are kept separately as
+        leading content. The last section is left open for the next shard.
+        When a writer is given, pages, headings and closed sections go straight
+        to it instead of being kept in the shard.
+        """
+        shard = new_shard(start, end)
+        pages = self.backend.iter_pages(pdf_path, start, end)
+        for section in self._iter_page_range(pages, shard, writer, outline=self.load_outline(pdf_path)):
+            if writer:
+                writer.write_section(section.to_dict(self.content_spans))
+            else:
+                shard["sections"].append(section)
+        return shard
+    
+    def _iter_page_range(self, pages, shard: Dict[str, Any], writer=None,
+                         leading: bool = True, outline: Outline = None) -> Iterator[SectionRecord]:
+        """Classify (page number, text) pairs into shard, yielding each section as it closes.
+        
+        Pages and headings go to writer, or into the shard without one. The
+        section still open after the last page is left in shard["open_section"].
+        leading=False drops lines before the first heading instead of keeping
+        them for a previous shard. Pages the outline covers take their headings
+        from it; the rest are classified line by line.
+        """
         current_section = None
+        recorder = metrics()
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
+        for page_num, text in recorder.timed(pages, "parse"):
+            recorder.count("pages")
             
             # Store full text for each page
-            content["full_text_by_page"][page_num + 1] = text
+            if writer:
+                writer.write_page(page_num, text)
+            else:
+                shard["pages"][page_num] = text
             
-            # Extract headings and sections
-            lines = text.split('\n')
-            for line_num, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-                
+            # Extract headings and sections, classifying the page's lines in one batch
+            lines, bounds = self._split_lines(text)
+            if outline and outline.covers(page_num):
+                with recorder.stage("outline"):
+                    events, unmatched = outline.page_events(page_num, lines, bounds)
+                recorder.count("outline_unmatched", unmatched)
+            else:
+                with recorder.stage("classify"):
+                    events = zip(lines, bounds, self.classifier.classify_lines(lines))
+                recorder.count("lines_classified", len(lines))
+            for line, line_bounds, heading_info in events:
                 # Check if line is a heading
-                heading_info = self._identify_heading(line)
                 if heading_info:
+                    recorder.count("headings")
                     # Save previous section if exists
                     if current_section:
-                        content["sections"].append(current_section)
+                        self._finish_section(current_section)
+                        yield current_section
                     
                     # Start new section
-                    current_section = {
-                        "heading": heading_info["text"],
-                        "level": heading_info["level"],
-                        "page_start": page_num + 1,
-                        "page_end": page_num + 1,
-                        "content": "",
-                        "keywords": []
-                    }
+                    current_section = SectionRecord(heading_info["text"], heading_info["level"], page_num)
                     
-                    content["headings"].append({
-                        "text": heading_info["text"],
-                        "page": page_num + 1,
-                        "level": heading_info["level"]
-                    })
+                    heading = HeadingRecord(heading_info["text"], page_num, heading_info["level"])
+                    if writer:
+                        writer.write_heading(heading.to_dict())
+                    else:
+                        shard["headings"].append(heading)
                 
                 elif current_section:
                     # Add content to current section
-                    current_section["content"] += line + " "
-                    current_section["page_end"] = page_num + 1
+                    current_section.add_line(line, page_num, *line_bounds)
+                
+                elif leading:
+                    # Continuation of a section opened in an earlier shard
+                    shard["leading_lines"].append(line)
+                    add_span(shard["leading_spans"], page_num, *line_bounds)
+                    shard["leading_page_end"] = page_num
+        
+        shard["open_section"] = current_section
+    
+    @staticmethod
+    def _split_lines(text: str):
+        """Stripped non-empty lines of a page and each one's [start, end) in the raw text"""
+        lines = []
+        bounds = []
+        position = 0
+        for raw_line in text.split('\n'):
+            line = raw_line.strip()
+            if line:
+                lines.append(line)
+                bounds.append((position, position + len(raw_line)))
+            position += len(raw_line) + 1
+        return lines, bounds
+    
+    def _finish_section(self, section: SectionRecord):
+        """Join a section's text and extract its keywords"""
+        recorder = metrics()
+        with recorder.stage("keywords"):
+            section.keywords = self._extract_keywords(section.finish())
+        recorder.count("sections")
+    
+    def _close_section(self, section: SectionRecord, sections: List[SectionRecord], writer=None):
+        """Finish a section and hand it to the writer or section list"""
+        self._finish_section(section)
+        if writer:
+            writer.write_section(section.to_dict(self.content_spans))
+        else:
+            sections.append(section)
+    
+    def merge_shards(self, pdf_path: str, total_pages: int, shards: List[Dict[str, Any]], writer=None):
+        """Merge page-range shards (in page order) into one content structure.
+        
+        Returns the content dict, or None when the result is streamed to writer.
+        """
+        collector = None
+        if writer is None:
+            collector = writer = ContentCollector(os.path.basename(pdf_path), total_pages, self.output_fields())
+        
+        current_section = None
+        
+        for shard in shards:
+            # Timings and counters recorded by a shard's worker process
+            metrics().merge(shard.get("metrics"))
+            for page_num, text in shard["pages"].items():
+                writer.write_page(page_num, text)
+            for heading in shard["headings"]:
+                writer.write_heading(heading.to_dict())
+            
+            # Carry the previous shard's open section across the boundary
+            if current_section:
+                current_section.extend(shard["leading_lines"], shard["leading_page_end"], shard["leading_spans"])
+            
+            if shard["open_section"]:
+                if current_section:
+                    self._close_section(current_section, None, writer)
+                for section in shard["sections"]:
+                    writer.write_section(section.to_dict(self.content_spans))
+                current_section = shard["open_section"]
         
         # Add last section
         if current_section:
-            content["sections"].append(current_section)
-        
-        # Extract keywords for each section
-        for section in content["sections"]:
-            section["keywords"] = self._extract_keywords(section["content"])
+            self._close_section(current_section, None, writer)
         
-        doc.close()
-        return content
-    
-    def _extract_with_pypdf2(self, pdf_path: str):
-        """Extract content using PyPDF2 (fallback method)"""
-        try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                content = {
-                    "file_name": os.path.basename(pdf_path),
-                    "total_pages": len(reader.pages),
-                    "sections": [],
-                    "full_text_by_page": {},
-                    "headings": []
-                }
-                
-                for page_num in range(len(reader.pages)):
-                    page = reader.pages[page_num]
-                    text = page.extract_text()
-                    content["full_text_by_page"][page_num + 1] = text
-                    
-                    # Simple heading extraction for PyPDF2
-                    lines = text.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line and len(line) < 100 and (line.isupper() or re.match(r'^\d+\.', line)):
-                            content["headings"].append({
-                                "text": line,
-                                "page": page_num + 1,
-                                "level": 1
-                            })
-                
-                return content
-        except Exception as e:
-            print(f"Error with PyPDF2: {e}")
-            return None
+        return collector.content if collector else None
     
     def _identify_heading(self, line: str) -> Dict[str, Any]:
         """Identify if a line is a heading and determine its level"""
-        for i, pattern in enumerate(self.heading_patterns):
-            match = re.match(pattern, line)
-            if match:
-                return {
-                    "text": line,
-                    "level": i + 1,
-                    "pattern_matched": pattern
-                }
-        
-        # Additional heuristics
-        if len(line) < 100 and line.isupper() and len(line.split()) > 1:
-            return {"text": line, "level": 2, "pattern_matched": "uppercase"}
-        
-        if len(line) < 80 and line.endswith(':') and not line.startswith(' '):
-            return {"text": line, "level": 3, "pattern_matched": "colon_ending"}
-        
-        return None
+        return self.classifier.classify(line)
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract important keywords from text"""
@@ -194,33 +276,335 @@ class PDFContentExtractor:
         keywords = [word for word in set(words) if word not in stop_words and len(word) > 3]
         return sorted(keywords)[:20]  # Top 20 keywords
 
-def main():
+def new_shard(start: int, end: int) -> Dict[str, Any]:
+    """Empty result for pages [start, end) (see PDFContentExtractor._extract_page_range)"""
+    return {
+        "start": start,
+        "end": end,
+        "pages": {},
+        "headings": [],
+        "sections": [],
+        "leading_lines": [],
+        "leading_spans": [],
+        "leading_page_end": None,
+        "open_section": None
+    }
+
+def extract_shard(pdf_path: str, start: int, end: int, rules_path: str = None, backend: str = None,
+                  outline: bool = False) -> Dict[str, Any]:
+    """Extract one page range with its own document handle (runs in a worker process)"""
+    with recording(Metrics()) as shard_metrics:
+        extractor = PDFContentExtractor(Path(pdf_path).stem, rules_path, backend=backend, outline=outline)
+        shard = extractor._extract_page_range(pdf_path, start, end)
+    shard["metrics"] = shard_metrics.snapshot()
+    return shard
+
+def page_ranges(total_pages: int, shards: int) -> List[tuple]:
+    """Split [0, total_pages) into at most `shards` contiguous, near-equal ranges"""
+    shards = max(1, min(shards, total_pages))
+    size, extra = divmod(total_pages, shards)
+    ranges = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def extract_pdf_sharded(pdf_path: str, pool, shards: int, writer=None, options: Dict[str, Any] = None):
+    """Extract one PDF by fanning its page ranges out over a process pool.
+    
+    Shards are merged in page order as they arrive; with a streaming writer
+    each shard is written out and dropped before the next one is merged.
+    """
+    options = options or {}
+    if not os.path.exists(pdf_path):
+        print(f"Error: PDF file not found: {pdf_path}")
+        return None
+    
+    extractor = PDFContentExtractor(Path(pdf_path).stem, options.get("rules_path"), options.get("content_spans", False),
+                                    options.get("backend"))
+    total_pages = extractor.backend.page_count(pdf_path)
+    
+    ranges = page_ranges(total_pages, shards)
+    futures = [pool.submit(extract_shard, pdf_path, start, end, options.get("rules_path"), options.get("backend"),
+                           options.get("outline", False))
+               for start, end in ranges]
+    results = (future.result() for future in futures)
+    return extractor.merge_shards(pdf_path, total_pages, results, writer)
+
+def output_path(pdf_file: Path, output_directory: str, fmt: str = "json") -> Path:
+    """Location of the *_content file for a PDF (*_content.json by default)"""
+    return Path(output_directory) / output_name(f"{pdf_file.stem}_content", fmt)
+
+def save_content(content: Dict[str, Any], pdf_file: Path, output_directory: str, indent=2,
+                 fmt: str = "json") -> Path:
+    """Write extracted content to <output_directory>/<stem>_content.<format extension>"""
+    output_file = output_path(pdf_file, output_directory, fmt)
+    with metrics().stage("serialize"):
+        dump_content(content, output_file, indent, fmt)
+    return output_file
+
+def extraction_options(args) -> Dict[str, Any]:
+    """Options shared by every extraction path, built from the command line"""
+    return {
+        "stream": args.stream,
+        "indent": None if args.compact else 2,
+        "rules_path": args.heading_rules,
+        "content_spans": args.content_spans,
+        "format": args.format,
+        "backend": args.backend,
+        "outline": args.outline
+    }
+
+def process_pdf_file(pdf_path: str, output_directory: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Extract a single PDF and write its *_content.json (safe to run in a worker process).
+    
+    The result carries this file's metrics snapshot for the parent to merge.
+    """
+    options = options or {}
+    indent = options.get("indent", 2)
+    fmt = options.get("format", "json")
+    pdf_file = Path(pdf_path)
+    result = {"file_name": pdf_file.name, "pdf_path": str(pdf_file), "output_file": None, "error": None}
+    
+    with recording(Metrics(metrics().profiler)) as file_metrics:
+        try:
+            extractor = PDFContentExtractor(pdf_file.stem, options.get("rules_path"), options.get("content_spans", False),
+                                            options.get("backend"), options.get("outline", False))
+            if options.get("stream"):
+                output_file = output_path(pdf_file, output_directory, fmt)
+                with file_metrics.stage("extract"):
+                    extractor.extract_pdf_streaming(str(pdf_file), str(output_file), indent, fmt == "json.gz")
+                result["output_file"] = str(output_file)
+            else:
+                with file_metrics.stage("extract"):
+                    content = extractor.extract_pdf_content(str(pdf_file))
+                if content:
+                    # Save extracted content (JSON unless another format was requested)
+                    result["output_file"] = str(save_content(content, pdf_file, output_directory, indent, fmt))
+                else:
+                    result["error"] = "no content extracted"
+            if result["output_file"]:
+                file_metrics.count("bytes_written", os.path.getsize(result["output_file"]))
+        except Exception as e:
+            result["error"] = str(e)
+    
+    result["metrics"] = file_metrics.snapshot()
+    return result
+
+def _report_result(result: Dict[str, Any], done: int, total: int, cache: ExtractionCache = None,
+                   fmt: str = "json"):
+    """Print per-file progress for a finished extraction and record it in the cache"""
+    metrics().merge(result.get("metrics"))
+    if result["output_file"]:
+        if cache:
+            cache.record(result["pdf_path"], result["output_file"], output_format=fmt)
+        print(f"[{done}/{total}] ✓ Extracted content saved to: {result['output_file']}")
+    else:
+        print(f"[{done}/{total}] ✗ Failed to extract content from: {result['file_name']} ({result['error']})")
+
+def run_parallel(pdf_files: List[Path], output_directory: str, workers: int, cache: ExtractionCache = None,
+                 options: Dict[str, Any] = None) -> int:
+    """Extract PDFs in a process pool, writing each file as soon as it finishes"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    fmt = (options or {}).get("format", "json")
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_pdf_file, str(pdf_file), output_directory, options): pdf_file
+            for pdf_file in pdf_files
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            pdf_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died (e.g. crashed inside the PDF library)
+                result = {"file_name": pdf_file.name, "pdf_path": str(pdf_file), "output_file": None, "error": str(e)}
+            if result["error"]:
+                failures += 1
+            _report_result(result, done, len(pdf_files), cache, fmt)
+    
+    return failures
+
+def run_sharded(pdf_files: List[Path], output_directory: str, workers: int, shards: int,
+                cache: ExtractionCache = None, options: Dict[str, Any] = None) -> int:
+    """Extract PDFs one after another, each split into page-range shards across the pool"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    options = options or {}
+    indent = options.get("indent", 2)
+    fmt = options.get("format", "json")
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, pdf_file in enumerate(pdf_files, start=1):
+            print(f"Processing: {pdf_file.name} ({shards} shards)")
+            result = {"file_name": pdf_file.name, "pdf_path": str(pdf_file), "output_file": None, "error": None}
+            try:
+                if options.get("stream"):
+                    output_file = output_path(pdf_file, output_directory, fmt)
+                    extractor = PDFContentExtractor(content_spans=options.get("content_spans", False),
+                                                    backend=options.get("backend"))
+                    total_pages = extractor.backend.page_count(str(pdf_file))
+                    extra = extractor.output_fields()
+                    with metrics().stage("extract"), \
+                            StreamingContentWriter(output_file, pdf_file.name, total_pages, indent, extra,
+                                                   fmt == "json.gz") as writer:
+                        extract_pdf_sharded(str(pdf_file), pool, shards, writer, options)
+                    result["output_file"] = str(output_file)
+                else:
+                    with metrics().stage("extract"):
+                        content = extract_pdf_sharded(str(pdf_file), pool, shards, options=options)
+                    if content:
+                        result["output_file"] = str(save_content(content, pdf_file, output_directory, indent, fmt))
+                    else:
+                        result["error"] = "no content extracted"
+                if result["output_file"]:
+                    metrics().count("bytes_written", os.path.getsize(result["output_file"]))
+            except Exception as e:
+                result["error"] = str(e)
+            if result["error"]:
+                failures += 1
+            _report_result(result, done, len(pdf_files), cache, fmt)
+    
+    return failures
+
+def store_content(output_directory: str, db_path: str = "") -> bool:
+    """Load new or changed *_content files into the SQLite store in one transaction"""
+    from content_store import STORE_NAME, ContentStore
+    
+    db_path = Path(db_path) if db_path else Path(output_directory) / STORE_NAME
+    try:
+        with metrics().stage("store"), ContentStore(db_path) as store:
+            counts = store.sync(find_content_files(output_directory))
+    except Exception as e:
+        print(f"✗ Could not update {db_path}: {e}")
+        return False
+    print(f"💾 Content store {db_path}: {counts['loaded']} loaded, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed")
+    return True
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extract structured content from PDF standards")
+    parser.add_argument("--pdf-dir", default="assets/pdfs", help="Directory containing PDF files")
+    parser.add_argument("--output-dir", default="assets/extracted_content", help="Directory for *_content.json files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (1 = serial, 0 = one per CPU core)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split each PDF into N page ranges extracted in parallel")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-extract every PDF even if the cache says it is up to date")
+    parser.add_argument("--heading-rules", default=None,
+                        help="Heading rules config (default: heading_rules.json next to this script)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write pages, headings and sections to disk while extracting")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write JSON without indentation to reduce file size")
+    parser.add_argument("--content-spans", action="store_true",
+                        help="Store section text as [page, start, end] spans into full_text_by_page")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output encoding: json (default), gzip-compressed json.gz or binary msgpack")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=None,
+                        help="PDF text backend (default: the one recorded by `pdf_pages.py calibrate`, "
+                             "else the first installed of pymupdf, pypdf, pdftotext)")
+    parser.add_argument("--outline", action="store_true",
+                        help="Take headings and section boundaries from the PDF's bookmark outline where it has one")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="DB",
+                        help="Also load the extracted content into a SQLite/FTS5 database "
+                             "(default: <output dir>/content.db)")
+    parser.add_argument("--metrics", default=None,
+                        help="Stage timings and counters JSON (default: assets/metrics/pdf_content_extractor.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also collect cProfile and tracemalloc data per stage (in-process work only)")
+    args = parser.parse_args(argv)
+    if args.stream and args.format == "msgpack":
+        parser.error("--stream writes json or json.gz; use --format json.gz or drop --stream")
+    return args
+
+def metrics_path(args, name: str) -> Path:
+    """--metrics, or <output dir>/../metrics/<name>.json"""
+    return Path(args.metrics) if args.metrics else Path(args.output_dir).parent / "metrics" / f"{name}.json"
+
+def main(argv=None):
     """Main function to process PDF files"""
-    extractor = PDFContentExtractor()
+    args = parse_args(argv)
+    report_path = metrics_path(args, "pdf_content_extractor")
+    recorder = configure(report_path.parent / "profiles" / "pdf_content_extractor" if args.profile else None)
     
     # Define paths
-    pdf_directory = "assets/pdfs"  # Adjust path as needed
-    output_directory = "assets/extracted_content"
+    pdf_directory = args.pdf_dir
+    output_directory = args.output_dir
     
     # Create output directory
     Path(output_directory).mkdir(parents=True, exist_ok=True)
     
     # Process all PDF files
-    pdf_files = list(Path(pdf_directory).glob("*.pdf"))
+    pdf_files = sorted(Path(pdf_directory).glob("*.pdf"))
     
-    for pdf_file in pdf_files:
-        print(f"Processing: {pdf_file.name}")
-        
-        content = extractor.extract_pdf_content(str(pdf_file))
-        if content:
-            # Save extracted content as JSON
-            output_file = Path(output_directory) / f"{pdf_file.stem}_content.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(content, f, indent=2, ensure_ascii=False)
-            
-            print(f"✓ Extracted content saved to: {output_file}")
-        else:
-            print(f"✗ Failed to extract content from: {pdf_file.name}")
+    try:
+        # Resolve the default once so worker processes use the same backend
+        args.backend = get_backend(args.backend).name
+    except ImportError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"PDF backend: {args.backend}")
+    options = extraction_options(args)
+    
+    # Skip PDFs whose content, extractor version and heading rules are unchanged
+    cache = ExtractionCache(output_directory, "pdf_content_extractor", EXTRACTOR_VERSION, {
+        "backend": options["backend"],
+        "heading_rules": load_rules_config(args.heading_rules),
+        "indent": options["indent"],
+        "content_spans": options["content_spans"],
+        "format": options["format"],
+        "outline": options["outline"]
+    })
+    if not args.force:
+        stale = []
+        for pdf_file in pdf_files:
+            if cache.is_fresh(pdf_file, output_path(pdf_file, output_directory, options["format"])):
+                print(f"↷ Up to date, skipping: {pdf_file.name}")
+            else:
+                stale.append(pdf_file)
+        pdf_files = stale
+    
+    if args.workers is None:
+        # Sharding without an explicit pool size gets one process per shard
+        workers = args.shards if args.shards > 1 else 1
+    else:
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
+    if args.shards > 1:
+        print(f"Processing {len(pdf_files)} PDF files, {args.shards} shards each, with {workers} workers")
+        failures = run_sharded(pdf_files, output_directory, workers, args.shards, cache, options)
+    elif workers > 1 and len(pdf_files) > 1:
+        workers = min(workers, len(pdf_files))
+        print(f"Processing {len(pdf_files)} PDF files with {workers} workers")
+        failures = run_parallel(pdf_files, output_directory, workers, cache, options)
+    else:
+        failures = 0
+        for done, pdf_file in enumerate(pdf_files, start=1):
+            print(f"Processing: {pdf_file.name}")
+            result = process_pdf_file(str(pdf_file), output_directory, options)
+            if result["error"]:
+                failures += 1
+            _report_result(result, done, len(pdf_files), cache, options["format"])
+    
+    if failures:
+        print(f"✗ {failures} of {len(pdf_files)} PDF files failed")
+    
+    if args.store is not None and not store_content(output_directory, args.store):
+        failures += 1
+    
+    recorder.write(report_path, {"script": "pdf_content_extractor", "files": len(pdf_files), "failures": failures})
+    recorder.print_summary()
+    print(f"📊 Metrics saved to: {report_path}")
+    return 1 if failures else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PDF Outline
+Headings and section boundaries from a PDF's bookmark outline (its embedded
+table of contents), used instead of classifying every line when the outline
+is usable
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Longest heading, in lines, an outline title is matched against
+MAX_TITLE_LINES = 4
+
+# A title can run over onto the next page; without an exact match, lines
+# spelling at least this much of the start of a title stand for it
+MIN_PARTIAL_MATCH = 0.6
+
+# "1 ", "2.1.6.3. ", "C. 10. 3 " - numbering the page text and the outline
+# often disagree on
+_NUMBERING = re.compile(r'^(?:[A-Z]\.?\s*)?\d+(?:\.\s*\d+)*\.?\s+')
+_WHITESPACE = re.compile(r'\s+')
+_NON_WORD = re.compile(r'[\W_]+')
+
+def _letters(text: str) -> str:
+    return _NON_WORD.sub('', text.casefold())
+
+def normalize_title(text: str) -> str:
+    """Title reduced to lowercase letters and digits after its numbering, for matching.
+
+    Outlines and page text differ in spacing, case, punctuation ("What is a
+    plan" / "What is a plan?") and line-break hyphens ("Product- based").
+    """
+    return _letters(_NUMBERING.sub('', text.strip()))
+
+class Outline:
+    """Outline entries grouped by page.
+
+    page_events() turns a page's lines into the (line, bounds, heading_info)
+    stream the extractor otherwise builds with HeadingClassifier: each entry
+    is placed on the line(s) of its page that spell its title, and those
+    lines become the heading. Entries whose title cannot be found still start
+    a section, right after the previous heading on the page.
+    """
+
+    def __init__(self, entries: List[Tuple[int, str, int]]):
+        self.by_page = {}
+        for level, title, page in entries:
+            heading = {"text": _WHITESPACE.sub(' ', title).strip(), "level": level, "pattern_matched": "outline"}
+            self.by_page.setdefault(page, []).append((heading, normalize_title(title)))
+        # Pages before the first bookmark (covers, contents) are not covered
+        self.first_page = min(self.by_page)
+
+    def covers(self, page_num: int) -> bool:
+        return page_num >= self.first_page
+
+    def page_events(self, page_num: int, lines: List[str], bounds: List[tuple]) -> Tuple[List[tuple], int]:
+        """(line, bounds, heading_info or None) for a page, and how many entries were unmatched"""
+        titles = {}
+        unmatched = {}
+        position = 0
+        for heading, target in self.by_page.get(page_num, ()):
+            match = self._find_title(target, lines, position)
+            if match is None:
+                unmatched.setdefault(position, []).append(heading)
+                continue
+            start, end = match
+            titles[start] = (heading, end)
+            position = end
+
+        events = []
+        missed = sum(len(headings) for headings in unmatched.values())
+        index = 0
+        while index < len(lines):
+            for heading in unmatched.pop(index, ()):
+                events.append((None, None, heading))
+            if index in titles:
+                heading, end = titles[index]
+                events.append((lines[index], bounds[index], heading))
+                index = end
+            else:
+                events.append((lines[index], bounds[index], None))
+                index += 1
+        for headings in unmatched.values():
+            events.extend((None, None, heading) for heading in headings)
+        return events, missed
+
+    @staticmethod
+    def _find_title(target: str, lines: List[str], position: int) -> Optional[Tuple[int, int]]:
+        """[start, end) of the first lines from position that read as target"""
+        if not target:
+            return None
+        partial = None
+        partial_length = len(target) * MIN_PARTIAL_MATCH
+        for start in range(position, len(lines)):
+            text = normalize_title(lines[start])
+            for end in range(start, min(len(lines), start + MAX_TITLE_LINES)):
+                if end > start:
+                    text += _letters(lines[end])
+                if text == target:
+                    return start, end + 1
+                if not text or not target.startswith(text):
+                    break
+                if len(text) >= partial_length:
+                    partial, partial_length = (start, end + 1), len(text) + 1
+        return partial
+
+def load_outline(entries: List[Tuple[int, str, int]]) -> Optional[Outline]:
+    """An Outline from (level, title, page) entries, or None when they are unusable.
+
+    Entries without a page are dropped. An outline whose entries all point at
+    one page (unresolved named destinations often come back as page 1) says
+    nothing about where sections start, so it is rejected.
+    """
+    entries = [(level, title, page) for level, title, page in entries if page >= 1 and title.strip()]
+    if len({page for _, _, page in entries}) < 2:
+        return None
+    return Outline(entries)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+PDF Pages
+Page-at-a-time text extraction behind interchangeable backends (PyMuPDF,
+pypdf/PyPDF2, poppler's pdftotext), with a calibration command that records
+the fastest installed backend
+
+List:       python pdf_pages.py list
+Calibrate:  python pdf_pages.py calibrate [--sample FILE.pdf] [--pages 30]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+try:
+    import pypdf
+except ImportError:
+    try:
+        import PyPDF2 as pypdf
+    except ImportError:
+        pypdf = None
+HAS_PYPDF2 = pypdf is not None
+
+CALIBRATION_NAME = ".pdf_backend.json"
+
+class PageBackend:
+    """Interface for page text extraction libraries"""
+
+    name = "backend"
+
+    @staticmethod
+    def available() -> bool:
+        return False
+
+    def page_count(self, pdf_path) -> int:
+        raise NotImplementedError
+
+    def iter_pages(self, pdf_path, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """(page number from 1, text) of pages [start, end), one page at a time"""
+        raise NotImplementedError
+
+    def outline(self, pdf_path) -> List[Tuple[int, str, int]]:
+        """Bookmark outline as (level from 1, title, page from 1); empty when unsupported"""
+        return []
+
+class PyMuPDFBackend(PageBackend):
+    name = "pymupdf"
+
+    @staticmethod
+    def available() -> bool:
+        return HAS_PYMUPDF
+
+    def page_count(self, pdf_path) -> int:
+        with fitz.open(pdf_path) as doc:
+            return len(doc)
+
+    def iter_pages(self, pdf_path, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        doc = fitz.open(pdf_path)
+        try:
+            yield from iter_doc_pages(doc, start, end)
+        finally:
+            doc.close()
+
+    def outline(self, pdf_path) -> List[Tuple[int, str, int]]:
+        with fitz.open(pdf_path) as doc:
+            return [(level, title, page) for level, title, page in doc.get_toc(simple=True)]
+
+class PyPDFBackend(PageBackend):
+    """pypdf, or its predecessor PyPDF2 when only that is installed"""
+
+    name = "pypdf"
+
+    @staticmethod
+    def available() -> bool:
+        return HAS_PYPDF2
+
+    def page_count(self, pdf_path) -> int:
+        with open(pdf_path, 'rb') as file:
+            return len(pypdf.PdfReader(file).pages)
+
+    def iter_pages(self, pdf_path, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        with open(pdf_path, 'rb') as file:
+            reader = pypdf.PdfReader(file)
+            end = len(reader.pages) if end is None else end
+            for page_num in range(start, end):
+                yield page_num + 1, reader.pages[page_num].extract_text()
+
+    def outline(self, pdf_path) -> List[Tuple[int, str, int]]:
+        with open(pdf_path, 'rb') as file:
+            reader = pypdf.PdfReader(file)
+            entries = []
+            self._walk_outline(reader, reader.outline, 1, entries)
+            return entries
+
+    def _walk_outline(self, reader, items, level: int, entries: List[Tuple[int, str, int]]):
+        # Children follow their parent as a nested list
+        for item in items:
+            if isinstance(item, list):
+                self._walk_outline(reader, item, level + 1, entries)
+                continue
+            # Some writers store a page index instead of a page reference
+            page = item.page if isinstance(item.page, int) else reader.get_destination_page_number(item)
+            # Destinations pypdf cannot resolve come back as None (or -1)
+            if page is None or page < 0:
+                continue
+            entries.append((level, str(item.title), page + 1))
+
+class PdftotextBackend(PageBackend):
+    """poppler-utils' pdftotext, run on `chunk` pages at a time"""
+
+    name = "pdftotext"
+
+    def __init__(self, chunk: int = 50):
+        self.chunk = chunk
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("pdftotext") is not None and shutil.which("pdfinfo") is not None
+
+    def page_count(self, pdf_path) -> int:
+        info = subprocess.run(["pdfinfo", str(pdf_path)], capture_output=True, text=True, check=True).stdout
+        for line in info.splitlines():
+            if line.startswith("Pages:"):
+                return int(line.split(":", 1)[1])
+        raise ValueError(f"pdfinfo reported no page count for {pdf_path}")
+
+    def iter_pages(self, pdf_path, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        end = self.page_count(pdf_path) if end is None else end
+        for first in range(start, end, self.chunk):
+            last = min(end, first + self.chunk)
+            output = subprocess.run(["pdftotext", "-f", str(first + 1), "-l", str(last), "-enc", "UTF-8",
+                                     str(pdf_path), "-"], capture_output=True, check=True).stdout
+            # Pages end with a form feed
+            pages = output.decode("utf-8", errors="replace").split("\f")
+            for offset in range(last - first):
+                yield first + offset + 1, pages[offset] if offset < len(pages) else ""
+
+BACKENDS = {backend.name: backend for backend in (PyMuPDFBackend, PyPDFBackend, PdftotextBackend)}
+
+def available_backends() -> List[str]:
+    """Installed backends, in the default order of preference"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def calibration_path() -> Path:
+    """assets/.pdf_backend.json, looked up the same way the extractors find assets/"""
+    for path in (Path("assets"), Path("../assets")):
+        if path.exists():
+            return path / CALIBRATION_NAME
+    return Path("assets") / CALIBRATION_NAME
+
+def calibrated_backend(path=None) -> Optional[str]:
+    """Backend recorded by the last calibration, if it is still installed"""
+    try:
+        with open(path or calibration_path(), 'r', encoding='utf-8') as f:
+            name = json.load(f).get("backend")
+    except (OSError, ValueError):
+        return None
+    return name if name in BACKENDS and BACKENDS[name].available() else None
+
+def get_backend(name: Optional[str] = None) -> PageBackend:
+    """Backend by name; by default the calibrated one, else the first installed"""
+    if name is None:
+        name = calibrated_backend() or next(iter(available_backends()), None)
+        if name is None:
+            raise ImportError("No PDF library available. Please install PyMuPDF or PyPDF2")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name} (choose from {', '.join(BACKENDS)})")
+    if not BACKENDS[name].available():
+        raise ImportError(f"PDF backend {name} is not installed")
+    return BACKENDS[name]()
+
+def iter_doc_pages(doc, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """(page number from 1, text) for pages [start, end) of an open PyMuPDF document"""
+    end = len(doc) if end is None else end
+    for page_num in range(start, end):
+        yield page_num + 1, doc[page_num].get_text()
+
+def iter_pages(pdf_path, start: int = 0, end: Optional[int] = None,
+               backend: Optional[PageBackend] = None) -> Iterator[Tuple[int, str]]:
+    """(page number from 1, text) of each page, reading one page at a time.
+
+    Uses backend, or get_backend()'s default. The file stays open until the
+    iterator is exhausted or closed.
+    """
+    return (backend or get_backend()).iter_pages(pdf_path, start, end)
+
+def page_count(pdf_path, backend: Optional[PageBackend] = None) -> int:
+    """Number of pages, without extracting any text"""
+    return (backend or get_backend()).page_count(pdf_path)
+
+def measure(backend: PageBackend, pdf_path, pages: int, repeat: int = 3) -> Dict[str, Any]:
+    """Best pages/sec of a backend over the first `pages` pages of pdf_path"""
+    pages = min(pages, backend.page_count(pdf_path))
+    best = None
+    characters = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        characters = sum(len(text) for _, text in backend.iter_pages(pdf_path, 0, pages))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"pages": pages, "seconds": round(best, 4), "pages_per_sec": round(pages / best, 1) if best else None,
+            "characters": characters}
+
+def calibrate(sample, pages: int = 30, path=None) -> Dict[str, Any]:
+    """Benchmark every installed backend on sample and record the fastest"""
+    results = {}
+    for name in available_backends():
+        try:
+            results[name] = measure(BACKENDS[name](), sample, pages)
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+            continue
+        result = results[name]
+        print(f"  {name:<10} {result['pages_per_sec']:>9,.1f} pages/sec  ({result['characters']:,} characters)")
+    if not results:
+        raise ImportError("No PDF library available. Please install PyMuPDF or PyPDF2")
+
+    fastest = max(results, key=lambda name: results[name]["pages_per_sec"] or 0)
+    record = {
+        "backend": fastest,
+        "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sample": str(sample),
+        "results": results
+    }
+    path = Path(path or calibration_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, path)
+    return record
+
+def default_sample() -> Optional[Path]:
+    """Largest PDF in assets/pdfs (more pages give steadier timings)"""
+    for directory in (Path("assets/pdfs"), Path("../assets/pdfs")):
+        pdfs = list(directory.glob("*.pdf"))
+        if pdfs:
+            return max(pdfs, key=lambda path: path.stat().st_size)
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF text extraction backends")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("list", help="Show the installed backends and the calibrated choice (default)")
+    calibrate_parser = subparsers.add_parser("calibrate", help="Benchmark the installed backends and record the fastest")
+    calibrate_parser.add_argument("--sample", default=None, help="PDF to benchmark on (default: largest in assets/pdfs)")
+    calibrate_parser.add_argument("--pages", type=int, default=30, help="Pages of the sample to extract")
+    args = parser.parse_args(argv)
+
+    if args.command == "calibrate":
+        sample = Path(args.sample) if args.sample else default_sample()
+        if sample is None or not sample.exists():
+            print("Error: No sample PDF. Add PDFs to assets/pdfs or pass --sample.")
+            return 1
+        print(f"⏱ Calibrating PDF backends on {sample.name} ({args.pages} pages)")
+        record = calibrate(sample, args.pages)
+        print(f"✓ Fastest: {record['backend']} (saved to {calibration_path()})")
+        return 0
+
+    installed = available_backends()
+    calibrated = calibrated_backend()
+    for name in BACKENDS:
+        marker = "✓" if name in installed else "✗"
+        note = " (calibrated choice)" if name == calibrated else ""
+        print(f"{marker} {name}{note}")
+    print(f"Default: {get_backend().name if installed else 'none installed'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
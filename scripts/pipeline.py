@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Pipeline
+Runs setup, extraction, keyword ranking, indexing and comparison in one
+process as a dependency graph, skipping stages whose artifacts are up to date
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STATE_NAME = ".pipeline_state.json"
+STATE_VERSION = 1
+
+class StageFailed(Exception):
+    """A stage exited with an error or did not produce its outputs"""
+
+class Stage:
+    """One step of the pipeline.
+
+    run() does the work in this process. inputs() and outputs() list the
+    files the stage reads and writes; they are called when the stage is
+    checked, so they see what earlier stages produced.
+    """
+
+    def __init__(self, name: str, description: str, run: Callable[[], Optional[int]],
+                 inputs: Callable[[], List[Path]], outputs: Callable[[], List[Path]],
+                 deps: Optional[List[str]] = None):
+        self.name = name
+        self.description = description
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = deps or []
+
+class PipelineState:
+    """When each stage last completed, kept next to the assets it describes.
+
+    A completion time instead of output mtimes, because keyword ranking
+    rewrites its input files in place.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.completed = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if state.get("state_version") != STATE_VERSION:
+            return {}
+        return state.get("completed", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"state_version": STATE_VERSION, "completed": self.completed}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def mark(self, name: str, finished: float):
+        self.completed[name] = finished
+        self.save()
+
+    def forget(self, name: str):
+        """A failed stage is never up to date, even if its old outputs remain"""
+        if self.completed.pop(name, None) is not None:
+            self.save()
+
+def stale_reason(stage: Stage, state: PipelineState) -> Optional[str]:
+    """Why the stage has to run, or None when its outputs are newer than its inputs"""
+    completed = state.completed.get(stage.name)
+    if completed is None:
+        return "never run"
+    for path in stage.outputs():
+        if not path.exists():
+            return f"missing {path}"
+    for path in stage.inputs():
+        try:
+            if path.stat().st_mtime > completed:
+                return f"{path.name} changed"
+        except OSError:
+            return f"missing input {path}"
+    return None
+
+def execution_order(stages: List[Stage], targets: Optional[List[str]] = None) -> List[Stage]:
+    """Stages needed for targets (all by default), dependencies first"""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name not in by_name:
+            raise ValueError(f"Unknown stage: {name}")
+        if by_name[name] in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        order.append(by_name[name])
+
+    for name in targets or [stage.name for stage in stages]:
+        visit(name)
+    return order
+
+def run_stage(stage: Stage):
+    """Call the stage's entry point, turning exits and error codes into StageFailed"""
+    try:
+        code = stage.run()
+    except SystemExit as e:
+        code = e.code
+    except Exception as e:
+        raise StageFailed(f"{type(e).__name__}: {e}") from e
+    if code not in (None, 0):
+        raise StageFailed(f"exit status {code}")
+    missing = [str(path) for path in stage.outputs() if not path.exists()]
+    if missing:
+        raise StageFailed(f"did not produce {', '.join(missing)}")
+
+def run_pipeline(stages: List[Stage], state: PipelineState, targets: Optional[List[str]] = None,
+                 force: bool = False, dry_run: bool = False) -> bool:
+    """Run (or with dry_run, list) the stages that are not up to date; False when one fails"""
+    order = execution_order(stages, targets)
+    ran = set()
+    started = time.perf_counter()
+    for position, stage in enumerate(order, 1):
+        prefix = f"[{position}/{len(order)}]"
+        reason = "forced" if force else stale_reason(stage, state)
+        if reason is None and any(dep in ran for dep in stage.deps):
+            reason = "upstream stage ran"
+        if reason is None:
+            print(f"{prefix} ↷ {stage.description}: up to date")
+            continue
+        if dry_run:
+            print(f"{prefix} • {stage.description}: would run ({reason})")
+            ran.add(stage.name)
+            continue
+
+        print(f"\n{prefix} 🔄 {stage.description} ({reason})")
+        print("-" * 40)
+        stage_started = time.perf_counter()
+        # Stage start, not end: inputs edited while it runs make the next run redo it
+        begun = time.time()
+        try:
+            run_stage(stage)
+        except StageFailed as e:
+            state.forget(stage.name)
+            print(f"❌ {stage.description} failed: {e}")
+            return False
+        state.mark(stage.name, max(begun, newest_mtime(stage.outputs())))
+        ran.add(stage.name)
+        print(f"✅ {stage.description} completed in {time.perf_counter() - stage_started:.2f}s")
+
+    if not dry_run:
+        print(f"\n⏱ Pipeline finished in {time.perf_counter() - started:.2f}s "
+              f"({len(ran)} of {len(order)} stages ran)")
+    return True
+
+def newest_mtime(paths: List[Path]) -> float:
+    mtimes = [path.stat().st_mtime for path in paths if path.exists()]
+    return max(mtimes) if mtimes else 0.0
+
+def find_project_dir() -> Path:
+    """Directory holding assets/pdfs: the current one or the scripts' parent"""
+    for path in (Path.cwd(), SCRIPTS_DIR.parent, SCRIPTS_DIR):
+        if (path / "assets" / "pdfs").exists():
+            return path
+    return Path.cwd()
+
+def content_files() -> List[Path]:
+    from content_format import find_content_files
+    return find_content_files(Path("assets/extracted_content"))
+
+def pdf_files() -> List[Path]:
+    return sorted(Path("assets/pdfs").glob("*.pdf"))
+
+def run_setup() -> int:
+    import simple_setup
+    if not simple_setup.check_python_version():
+        return 1
+    simple_setup.install_packages()
+    simple_setup.create_directories()
+    return 0
+
+def run_extract() -> Optional[int]:
+    import simple_extractor
+    return simple_extractor.main([])
+
+def run_rank() -> Optional[int]:
+    import keyword_ranker
+    return keyword_ranker.main([])
+
+def run_index() -> Optional[int]:
+    import search_index
+    return search_index.main(["build"])
+
+def run_duplicates() -> Optional[int]:
+    import near_duplicates
+    return near_duplicates.main([])
+
+def run_similarity() -> Optional[int]:
+    import section_similarity
+    return section_similarity.main([])
+
+def run_pages() -> Optional[int]:
+    import page_store
+    return page_store.main(["build"])
+
+def run_compare(argv: Optional[List[str]] = None) -> Optional[int]:
+    import simple_comparison
+    return simple_comparison.main(argv or [])
+
+def expected_content_files() -> List[Path]:
+    """One *_content.json per PDF (whatever format the extractor wrote it in)"""
+    existing = {path.name.split("_content.")[0]: path for path in content_files()}
+    return [existing.get(pdf.stem, Path("assets/extracted_content") / f"{pdf.stem}_content.json")
+            for pdf in pdf_files()]
+
+def default_stages(compare_args: Optional[List[str]] = None) -> List[Stage]:
+    """The simple_* pipeline that run_all.py used to chain with subprocesses
+
+    compare_args are passed to simple_comparison.py (e.g. ["--backend", "stub"]).
+    """
+    return [
+        Stage("setup", "Setting up environment", run_setup,
+              inputs=lambda: [SCRIPTS_DIR / "simple_setup.py"],
+              outputs=lambda: [Path("assets/pdfs"), Path("assets/extracted_content")]),
+        Stage("extract", "Extracting PDF content", run_extract,
+              inputs=lambda: pdf_files() + [SCRIPTS_DIR / "simple_extractor.py"],
+              outputs=expected_content_files, deps=["setup"]),
+        Stage("rank", "Ranking section keywords", run_rank,
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "keyword_ranker.py"],
+              outputs=content_files, deps=["extract"]),
+        Stage("index", "Building search index", run_index,
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "search_index.py"],
+              outputs=lambda: [Path("assets/extracted_content/search_index.json")], deps=["rank"]),
+        Stage("duplicates", "Finding near-duplicate sections", run_duplicates,
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "near_duplicates.py"],
+              outputs=lambda: [Path("assets/near_duplicates.json")], deps=["rank"]),
+        Stage("similarity", "Computing section similarity", run_similarity,
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "section_similarity.py"],
+              outputs=lambda: [Path("assets/section_similarity.json")], deps=["rank"]),
+        Stage("pages", "Writing page text store", run_pages,
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "page_store.py"],
+              outputs=lambda: [Path("assets/extracted_content/page_text.bin"),
+                               Path("assets/extracted_content/page_text.idx")], deps=["rank"]),
+        Stage("compare", "Generating AI comparisons", lambda: run_compare(compare_args),
+              inputs=lambda: content_files() + [SCRIPTS_DIR / "simple_comparison.py",
+                                                Path("assets/near_duplicates.json"),
+                                                Path("assets/section_similarity.json"),
+                                                Path("assets/extracted_content/page_text.idx")],
+              outputs=lambda: [Path("assets/ai_comparisons.json")],
+              deps=["rank", "duplicates", "similarity", "pages"]),
+    ]
+
+@contextlib.contextmanager
+def working_directory(path: Path):
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def run(targets: Optional[List[str]] = None, force: bool = False, dry_run: bool = False) -> bool:
+    """Run the default pipeline from the project directory"""
+    # Print stage output as it happens even when piped
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+    with working_directory(find_project_dir()):
+        state = PipelineState(Path("assets") / STATE_NAME)
+        return run_pipeline(default_stages(), state, targets, force, dry_run)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Disk-backed cache of model responses keyed by (backend, model, prompt,
+generation parameters), so unchanged prompts are not sent again
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from llm_generation import GenerationBackend, PermanentGenerationError
+
+DEFAULT_CACHE_DIR = Path("assets/.llm_cache")
+
+def cache_key(backend: str, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of everything that determines a response"""
+    encoded = json.dumps({"backend": backend, "model": model, "prompt": prompt, "params": params or {}},
+                         sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class ResponseCache:
+    """One JSON file per response under directory.
+
+    Entries created more than max_age seconds ago are misses (but can still
+    serve as a fallback). prune() deletes entries unused for max_age seconds
+    and then the least recently used ones (by file mtime, which a hit
+    refreshes) until the cache fits in max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_age: Optional[float] = 30 * 24 * 3600,
+                 max_bytes: Optional[int] = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """Cached response text, or None on a miss (expired entries count unless allow_stale)"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        expired = self.max_age is not None and time.time() - entry.get("created", 0) > self.max_age
+        if expired and not allow_stale:
+            self.misses += 1
+            return None
+        if expired:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        os.utime(path)
+        return entry["response"]
+
+    def put(self, key: str, response: str, model: str = ""):
+        """Store a response (atomically, so concurrent readers never see half a file)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"model": model, "created": time.time(), "response": response}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.stores += 1
+
+    def prune(self):
+        """Drop expired entries, then least recently used ones beyond max_bytes"""
+        if not self.directory.exists():
+            return
+        entries = []
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            stat = path.stat()
+            if self.max_age is not None and now - stat.st_mtime > self.max_age:
+                path.unlink()
+                self.evictions += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        if self.max_bytes is None:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stale_hits": self.stale_hits,
+                "stores": self.stores, "evictions": self.evictions}
+
+class CachedBackend(GenerationBackend):
+    """Wraps a backend with a ResponseCache.
+
+    With bypass=True the cache is not read at all, but responses are still
+    stored. Otherwise, once every retry of a prompt has failed, a cached
+    response (even an expired one) is returned instead of the error. Without
+    a backend (no API key, package missing) only cached responses are served.
+    """
+
+    def __init__(self, backend: Optional[GenerationBackend], cache: ResponseCache, backend_name: str = "",
+                 model_name: str = "", bypass: bool = False):
+        self.backend = backend
+        self.cache = cache
+        # Cache-only mode looks up what the named backend stored earlier
+        self.backend_name = backend.name if backend else backend_name
+        self.name = f"{self.backend_name}, cached" if backend else f"{backend_name} cache only"
+        self.model_name = backend.model_name if backend else model_name
+        self.params = backend.params if backend else {}
+        self.bypass = bypass
+
+    def key(self, prompt: str) -> str:
+        return cache_key(self.backend_name, self.model_name, prompt, self.params)
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        if self.backend is None:
+            cached = self.cache.get(self.key(prompt), allow_stale=True)
+            if cached is None:
+                raise PermanentGenerationError("no cached response and no backend available")
+            return cached
+        if self.bypass:
+            return None
+        return self.cache.get(self.key(prompt))
+
+    async def generate(self, prompt: str) -> str:
+        if self.backend is None:
+            return self.lookup(prompt)
+
+        response = await self.backend.generate(prompt)
+        self.cache.put(self.key(prompt), response, self.model_name)
+        return response
+
+    def fallback(self, prompt: str) -> Optional[str]:
+        if self.backend is None or self.bypass:
+            return None
+        return self.cache.get(self.key(prompt), allow_stale=True)
@@ -3,52 +3,33 @@
 Run All - Complete pipeline in one script
 """
 
-import subprocess
+import argparse
 import sys
-import os
 
-def run_script(script_name, description):
-    """Run a Python script and handle errors"""
-    print(f"\n🔄 {description}")
-    print("-" * 40)
-    
-    try:
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, 
-                              text=True, 
-                              cwd=os.path.dirname(os.path.abspath(__file__)))
-        
-        if result.returncode == 0:
-            print(result.stdout)
-            print(f"✅ {description} completed successfully")
-            return True
-        else:
-            print(f"❌ {description} failed:")
-            print(result.stderr)
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error running {script_name}: {e}")
-        return False
+from pipeline import default_stages, run
 
-def main():
+def main(argv=None):
     """Run the complete pipeline"""
+    stage_names = [stage.name for stage in default_stages()]
+    parser = argparse.ArgumentParser(description="Run the PDF comparison pipeline")
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"Run only these stages and what they depend on ({', '.join(stage_names)})")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its outputs are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the stages that would run")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.stages if name not in stage_names]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(stage_names)})")
+
     print("🚀 PDF Comparison System - Complete Pipeline")
     print("=" * 50)
-    
-    scripts = [
-        ("simple_setup.py", "Setting up environment"),
-        ("simple_extractor.py", "Extracting PDF content"),
-        ("simple_comparison.py", "Generating AI comparisons")
-    ]
-    
-    for script, description in scripts:
-        success = run_script(script, description)
-        if not success:
-            print(f"\n❌ Pipeline stopped at: {description}")
-            print("Please check the errors above and try again.")
-            return
-    
+
+    if not run(args.stages or None, force=args.force, dry_run=args.dry_run):
+        print("\n❌ Pipeline stopped. Please check the errors above and try again.")
+        return 1
+    if args.dry_run:
+        return 0
+
     print("\n" + "=" * 50)
     print("🎉 Complete pipeline finished successfully!")
     print("\nGenerated files:")
@@ -58,6 +39,7 @@ def main():
     print("  1. Copy ai_comparisons.json to your Flutter assets/")
     print("  2. Update your Flutter app to load the new data")
     print("  3. Test the enhanced search and comparison features")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Search Index Builder
+Builds a positional inverted index over the extracted content so term and
+phrase queries do not have to scan every page
+
+Build:  python search_index.py build
+Query:  python search_index.py query "risk register" [--standard pmbok7] [--phrase]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import content_format
+from content_writer import dump_content
+
+INDEX_NAME = "search_index.json"
+INDEX_VERSION = 1
+
+# Letters and digits in any script; offsets refer to the original page text
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+Posting = namedtuple("Posting", ["standard", "section", "page", "position", "offset"])
+
+def tokenize(text: str):
+    """Yield (normalized term, character offset) for every word in text"""
+    for match in TOKEN_PATTERN.finditer(text):
+        yield match.group().lower(), match.start()
+
+def normalize_query(text: str) -> List[str]:
+    return [term for term, _ in tokenize(text)]
+
+def standard_name(content: Dict[str, Any]) -> str:
+    return content.get('file_name', '').replace('.pdf', '')
+
+def _heading_sections(content: Dict[str, Any]) -> List[int]:
+    """Section id for each heading (sections are started by headings, in order)"""
+    sections = content.get('sections', [])
+    section_ids = []
+    cursor = 0
+    for heading in content.get('headings', []):
+        found = -1
+        for i in range(cursor, len(sections)):
+            if sections[i].get('heading') == heading.get('text') and sections[i].get('page_start') == heading.get('page'):
+                found = i
+                cursor = i + 1
+                break
+        section_ids.append(found)
+    return section_ids
+
+def _page_boundaries(content: Dict[str, Any]):
+    """Per page: sorted (offset, section id) where sections start, and the section open at page start"""
+    headings_by_page = {}
+    for heading, section_id in zip(content.get('headings', []), _heading_sections(content)):
+        headings_by_page.setdefault(int(heading.get('page', 0)), []).append((heading.get('text', ''), section_id))
+
+    pages = sorted(content.get('full_text_by_page', {}).items(), key=lambda item: int(item[0]))
+    carry = -1
+    for page_key, text in pages:
+        page = int(page_key)
+        boundaries = []
+        cursor = 0
+        for heading_text, section_id in headings_by_page.get(page, []):
+            offset = text.find(heading_text, cursor) if heading_text else -1
+            if offset < 0:
+                offset = cursor
+            boundaries.append((offset, section_id))
+            cursor = offset + len(heading_text)
+        yield page, text, carry, boundaries
+        if boundaries:
+            carry = boundaries[-1][1]
+
+def build_index(all_content: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the index structure from extracted content dicts.
+
+    Postings are grouped per term and page as [standard, page, position,
+    offset, position delta, offset delta, ...]: standard indexes "standards",
+    position is the word number on the page and offset the character offset
+    into the page text, both delta-encoded after the first occurrence.
+
+    Section ids are not repeated per posting. "page_sections" holds, per
+    standard and page, [section open at page start, offset, section, ...]
+    where each section begins, and readers resolve an offset with a bisect.
+    Section ids index that standard's "sections" (-1 before the first heading).
+    """
+    postings = {}
+    section_df = {}
+    page_df = {}
+    total_tokens = 0
+    total_pages = 0
+    standards = []
+    sections = []
+    page_sections = []
+
+    for std_id, content in enumerate(all_content):
+        standards.append(standard_name(content))
+        sections.append([
+            [section.get('heading', ''), section.get('page_start', 1), section.get('page_end', 1)]
+            for section in content.get('sections', [])
+        ])
+        std_page_sections = {}
+        page_sections.append(std_page_sections)
+
+        for page, text, carry, boundaries in _page_boundaries(content):
+            total_pages += 1
+            std_page_sections[str(page)] = [carry] + [value for boundary in boundaries for value in boundary]
+            starts = [offset for offset, _ in boundaries]
+            page_terms = {}
+            position = 0
+            for term, offset in tokenize(text):
+                entry = page_terms.get(term)
+                if entry is None:
+                    page_terms[term] = entry = [std_id, page, position, offset, position, offset, set()]
+                    group = entry
+                else:
+                    group = entry
+                    # Delta-encode against the previous occurrence on this page
+                    group.extend((position - group[4], offset - group[5]))
+                    group[4], group[5] = position, offset
+                slot = bisect.bisect_right(starts, offset) - 1
+                group[6].add(boundaries[slot][1] if slot >= 0 else carry)
+                position += 1
+            total_tokens += position
+
+            for term, entry in page_terms.items():
+                seen_sections = entry[6]
+                group = entry[:4] + entry[7:]
+                postings.setdefault(term, []).append(group)
+                page_df[term] = page_df.get(term, 0) + 1
+                section_df.setdefault(term, set()).update((std_id, section_id) for section_id in seen_sections)
+
+    terms = {}
+    for term in sorted(postings):
+        groups = postings[term]
+        terms[term] = {
+            "df": page_df[term],
+            "section_df": len(section_df[term]),
+            "cf": sum((len(group) - 2) // 2 for group in groups),
+            "postings": groups
+        }
+
+    return {
+        "index_version": INDEX_VERSION,
+        "standards": standards,
+        "sections": sections,
+        "page_sections": page_sections,
+        "stats": {
+            "pages": total_pages,
+            "sections": sum(len(s) for s in sections),
+            "tokens": total_tokens,
+            "terms": len(terms)
+        },
+        "terms": terms
+    }
+
+class SearchIndex:
+    """Query API over a built index (term, phrase and ranked section search)"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.standards = data["standards"]
+        self.sections = data["sections"]
+        self.page_sections = data["page_sections"]
+        self.terms = data["terms"]
+        self.stats = data["stats"]
+
+    @classmethod
+    def load(cls, path) -> "SearchIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _standard_id(self, standard: Optional[str]) -> Optional[int]:
+        if standard is None:
+            return None
+        return self.standards.index(standard) if standard in self.standards else -1
+
+    def section_at(self, std_id: int, page: int, offset: int) -> int:
+        """Section id containing a character offset of a page (-1 before the first heading)"""
+        table = self.page_sections[std_id].get(str(page))
+        if not table:
+            return -1
+        starts = table[1::2]
+        slot = bisect.bisect_right(starts, offset) - 1
+        return table[2 + 2 * slot] if slot >= 0 else table[0]
+
+    def postings(self, term: str, standard: Optional[str] = None, page: Optional[int] = None) -> List[Posting]:
+        """Every occurrence of a single (normalized) term"""
+        entry = self.terms.get(term.lower())
+        if not entry:
+            return []
+        std_filter = self._standard_id(standard)
+        results = []
+        for group in entry["postings"]:
+            std_id, page_num = group[0], group[1]
+            if std_filter is not None and std_id != std_filter:
+                continue
+            if page is not None and page_num != page:
+                continue
+            name = self.standards[std_id]
+            position = offset = 0
+            for i in range(2, len(group), 2):
+                position += group[i]
+                offset += group[i + 1]
+                results.append(Posting(name, self.section_at(std_id, page_num, offset), page_num, position, offset))
+        return results
+
+    def phrase(self, text: str, standard: Optional[str] = None, page: Optional[int] = None) -> List[Posting]:
+        """Occurrences of the words of text at consecutive positions (as postings of the first word)"""
+        words = normalize_query(text)
+        if not words or any(word not in self.terms for word in words):
+            return []
+
+        # Intersect (standard, page, start position) sets, rarest word first
+        candidates = None
+        for i in sorted(range(len(words)), key=lambda i: self.terms[words[i]]["cf"]):
+            starts = {(p.standard, p.page, p.position - i) for p in self.postings(words[i], standard, page)}
+            candidates = starts if candidates is None else candidates & starts
+            if not candidates:
+                return []
+
+        return [p for p in self.postings(words[0], standard, page)
+                if (p.standard, p.page, p.position) in candidates]
+
+    def search(self, query: str, standard: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank sections by TF-IDF over the query terms"""
+        n_sections = max(self.stats["sections"], 1)
+        scores = {}
+        matched = {}
+        for term in set(normalize_query(query)):
+            entry = self.terms.get(term)
+            if not entry:
+                continue
+            idf = math.log((1 + n_sections) / (1 + entry["section_df"])) + 1
+            counts = {}
+            for posting in self.postings(term, standard):
+                if posting.section >= 0:
+                    key = (posting.standard, posting.section)
+                    counts[key] = counts.get(key, 0) + 1
+            for key, count in counts.items():
+                scores[key] = scores.get(key, 0.0) + (1 + math.log(count)) * idf
+                matched.setdefault(key, []).append(term)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        results = []
+        for (name, section_id), score in ranked:
+            heading, page_start, page_end = self.sections[self.standards.index(name)][section_id]
+            results.append({
+                "standard": name,
+                "section": section_id,
+                "heading": heading,
+                "page_start": page_start,
+                "page_end": page_end,
+                "score": round(score, 4),
+                "matched_terms": sorted(matched[(name, section_id)])
+            })
+        return results
+
+def find_content_dir() -> Path:
+    """Locate assets/extracted_content the same way the extractors do"""
+    for path in (Path("assets/extracted_content"), Path("../assets/extracted_content")):
+        if path.exists():
+            return path
+    return Path("assets/extracted_content")
+
+def load_all_content(content_dir: Path) -> List[Dict[str, Any]]:
+    return [content_format.load(file_path) for file_path in content_format.find_content_files(content_dir)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Positional inverted index for extracted content")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("build", help="Build the index (default)")
+    query_parser = subparsers.add_parser("query", help="Query a built index")
+    query_parser.add_argument("text")
+    query_parser.add_argument("--standard", default=None)
+    query_parser.add_argument("--page", type=int, default=None)
+    query_parser.add_argument("--phrase", action="store_true", help="Match the words as an exact phrase")
+    query_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    index_file = content_dir / INDEX_NAME
+
+    if args.command == "query":
+        index = SearchIndex.load(index_file)
+        if args.phrase:
+            matches = index.phrase(args.text, args.standard, args.page)
+            print(f"{len(matches)} matches for \"{args.text}\"")
+            for match in matches[:args.limit]:
+                heading = index.sections[index.standards.index(match.standard)][match.section][0] \
+                    if match.section >= 0 else "(before first heading)"
+                print(f"  {match.standard} p.{match.page} @{match.offset}  {heading}")
+        else:
+            for result in index.search(args.text, args.standard, args.limit):
+                print(f"  {result['score']:7.3f}  {result['standard']} p.{result['page_start']}  {result['heading']}")
+        return 0
+
+    print("🗂  Search Index Builder")
+    print("=" * 40)
+    all_content = load_all_content(content_dir)
+    if not all_content:
+        print(f"Error: No content files found in {content_dir}. Run the extractor first.")
+        return 1
+
+    started = time.perf_counter()
+    data = build_index(all_content)
+    dump_content(data, index_file, indent=None)
+    elapsed = time.perf_counter() - started
+    stats = data["stats"]
+    print(f"✓ Indexed {stats['tokens']} words, {stats['terms']} terms over {stats['pages']} pages "
+          f"in {elapsed:.2f}s")
+    print(f"✓ Saved: {index_file} ({index_file.stat().st_size / 1024:.0f} KB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
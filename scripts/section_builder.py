@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Section Builder
+Compact records for headings and sections while a document is being extracted
+"""
+
+from typing import Any, Dict, List
+
+def add_span(spans: List[List[int]], page: int, start: int, end: int):
+    """Record [start, end) on page, widening the last span when it is on the same page"""
+    if spans and spans[-1][0] == page:
+        spans[-1][2] = end
+    else:
+        spans.append([page, start, end])
+
+class HeadingRecord:
+    """A heading found on a page (serialized as {"text", "page", "level"})"""
+
+    __slots__ = ("text", "page", "level")
+
+    def __init__(self, text: str, page: int, level: int):
+        self.text = text
+        self.page = page
+        self.level = level
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "page": self.page, "level": self.level}
+
+    def __getstate__(self):
+        return (self.text, self.page, self.level)
+
+    def __setstate__(self, state):
+        self.text, self.page, self.level = state
+
+class SectionRecord:
+    """A section under construction.
+
+    Body lines are buffered in a list and joined once by finish(), so building
+    a section is linear in its length instead of re-copying the accumulated
+    string for every line. The joined text is identical to appending
+    line + " " per line.
+
+    Each line's position in its page text is also tracked as [page, start,
+    end] spans (one per page), so the section can be written as references
+    into full_text_by_page instead of a copy of the text.
+    """
+
+    __slots__ = ("heading", "level", "page_start", "page_end", "lines", "spans", "content", "keywords")
+
+    def __init__(self, heading: str, level: int, page: int):
+        self.heading = heading
+        self.level = level
+        self.page_start = page
+        self.page_end = page
+        self.lines = []
+        self.spans = []
+        self.content = None
+        self.keywords = []
+
+    def add_line(self, line: str, page: int, start: int, end: int):
+        """Append one body line seen on `page` at [start, end) of its text"""
+        self.lines.append(line)
+        self.page_end = page
+        add_span(self.spans, page, start, end)
+
+    def extend(self, lines: List[str], page_end: int, spans: List[List[int]]):
+        """Append body lines (and their spans) carried over from the next page range"""
+        if lines:
+            self.lines.extend(lines)
+            self.page_end = page_end
+            for page, start, end in spans:
+                add_span(self.spans, page, start, end)
+
+    def finish(self) -> str:
+        """Join the buffered lines into the section content (once)"""
+        if self.content is None:
+            self.content = " ".join(self.lines) + " " if self.lines else ""
+            self.lines = None
+        return self.content
+
+    def to_dict(self, content_spans: bool = False) -> Dict[str, Any]:
+        """Serialized section; with content_spans the text is given as spans"""
+        section = {
+            "heading": self.heading,
+            "level": self.level,
+            "page_start": self.page_start,
+            "page_end": self.page_end
+        }
+        if content_spans:
+            section["content_spans"] = self.spans
+        else:
+            section["content"] = self.finish()
+        section["keywords"] = self.keywords
+        return section
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Section Index
+In-memory BM25 index over the sections of every extracted standard, built once
+per run so topic matching only touches the postings of the query terms
+"""
+
+import heapq
+import math
+import re
+from typing import Any, Dict, List, Tuple
+
+from content_spans import section_text
+
+# Letters and digits in any script, as in search_index.py
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def standard_name(content: Dict[str, Any]) -> str:
+    return content.get('file_name', '').replace('.pdf', '')
+
+class SectionIndex:
+    """Term -> [(section id, term frequency)] postings with Okapi BM25 scoring.
+
+    A section is indexed as its heading, keywords and content. Section ids
+    are assigned in document order, standard by standard, so ties keep the
+    order the sections appear in.
+    """
+
+    def __init__(self, all_content: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.standards = []
+        self.sections = []
+        self.section_standard = []
+        self.lengths = []
+        self.postings = {}
+
+        for std_id, content in enumerate(all_content):
+            self.standards.append(standard_name(content))
+            for section in content.get('sections', []):
+                section_id = len(self.sections)
+                self.sections.append(section)
+                self.section_standard.append(std_id)
+                text = " ".join([
+                    section.get('heading', ''),
+                    " ".join(section.get('keywords', [])),
+                    section_text(content, section)
+                ])
+                counts = {}
+                tokens = tokenize(text)
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                self.lengths.append(len(tokens))
+                for term, count in counts.items():
+                    self.postings.setdefault(term, []).append((section_id, count))
+
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        n_sections = len(self.sections)
+        self.idf = {
+            term: math.log(1.0 + (n_sections - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def query_terms(self, keywords: List[str]) -> List[str]:
+        """Distinct terms of a list of keywords or phrases, in first-seen order"""
+        terms = []
+        for keyword in keywords:
+            for term in tokenize(keyword):
+                if term not in terms:
+                    terms.append(term)
+        return terms
+
+    def scores(self, keywords: List[str]) -> Dict[int, float]:
+        """BM25 score of every section containing at least one query term"""
+        k1, b = self.k1, self.b
+        lengths = self.lengths
+        average_length = self.average_length or 1.0
+        scores = {}
+        for term in self.query_terms(keywords):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for section_id, tf in self.postings[term]:
+                norm = k1 * (1.0 - b + b * lengths[section_id] / average_length)
+                scores[section_id] = scores.get(section_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def top_sections(self, keywords: List[str], per_standard: int = 3) -> Dict[str, List[Tuple[Dict[str, Any], float]]]:
+        """The per_standard best (section, score) pairs for each standard with a match"""
+        by_standard = {}
+        for section_id, score in self.scores(keywords).items():
+            by_standard.setdefault(self.section_standard[section_id], []).append((score, section_id))
+
+        ranked = {}
+        for std_id in sorted(by_standard):
+            # Highest score first, earlier sections first on ties
+            best = heapq.nsmallest(per_standard, by_standard[std_id], key=lambda item: (-item[0], item[1]))
+            ranked[self.standards[std_id]] = [(self.sections[section_id], score) for score, section_id in best]
+        return ranked
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Section Similarity
+Cosine similarity between the TF-IDF vectors of every pair of sections from
+different standards, computed in row chunks so memory stays bounded, keeping
+only each section's top-k neighbours per standard
+
+Run after the extractor: python section_similarity.py [--top-k 5] [--chunk-mb 64]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not found. Install with: pip install numpy")
+    sys.exit(1)
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+import content_format
+from content_spans import section_text
+from keyword_ranker import TermMatrix, find_content_dir
+from section_index import standard_name
+
+ENGINES = ["auto", "scipy", "numpy"]
+
+class SparseRows:
+    """Rows of L2-normalized TF-IDF weights in CSR form (indptr, term indices, weights)"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_terms: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_terms = n_terms
+
+    @classmethod
+    def from_term_matrix(cls, matrix: TermMatrix) -> "SparseRows":
+        # TermMatrix entries are already sorted by section, then term
+        indptr = np.searchsorted(matrix.doc, np.arange(matrix.n_docs + 1))
+        return cls(indptr, matrix.term, matrix.tfidf().astype(np.float32), matrix.n_terms)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def slice(self, start: int, end: int) -> "SparseRows":
+        first, last = self.indptr[start], self.indptr[end]
+        return SparseRows(self.indptr[start:end + 1] - first, self.indices[first:last], self.data[first:last],
+                          self.n_terms)
+
+    def dense(self) -> np.ndarray:
+        rows = np.zeros((self.n_rows, self.n_terms), dtype=np.float32)
+        row_ids = np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+        rows[row_ids, self.indices] = self.data
+        return rows
+
+    def to_scipy(self):
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=(self.n_rows, self.n_terms))
+
+def resolve_engine(engine: str = "auto") -> str:
+    if engine == "auto":
+        return "scipy" if sparse is not None else "numpy"
+    if engine == "scipy" and sparse is None:
+        raise ImportError("scipy not found. Install with: pip install scipy (or use --engine numpy)")
+    return engine
+
+class ChunkedCosine:
+    """Dense (chunk x right rows) similarity blocks of left against right.
+
+    The scipy engine multiplies sparse matrices. The NumPy engine densifies
+    a chunk of left rows and gathers the weights at right's nonzero terms,
+    summing them per right row with reduceat. Either way a chunk's rows are
+    sized so its working arrays fit in chunk_bytes.
+    """
+
+    def __init__(self, right: SparseRows, engine: str = "auto", chunk_bytes: int = 64 * 1024 * 1024):
+        self.right = right
+        self.engine = resolve_engine(engine)
+        self.chunk_bytes = chunk_bytes
+        if self.engine == "scipy":
+            self._right_t = right.to_scipy().T.tocsr()
+            # The sparse product (value and column per score) plus its dense copy
+            row_bytes = 12 * right.n_rows
+        else:
+            lengths = np.diff(right.indptr)
+            self._nonempty = np.flatnonzero(lengths)
+            self._starts = right.indptr[:-1][self._nonempty]
+            row_bytes = 4 * (right.n_terms + len(right.data) + right.n_rows)
+        self.chunk_rows = max(1, chunk_bytes // max(row_bytes, 1))
+
+    def blocks(self, left: SparseRows):
+        """(start row, scores) for consecutive chunks of left's rows"""
+        for start in range(0, left.n_rows, self.chunk_rows):
+            chunk = left.slice(start, min(left.n_rows, start + self.chunk_rows))
+            if self.engine == "scipy":
+                scores = (chunk.to_scipy() @ self._right_t).toarray()
+            else:
+                scores = np.zeros((chunk.n_rows, self.right.n_rows), dtype=np.float32)
+                if len(self._nonempty):
+                    products = chunk.dense()[:, self.right.indices] * self.right.data
+                    scores[:, self._nonempty] = np.add.reduceat(products, self._starts, axis=1)
+            yield start, scores
+
+def top_k(scores: np.ndarray, k: int, min_similarity: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, the k best (column, score), best first and lower columns first on ties.
+
+    Columns scoring zero or below min_similarity come back as -1.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=np.float32)
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    # argpartition picks arbitrarily among scores tied with the k-th; such
+    # rows (rare: duplicated sections) are redone with a stable sort unless
+    # the tied scores are dropped anyway
+    kth = np.take_along_axis(scores, columns, axis=1).min(axis=1)
+    kept = (kth > 0) & (kth >= min_similarity)
+    for row in np.flatnonzero(kept & ((scores >= kth[:, None]).sum(axis=1) > k)):
+        columns[row] = np.argsort(-scores[row], kind='stable')[:k]
+    columns = np.sort(columns, axis=1)
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    columns = np.take_along_axis(columns, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    weak = (values <= 0) | (values < min_similarity)
+    columns[weak] = -1
+    return columns, values
+
+def section_texts(all_content: List[Dict[str, Any]]) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Heading plus text of every section, and each standard's [start, end) rows"""
+    texts = []
+    ranges = []
+    for content in all_content:
+        start = len(texts)
+        for section in content.get('sections', []):
+            texts.append(f"{section.get('heading', '')} {section_text(content, section)}")
+        ranges.append((start, len(texts)))
+    return texts, ranges
+
+def compute_similarity(all_content: List[Dict[str, Any]], k: int = 5, min_similarity: float = 0.05,
+                       engine: str = "auto", chunk_bytes: int = 64 * 1024 * 1024) -> Dict[str, Any]:
+    """Top-k cross-standard neighbours of every section (see main for the file layout)"""
+    texts, ranges = section_texts(all_content)
+    matrix = TermMatrix(texts)
+    rows = SparseRows.from_term_matrix(matrix)
+    names = [standard_name(content) for content in all_content]
+
+    standards = {}
+    for content, name in zip(all_content, names):
+        standards[name] = [
+            {"section": section_id, "heading": section.get('heading', ''), "page": section.get('page_start', 1),
+             "neighbours": {}}
+            for section_id, section in enumerate(content.get('sections', []))
+        ]
+
+    used_engine = resolve_engine(engine)
+    for right_id, (right_start, right_end) in enumerate(ranges):
+        cosine = ChunkedCosine(rows.slice(right_start, right_end), used_engine, chunk_bytes)
+        for left_id, (left_start, left_end) in enumerate(ranges):
+            if left_id == right_id:
+                continue
+            entries = standards[names[left_id]]
+            for start, scores in cosine.blocks(rows.slice(left_start, left_end)):
+                columns, values = top_k(scores, k, min_similarity)
+                for offset, (row_columns, row_values) in enumerate(zip(columns.tolist(), values.tolist())):
+                    entries[start + offset]["neighbours"][names[right_id]] = [
+                        [column, round(value, 4)] for column, value in zip(row_columns, row_values) if column >= 0
+                    ]
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "top_k": k,
+        "min_similarity": min_similarity,
+        "engine": used_engine,
+        "terms": matrix.n_terms,
+        "standards": standards
+    }
+
+def neighbours_by_section(similarity: Dict[str, Any], all_content: List[Dict[str, Any]]) -> Dict[Tuple[str, int], Dict[str, List[Tuple[Dict[str, Any], float]]]]:
+    """(standard, section index) -> {other standard: [(section, cosine)]}, best first.
+
+    Standards whose headings no longer match the loaded content (they were
+    re-extracted after section_similarity.py ran) are left out on both sides.
+    """
+    current = {}
+    for content in all_content:
+        sections = content.get('sections', [])
+        entries = similarity.get('standards', {}).get(standard_name(content))
+        if entries is not None and [entry['heading'] for entry in entries] == \
+                [section.get('heading', '') for section in sections]:
+            current[standard_name(content)] = (sections, entries)
+
+    lookup = {}
+    for name, (sections, entries) in current.items():
+        for entry in entries:
+            lookup[(name, entry['section'])] = {
+                other: [(current[other][0][section_id], score) for section_id, score in matches]
+                for other, matches in entry['neighbours'].items() if other in current
+            }
+    return lookup
+
+def main(argv=None):
+    """Write the top-k cross-standard neighbours of every section"""
+    parser = argparse.ArgumentParser(description="Cross-standard section similarity (TF-IDF cosine)")
+    parser.add_argument("--content-dir", default=None, help="Directory with *_content files")
+    parser.add_argument("--output", default=None, help="Neighbours JSON (default: assets/section_similarity.json)")
+    parser.add_argument("--top-k", type=int, default=5, help="Neighbours kept per section and standard")
+    parser.add_argument("--min-similarity", type=float, default=0.05, help="Lowest cosine similarity kept")
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="Sparse products with scipy, or NumPy only (default: scipy when installed)")
+    parser.add_argument("--chunk-mb", type=float, default=64, help="Memory for one chunk of similarity scores")
+    args = parser.parse_args(argv)
+
+    print("🧮 Section Similarity")
+    print("=" * 40)
+
+    content_dir = Path(args.content_dir) if args.content_dir else find_content_dir()
+    content_files = content_format.find_content_files(content_dir)
+    if len(content_files) < 2:
+        print(f"Error: Need at least 2 content files in {content_dir}. Run the extractor first.")
+        return 1
+    all_content = [content_format.load(file_path) for file_path in content_files]
+
+    started = time.perf_counter()
+    try:
+        similarity = compute_similarity(all_content, args.top_k, args.min_similarity, args.engine,
+                                        int(args.chunk_mb * 1024 * 1024))
+    except ImportError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    sections = sum(len(entries) for entries in similarity['standards'].values())
+    print(f"✓ Compared {sections} sections over {similarity['terms']} terms ({similarity['engine']}) "
+          f"in {elapsed:.2f}s")
+
+    output_file = Path(args.output) if args.output else content_dir.parent / "section_similarity.json"
+    content_format.dump(similarity, output_file, "json")
+    print(f"✓ Saved to: {output_file}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
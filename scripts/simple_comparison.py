@@ -4,11 +4,21 @@ Simple AI Comparison Generator
 A more robust version with better error handling
 """
 
-import json
-import os
+import argparse
+import sys
 import time
 from pathlib import Path
 
+import content_format
+from content_spans import materialize
+from instrumentation import configure
+from llm_generation import GenerationStats, create_backend, extract_json, run_prompts
+from near_duplicates import pairs_by_section
+from page_store import open_page_store
+from response_cache import DEFAULT_CACHE_DIR, CachedBackend, ResponseCache
+from section_index import SectionIndex, standard_name
+from section_similarity import neighbours_by_section
+
 def load_content_files():
     """Load all extracted content files"""
     content_dir = Path("assets/extracted_content")
@@ -16,7 +26,7 @@ def load_content_files():
         print("Error: No extracted content found. Run simple_extractor.py first.")
         return []
     
-    content_files = list(content_dir.glob("*_content.json"))
+    content_files = content_format.find_content_files(content_dir)
     if not content_files:
         print("Error: No content files found. Run simple_extractor.py first.")
         return []
@@ -24,15 +34,117 @@ def load_content_files():
     all_content = []
     for file_path in content_files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-                all_content.append(content)
-                print(f"✓ Loaded: {file_path.name}")
+            content = content_format.load(file_path)
+            # Sections written with --content-spans are resolved to text here
+            all_content.append(materialize(content))
+            print(f"✓ Loaded: {file_path.name}")
         except Exception as e:
             print(f"✗ Error loading {file_path.name}: {e}")
     
     return all_content
 
+def load_near_duplicates(all_content, path=Path("assets/near_duplicates.json")):
+    """Near-duplicate pairs by (standard, section index), or None if near_duplicates.py has not run"""
+    if not path.exists():
+        return None
+    try:
+        duplicates = content_format.load(path)
+    except Exception as e:
+        print(f"✗ Error loading {path.name}: {e}")
+        return None
+    lookup = pairs_by_section(duplicates, all_content)
+    print(f"✓ Loaded: {path.name} ({len(duplicates.get('pairs', []))} near-duplicate pairs)")
+    return lookup
+
+def load_section_similarity(all_content, path=Path("assets/section_similarity.json")):
+    """Cross-standard neighbours by (standard, section index), or None if section_similarity.py has not run"""
+    if not path.exists():
+        return None
+    try:
+        similarity = content_format.load(path)
+    except Exception as e:
+        print(f"✗ Error loading {path.name}: {e}")
+        return None
+    lookup = neighbours_by_section(similarity, all_content)
+    print(f"✓ Loaded: {path.name} (top {similarity.get('top_k')} neighbours for {len(lookup)} sections)")
+    return lookup
+
+def load_page_store(content_dir=Path("assets/extracted_content")):
+    """Memory-mapped section text for previews, or None if page_store.py has not run since the last extraction"""
+    store = open_page_store(content_dir, content_format.find_content_files(content_dir))
+    if store is not None:
+        print(f"✓ Loaded: page store ({len(store.documents)} documents, memory-mapped)")
+    return store
+
+def counterparts(neighbours):
+    """The closest section in each other standard"""
+    return [{
+        'standard': other,
+        'heading': matches[0][0].get('heading', ''),
+        'page': matches[0][0].get('page_start', 1),
+        'similarity': matches[0][1]
+    } for other, matches in sorted(neighbours.items()) if matches]
+
+def difference_evidence(ranked, similarity, section_keys, limit=3, threshold=0.1):
+    """Referenced sections without a close counterpart in another referenced standard, least similar first"""
+    gaps = []
+    for standard, matches in ranked.items():
+        for section, _ in matches:
+            neighbours = similarity.get(section_keys.get(id(section)))
+            if neighbours is None:
+                continue
+            for other in ranked:
+                if other == standard:
+                    continue
+                best = neighbours.get(other, [])
+                score = best[0][1] if best else 0.0
+                if score < threshold:
+                    closest = f"best cosine similarity {score:.2f}" if best else "no shared terms above the cutoff"
+                    gaps.append((score, f"{standard} \"{section.get('heading', '')}\" "
+                                        f"(p. {section.get('page_start', 1)}) has no close counterpart in "
+                                        f"{other} ({closest})"))
+    gaps.sort(key=lambda gap: gap[0])
+    return [text for _, text in gaps[:limit]]
+
+def similarity_evidence(ranked, duplicates, section_keys, limit=3):
+    """Near-duplicate pairs involving a topic's top sections, as similarities"""
+    pairs = []
+    for matches in ranked.values():
+        for section, _ in matches:
+            for pair in duplicates.get(section_keys.get(id(section)), []):
+                if pair not in pairs:
+                    pairs.append(pair)
+    pairs.sort(key=lambda pair: -pair['similarity'])
+    return [
+        f"{pair['a']['standard']} \"{pair['a']['heading']}\" (p. {pair['a']['page']}) and "
+        f"{pair['b']['standard']} \"{pair['b']['heading']}\" (p. {pair['b']['page']}) largely overlap "
+        f"(estimated Jaccard similarity {pair['similarity']:.2f})"
+        for pair in pairs[:limit]
+    ]
+
+def counterpart_evidence(ranked, similarity, section_keys, limit=3, threshold=0.3):
+    """Referenced sections with a close counterpart among another standard's referenced sections, most similar first"""
+    pairs = {}
+    for standard, matches in ranked.items():
+        for section, _ in matches:
+            neighbours = similarity.get(section_keys.get(id(section)), {})
+            for other, other_matches in ranked.items():
+                if other == standard:
+                    continue
+                referenced = {id(match) for match, _ in other_matches}
+                for counterpart, score in neighbours.get(other, []):
+                    if score >= threshold and id(counterpart) in referenced:
+                        key = frozenset((id(section), id(counterpart)))
+                        if key not in pairs:
+                            pairs[key] = (score, standard, section, other, counterpart)
+    ranked_pairs = sorted(pairs.values(), key=lambda pair: -pair[0])
+    return [
+        f"{standard} \"{section.get('heading', '')}\" (p. {section.get('page_start', 1)}) and "
+        f"{other} \"{counterpart.get('heading', '')}\" (p. {counterpart.get('page_start', 1)}) cover "
+        f"similar ground (cosine similarity {score:.2f})"
+        for score, standard, section, other, counterpart in ranked_pairs[:limit]
+    ]
+
 def generate_simple_topics(all_content):
     """Generate topics without AI (fallback)"""
     print("Generating topics from content...")
@@ -65,27 +177,21 @@ def generate_simple_topics(all_content):
     
     return topics
 
-def generate_with_ai(all_content):
-    """Generate comparisons using AI"""
-    try:
-        import google.generativeai as genai
-        
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            print("Warning: GEMINI_API_KEY not set. Using simple topic generation.")
-            return generate_simple_topics(all_content)
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Create a simple prompt
-        headings_text = ""
-        for content in all_content:
-            headings_text += f"\n{content['file_name']}:\n"
-            for heading in content.get('headings', [])[:10]:  # Limit to avoid token limits
-                headings_text += f"  - {heading['text']}\n"
-        
-        prompt = f"""
+def select_headings(content, limit):
+    """Up to `limit` headings of a standard, top-level ones first, in document order"""
+    headings = content.get('headings', [])
+    ranked = sorted(range(len(headings)), key=lambda i: (headings[i].get('level', 1), i))[:limit]
+    return [headings[i] for i in sorted(ranked)]
+
+def topics_prompt(all_content, headings_per_standard=25):
+    """Prompt asking for common topics across the standards' headings"""
+    headings_text = ""
+    for content in all_content:
+        headings_text += f"\n{content['file_name']}:\n"
+        for heading in select_headings(content, headings_per_standard):  # Limit to avoid token limits
+            headings_text += f"  - {heading['text']}\n"
+    
+    return f"""
         Analyze these document headings and identify 5 common topics for comparison:
         
         {headings_text}
@@ -99,33 +205,103 @@ def generate_with_ai(all_content):
           }}
         ]
         """
-        
-        print("Generating topics with AI...")
-        response = model.generate_content(prompt)
-        
-        # Try to extract JSON from response
-        response_text = response.text
-        start_idx = response_text.find('[')
-        end_idx = response_text.rfind(']') + 1
-        
-        if start_idx != -1 and end_idx != -1:
-            json_str = response_text[start_idx:end_idx]
-            topics = json.loads(json_str)
-            print(f"✓ Generated {len(topics)} topics with AI")
-            return topics
-        else:
-            print("Could not parse AI response, using simple generation")
-            return generate_simple_topics(all_content)
-            
-    except ImportError:
-        print("google-generativeai not installed. Using simple topic generation.")
+
+def comparison_prompt(topic_data):
+    """Prompt asking how the referenced sections of each standard treat one topic"""
+    lines = ["COMPARISON", f"Topic: {topic_data['title']}", f"Description: {topic_data['description']}", ""]
+    for standard_name, reference in topic_data['references'].items():
+        lines.append(f"Standard: {standard_name}")
+        for section in reference['sections']:
+            lines.append(f"  - {section['heading']} (p. {section['page']}): {section['content_preview']}")
+    lines.append("""
+Compare how these standards treat the topic. Return a JSON object with this structure:
+{
+  "summary": "One paragraph",
+  "similarities": ["..."],
+  "differences": ["..."],
+  "recommendations": "Practical guidance"
+}""")
+    return "\n".join(lines)
+
+def generate_with_ai(all_content, backend=None, headings_per_standard=25, options=None):
+    """Generate topics using AI (falls back to keyword topics without a backend)"""
+    if backend is None:
+        print("Using simple topic generation.")
         return generate_simple_topics(all_content)
-    except Exception as e:
-        print(f"AI generation failed: {e}. Using simple topic generation.")
+    
+    print(f"Generating topics with AI ({backend.name})...")
+    response = run_prompts(backend, [topics_prompt(all_content, headings_per_standard)], **(options or {}))[0]
+    if isinstance(response, Exception):
+        print(f"AI generation failed: {response}. Using simple topic generation.")
         return generate_simple_topics(all_content)
+    
+    try:
+        topics = extract_json(response, '[', ']')
+    except ValueError:
+        print("Could not parse AI response, using simple generation")
+        return generate_simple_topics(all_content)
+    print(f"✓ Generated {len(topics)} topics with AI")
+    return topics
+
+def generate_comparisons(comparison_data, backend, options=None):
+    """Fill each topic's ai_comparison with one concurrent request per topic.
+    
+    Topics whose request fails or cannot be parsed keep the placeholder text.
+    """
+    topics = comparison_data['topics']
+    if backend is None or not topics:
+        return None
+    
+    print(f"Generating {len(topics)} comparisons with AI ({backend.name})...")
+    stats = GenerationStats()
+    responses = run_prompts(backend, [comparison_prompt(topic) for topic in topics], stats=stats,
+                            **(options or {}))
+    unparsed = 0
+    for topic_data, response in zip(topics, responses):
+        if isinstance(response, Exception):
+            continue
+        try:
+            comparison = extract_json(response, '{', '}')
+        except ValueError:
+            unparsed += 1
+            continue
+        for key in ('summary', 'similarities', 'differences', 'recommendations'):
+            if key in comparison:
+                topic_data['ai_comparison'][key] = comparison[key]
+    
+    print(f"✓ {len(topics) - stats.failures - unparsed}/{len(topics)} comparisons in {stats.elapsed:.2f}s "
+          f"({stats.requests} requests, {stats.retries} retries)")
+    return stats
+
+def content_preview(section, section_keys, pages=None, length=200):
+    """First characters of a section's text, from the page store when there is one"""
+    preview = pages.preview(*section_keys[id(section)], length) if pages is not None else None
+    if preview is None:
+        preview = section.get('content', '')[:length]
+    return preview + "..."
 
-def create_comparison_data(topics, all_content):
-    """Create the final comparison data structure"""
+def create_comparison_data(topics, all_content, index=None, duplicates=None, similarity=None, pages=None):
+    """Create the final comparison data structure
+    
+    Sections are ranked per standard with BM25 over a SectionIndex built once
+    for all topics (pass one in to reuse it). With near-duplicate pairs (see
+    load_near_duplicates) the similarities list the pairs that involve the
+    referenced sections instead of a placeholder. With section similarity
+    (see load_section_similarity) each referenced section lists its closest
+    counterparts, and the differences list referenced sections that have none.
+    Topics without near-duplicate pairs list referenced sections that are
+    close counterparts instead, and keep the placeholder when there are none.
+    With a PageStore (see load_page_store) previews are sliced from its
+    memory-mapped text.
+    """
+    if index is None:
+        index = SectionIndex(all_content)
+    section_keys = {
+        id(section): (standard_name(content), section_id)
+        for content in all_content
+        for section_id, section in enumerate(content.get('sections', []))
+    }
+    
     comparison_data = {
         'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
         'standards': [content['file_name'].replace('.pdf', '') for content in all_content],
@@ -147,32 +323,31 @@ def create_comparison_data(topics, all_content):
             }
         }
         
-        # Find relevant sections in each standard
-        for content in all_content:
-            standard_name = content['file_name'].replace('.pdf', '')
-            relevant_sections = []
-            
-            # Simple relevance matching
-            for section in content.get('sections', []):
-                section_text = (section.get('heading', '') + ' ' + 
-                              ' '.join(section.get('keywords', []))).lower()
-                
-                # Check if any topic keywords appear in section
-                for keyword in topic.get('keywords', []):
-                    if keyword.lower() in section_text:
-                        relevant_sections.append({
-                            'heading': section.get('heading', ''),
-                            'page': section.get('page_start', 1),
-                            'content_preview': section.get('content', '')[:200] + "...",
-                            'relevance_score': 1.0
-                        })
-                        break
+        # Find the most relevant sections in each standard
+        ranked = index.top_sections(topic.get('keywords', []), per_standard=3)
+        evidence = similarity_evidence(ranked, duplicates, section_keys) if duplicates is not None else []
+        if not evidence and similarity is not None:
+            evidence = counterpart_evidence(ranked, similarity, section_keys)
+        # Topics without any evidence keep the placeholder
+        if evidence:
+            topic_data['ai_comparison']['similarities'] = evidence
+        if similarity is not None:
+            topic_data['ai_comparison']['differences'] = difference_evidence(ranked, similarity, section_keys)
+        for standard, matches in ranked.items():
+            relevant_sections = [{
+                'heading': section.get('heading', ''),
+                'page': section.get('page_start', 1),
+                'content_preview': content_preview(section, section_keys, pages),
+                'relevance_score': round(score, 4)
+            } for section, score in matches]
+            if similarity is not None:
+                for entry, (section, _) in zip(relevant_sections, matches):
+                    entry['counterparts'] = counterparts(similarity.get(section_keys.get(id(section)), {}))
             
-            if relevant_sections:
-                topic_data['references'][standard_name] = {
-                    'sections': relevant_sections[:3],  # Top 3 sections
-                    'pages': [s['page'] for s in relevant_sections[:3]]
-                }
+            topic_data['references'][standard] = {
+                'sections': relevant_sections,  # Top 3 sections
+                'pages': [s['page'] for s in relevant_sections]
+            }
         
         # Only add topics that have references in multiple standards
         if len(topic_data['references']) >= 2:
@@ -180,33 +355,143 @@ def create_comparison_data(topics, all_content):
     
     return comparison_data
 
-def main():
+def merge_comparisons(previous, comparison_data, changed_standards):
+    """Reuse previous topic entries that reference none of changed_standards
+    
+    Replaces comparison_data's topics with the merged list and returns the
+    recomputed topics, which still need an AI comparison.
+    """
+    previous_topics = {topic['id']: topic for topic in previous.get('topics', [])}
+    merged = []
+    recomputed = []
+    for topic_data in comparison_data['topics']:
+        old = previous_topics.get(topic_data['id'])
+        standards = set(topic_data['references']) | set(old['references'] if old else [])
+        if old is None or standards & set(changed_standards):
+            merged.append(topic_data)
+            recomputed.append(topic_data)
+        else:
+            merged.append(old)
+    comparison_data['topics'] = merged
+    return recomputed
+
+def main(argv=None):
     """Main function"""
+    parser = argparse.ArgumentParser(description="Generate cross-standard comparisons")
+    parser.add_argument("--format", choices=content_format.FORMATS, default="json",
+                        help="Encoding of the comparisons file: json (default), json.gz or msgpack")
+    parser.add_argument("--backend", choices=["gemini", "stub", "none"], default="gemini",
+                        help="Generation backend: Gemini, the offline stub, or none (keyword topics only)")
+    parser.add_argument("--model", default="gemini-pro", help="Gemini model name")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests per second (0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, default=3, help="Retries per request with exponential backoff")
+    parser.add_argument("--headings-per-standard", type=int, default=25,
+                        help="Headings per standard sent in the topic prompt")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Simulated seconds per stub request")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Prompt-response cache directory")
+    parser.add_argument("--cache-max-age", type=float, default=30, help="Days before a cached response expires")
+    parser.add_argument("--cache-max-mb", type=float, default=50, help="Cache size limit in MB (LRU eviction)")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Bypass cached responses (new responses are still stored)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the response cache")
+    parser.add_argument("--update", action="append", metavar="STANDARD",
+                        help="Keep the existing topics and only recompute those referencing this standard "
+                             "(repeatable, e.g. --update pmbok7)")
+    parser.add_argument("--near-duplicates", default="assets/near_duplicates.json",
+                        help="Section pairs from near_duplicates.py used as similarity evidence (if present)")
+    parser.add_argument("--section-similarity", default="assets/section_similarity.json",
+                        help="Neighbours from section_similarity.py used for counterparts and differences (if present)")
+    parser.add_argument("--page-store", default="assets/extracted_content",
+                        help="Directory of page_store.py's memory-mapped text, used for previews (if current)")
+    parser.add_argument("--metrics", default="assets/metrics/simple_comparison.json",
+                        help="Stage timings, counters and LLM latencies JSON")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also collect cProfile and tracemalloc data per stage")
+    args = parser.parse_args(argv)
+    if args.max_retries < 0:
+        parser.error("--max-retries must be 0 or more")
+    if args.rate < 0:
+        parser.error("--rate must be 0 (unlimited) or more")
+    options = {"concurrency": args.concurrency, "rate": args.rate or None, "max_retries": args.max_retries}
+    
     print("🤖 Simple AI Comparison Generator")
     print("=" * 40)
+    report_path = Path(args.metrics)
+    recorder = configure(report_path.parent / "profiles" / "simple_comparison" if args.profile else None)
     
     # Load content files
-    all_content = load_content_files()
+    with recorder.stage("load"):
+        all_content = load_content_files()
     if len(all_content) < 2:
         print("Error: Need at least 2 content files for comparison")
-        return
+        return 1
+    duplicates = load_near_duplicates(all_content, Path(args.near_duplicates))
+    similarity = load_section_similarity(all_content, Path(args.section_similarity))
+    pages = load_page_store(Path(args.page_store))
     
     # Generate topics
-    topics = generate_with_ai(all_content)
+    backend = create_backend(args.backend, args.model, args.stub_latency, args.concurrency)
+    cache = None
+    if args.backend != "none" and not args.no_cache:
+        # Without a usable API, answers cached by earlier runs are still served
+        cache = ResponseCache(args.cache_dir, args.cache_max_age * 24 * 3600, int(args.cache_max_mb * 1024 * 1024))
+        backend = CachedBackend(backend, cache, args.backend, args.model, bypass=args.refresh_cache)
+    output_file = Path("assets") / content_format.output_name("ai_comparisons", args.format)
+    previous = None
+    if args.update:
+        if output_file.exists():
+            previous = content_format.load(output_file)
+        else:
+            print(f"No existing {output_file}, generating every comparison")
+    
+    if previous is not None:
+        topics = previous['topics']
+        print(f"Updating topics that reference: {', '.join(args.update)}")
+    else:
+        with recorder.stage("topics"):
+            topics = generate_with_ai(all_content, backend, args.headings_per_standard, options)
     if not topics:
         print("Error: Could not generate topics")
-        return
+        return 1
     
     # Create comparison data
-    comparison_data = create_comparison_data(topics, all_content)
+    with recorder.stage("index"):
+        index = SectionIndex(all_content)
+    with recorder.stage("match"):
+        comparison_data = create_comparison_data(topics, all_content, index, duplicates, similarity, pages)
+    if pages is not None:
+        pages.close()
+    pending = comparison_data
+    if previous is not None:
+        recomputed = merge_comparisons(previous, comparison_data, args.update)
+        print(f"✓ Recomputing {len(recomputed)} of {len(comparison_data['topics'])} topics")
+        pending = {'topics': recomputed}
+    with recorder.stage("comparisons"):
+        generate_comparisons(pending, backend, options)
     
     # Save results
-    output_file = Path("assets/ai_comparisons.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(comparison_data, f, indent=2, ensure_ascii=False)
+    with recorder.stage("save"):
+        content_format.dump(comparison_data, output_file, args.format)
+    recorder.count("topics", len(comparison_data['topics']))
+    recorder.count("sections_indexed", len(index.sections))
+    recorder.count("bytes_written", output_file.stat().st_size)
     
     print(f"✅ Generated {len(comparison_data['topics'])} comparisons")
     print(f"✅ Saved to: {output_file}")
+    
+    if cache:
+        cache.prune()
+        stats = cache.stats()
+        print(f"💾 Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['stale_hits']} stale, {stats['stores']} stored, {stats['evictions']} evicted")
+        for name, value in stats.items():
+            recorder.count(f"cache_{name}", value)
+    
+    recorder.write(report_path, {"script": "simple_comparison", "backend": backend.name if backend else "none"})
+    recorder.print_summary()
+    print(f"📊 Metrics saved to: {report_path}")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -4,44 +4,38 @@ Simple PDF Content Extractor
 A more robust version with better error handling
 """
 
-import json
+import argparse
 import os
 import re
+import sys
 from pathlib import Path
 
+from content_format import FORMATS, output_name
+from content_writer import ContentCollector, StreamingContentWriter, dump_content
+from extraction_cache import ExtractionCache
+from instrumentation import configure, metrics
+from pdf_pages import BACKENDS, get_backend, iter_pages
+
+# Bump when a change to the extraction logic alters the output
+EXTRACTOR_VERSION = "1.0"
+
+# Simple heading patterns (a short line that is upper case also counts)
+HEADING_PATTERNS = [
+    r'^\d+\.',
+    r'^[A-Z][a-z]+.*:$'
+]
+
 def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using available library"""
+    """Extract text from PDF using available library
+    
+    Holds every page in memory; process_pdf reads pages one at a time instead.
+    """
     try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(pdf_path)
-        full_text = {}
-        total_pages = len(doc)  # Get page count before closing
-        
-        for page_num in range(total_pages):
-            page = doc[page_num]
-            text = page.get_text()
-            full_text[page_num + 1] = text
-        
-        doc.close()
-        return full_text, total_pages
-        
-    except ImportError:
-        print("PyMuPDF not available, trying PyPDF2...")
-        try:
-            import PyPDF2
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                full_text = {}
-                
-                for page_num in range(len(reader.pages)):
-                    page = reader.pages[page_num]
-                    text = page.extract_text()
-                    full_text[page_num + 1] = text
-                
-                return full_text, len(reader.pages)
-        except ImportError:
-            print("No PDF library available. Please install PyMuPDF or PyPDF2")
-            return None, 0
+        full_text = dict(iter_pages(pdf_path))
+        return full_text, len(full_text)
+    except ImportError as e:
+        print(e)
+        return None, 0
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
         return None, 0
@@ -59,8 +53,7 @@ def find_headings(text):
         # Simple heading patterns
         if (len(line) < 100 and 
             (line.isupper() or 
-             re.match(r'^\d+\.', line) or 
-             re.match(r'^[A-Z][a-z]+.*:$', line))):
+             any(re.match(pattern, line) for pattern in HEADING_PATTERNS))):
             headings.append({
                 'text': line,
                 'line_number': line_num
@@ -85,56 +78,120 @@ def extract_keywords(text):
     keywords = [word for word in set(words) if word not in stop_words and len(word) > 3]
     return sorted(keywords)[:15]  # Top 15 keywords
 
-def process_pdf(pdf_path):
-    """Process a single PDF file"""
-    print(f"Processing: {os.path.basename(pdf_path)}")
+def output_fields(content_spans=False):
+    """Extra top-level fields describing the output format"""
+    return {'content_spans_mode': 'raw'} if content_spans else {}
+
+def page_sections(page_num, text, content_spans=False):
+    """Headings and sections found on one page"""
+    recorder = metrics()
+    if not text.strip():
+        return [], []
     
-    # Extract text
-    full_text, total_pages = extract_text_from_pdf(pdf_path)
-    if not full_text:
-        return None
+    # Find headings on this page
+    with recorder.stage("headings"):
+        headings = find_headings(text)
+    recorder.count("lines_classified", text.count('\n') + 1)
+    recorder.count("headings", len(headings))
     
-    # Process each page
+    with recorder.stage("keywords"):
+        keywords = extract_keywords(text)
+    page_headings = []
     sections = []
-    all_headings = []
-    
-    for page_num, text in full_text.items():
-        if not text.strip():
-            continue
-            
-        # Find headings on this page
-        headings = find_headings(text)
+    for heading in headings:
+        page_headings.append({
+            'text': heading['text'],
+            'page': page_num,
+            'level': 1  # Simple level assignment
+        })
         
-        for heading in headings:
-            all_headings.append({
-                'text': heading['text'],
-                'page': page_num,
-                'level': 1  # Simple level assignment
-            })
-            
-            # Create a section for each heading
-            sections.append({
-                'heading': heading['text'],
-                'level': 1,
-                'page_start': page_num,
-                'page_end': page_num,
-                'content': text[:500] + "..." if len(text) > 500 else text,
-                'keywords': extract_keywords(text)
-            })
+        # Create a section for each heading
+        section = {
+            'heading': heading['text'],
+            'level': 1,
+            'page_start': page_num,
+            'page_end': page_num
+        }
+        if content_spans:
+            section['content_spans'] = [[page_num, 0, min(len(text), 500)]]
+            if len(text) > 500:
+                section['content_suffix'] = "..."
+        else:
+            section['content'] = text[:500] + "..." if len(text) > 500 else text
+        section['keywords'] = keywords
+        sections.append(section)
+    return page_headings, sections
+
+def iter_sections(pdf_path, content_spans=False, backend=None):
+    """Sections of a PDF one at a time, reading one page at a time"""
+    for page_num, text in iter_pages(pdf_path, backend=backend):
+        yield from page_sections(page_num, text, content_spans)[1]
+
+def process_pdf(pdf_path, writer=None, content_spans=False, backend=None):
+    """Process a single PDF file
     
-    # Create content structure
-    content = {
-        'file_name': os.path.basename(pdf_path),
-        'total_pages': total_pages,
-        'sections': sections,
-        'full_text_by_page': {str(k): v for k, v in full_text.items()},
-        'headings': all_headings
-    }
+    With a writer (see content_writer.py) pages, headings and sections are
+    handed over as they are produced and True is returned instead of the dict;
+    only one page is held in memory at a time.
+    With content_spans, each section points at its page text instead of
+    carrying its own copy of the first 500 characters. backend is a
+    pdf_pages.PageBackend (the default one when None).
+    """
+    print(f"Processing: {os.path.basename(pdf_path)}")
+    recorder = metrics()
+    
+    collector = None
+    if writer is None:
+        collector = writer = ContentCollector(os.path.basename(pdf_path), 0, output_fields(content_spans))
+    
+    # Process each page as it is read
+    total_pages = 0
+    try:
+        for page_num, text in recorder.timed(iter_pages(pdf_path, backend=backend), "parse"):
+            total_pages += 1
+            writer.write_page(str(page_num), text)
+            headings, sections = page_sections(page_num, text, content_spans)
+            for heading, section in zip(headings, sections):
+                writer.write_heading(heading)
+                writer.write_section(section)
+                recorder.count("sections")
+    except ImportError as e:
+        print(e)
+        return None
+    except Exception as e:
+        print(f"Error reading PDF {pdf_path}: {e}")
+        return None
+    if not total_pages:
+        return None
     
-    return content
+    recorder.count("pages", total_pages)
+    writer.set_total_pages(total_pages)
+    return collector.content if collector else True
 
-def main():
+def main(argv=None):
     """Main processing function"""
+    parser = argparse.ArgumentParser(description="Extract content from PDF standards")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-extract every PDF even if the cache says it is up to date")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write pages, headings and sections to disk while extracting")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write JSON without indentation to reduce file size")
+    parser.add_argument("--content-spans", action="store_true",
+                        help="Store section text as [page, start, end] spans into full_text_by_page")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output encoding: json (default), gzip-compressed json.gz or binary msgpack")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=None,
+                        help="PDF text backend (default: calibrated by `pdf_pages.py calibrate`, else first installed)")
+    parser.add_argument("--metrics", default=None,
+                        help="Stage timings and counters JSON (default: assets/metrics/simple_extractor.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also collect cProfile and tracemalloc data per stage")
+    args = parser.parse_args(argv)
+    if args.stream and args.format == "msgpack":
+        parser.error("--stream writes json or json.gz; use --format json.gz or drop --stream")
+    indent = None if args.compact else 2
+    
     # Check multiple possible PDF directory locations
     possible_paths = [
         Path("assets/pdfs"),
@@ -159,7 +216,7 @@ def main():
         for path in possible_paths:
             print(f"  - {path.absolute()}")
         print("Please add your PDF files to one of these directories")
-        return
+        return 1
     
     # Create output directory relative to where PDFs were found
     if pdf_dir == Path("../assets/pdfs"):
@@ -169,22 +226,67 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
     print(f"Output directory: {output_dir}")
     
+    report_path = Path(args.metrics) if args.metrics else output_dir.parent / "metrics" / "simple_extractor.json"
+    recorder = configure(report_path.parent / "profiles" / "simple_extractor" if args.profile else None)
+    failures = 0
+    
+    try:
+        backend = get_backend(args.backend)
+    except ImportError as e:
+        print(e)
+        return 1
+    print(f"PDF backend: {backend.name}")
+    
+    cache = ExtractionCache(output_dir, "simple_extractor", EXTRACTOR_VERSION, {
+        "backend": backend.name,
+        "heading_patterns": HEADING_PATTERNS,
+        "max_heading_length": 100,
+        "indent": indent,
+        "content_spans": args.content_spans,
+        "format": args.format
+    })
+    
     # Process each PDF
     for pdf_file in pdf_files:
+        output_file = output_dir / output_name(f"{pdf_file.stem}_content", args.format)
+        if not args.force and cache.is_fresh(pdf_file, output_file):
+            print(f"↷ Up to date, skipping: {pdf_file.name}")
+            continue
+        
         try:
-            content = process_pdf(pdf_file)
+            if args.stream:
+                writer = StreamingContentWriter(output_file, pdf_file.name, 0, indent,
+                                                output_fields(args.content_spans), args.format == "json.gz")
+                content = process_pdf(pdf_file, writer, args.content_spans, backend)
+                if content:
+                    writer.close()
+                else:
+                    writer.abort()
+            else:
+                content = process_pdf(pdf_file, content_spans=args.content_spans, backend=backend)
+                if content:
+                    # Save to JSON (or the requested format)
+                    with recorder.stage("serialize"):
+                        dump_content(content, output_file, indent, args.format)
             if content:
-                # Save to JSON
-                output_file = output_dir / f"{pdf_file.stem}_content.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(content, f, indent=2, ensure_ascii=False)
+                cache.record(pdf_file, output_file, output_format=args.format)
+                recorder.count("bytes_written", output_file.stat().st_size)
                 print(f"✓ Saved: {output_file}")
             else:
+                failures += 1
                 print(f"✗ Failed to process: {pdf_file.name}")
         except Exception as e:
+            failures += 1
             print(f"✗ Error processing {pdf_file.name}: {e}")
     
+    recorder.write(report_path, {"script": "simple_extractor", "files": len(pdf_files), "failures": failures})
+    recorder.print_summary()
+    print(f"📊 Metrics saved to: {report_path}")
+    if failures:
+        print(f"\n✗ {failures} of {len(pdf_files)} PDF files failed. Check {output_dir} for the others.")
+        return 1
     print(f"\n✅ Processing complete! Check {output_dir} for results.")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -3,6 +3,7 @@
 Simple setup script for PDF comparison system
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -16,13 +17,32 @@ def check_python_version():
     print(f"✓ Python {sys.version_info.major}.{sys.version_info.minor} detected")
     return True
 
+# pip package -> module it provides
+PACKAGES = {
+    "PyMuPDF": "fitz",
+    "numpy": "numpy",
+    "google-generativeai": "google.generativeai",
+    "pathlib2": "pathlib2"
+}
+
+def missing_packages():
+    """Packages whose module cannot be imported"""
+    missing = []
+    for package, module in PACKAGES.items():
+        try:
+            found = importlib.util.find_spec(module) is not None
+        except ImportError:
+            found = False
+        if not found:
+            missing.append(package)
+    return missing
+
 def install_packages():
-    """Install required packages one by one"""
-    packages = [
-        "PyMuPDF",
-        "google-generativeai",
-        "pathlib2"
-    ]
+    """Install missing packages one by one"""
+    packages = missing_packages()
+    if not packages:
+        print("✓ All packages already installed")
+        return
     
     for package in packages:
         try:
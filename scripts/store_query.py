@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Store Query
+Read-only queries over a content_store.py database: bm25()-ranked full-text
+search with snippet() highlights, and page and section lookups that read only
+the rows they return
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from search_index import normalize_query
+
+def match_expression(text: str, phrase: bool = False, any_terms: bool = False) -> str:
+    """FTS5 MATCH string for free text: every word quoted, so query syntax in text is inert"""
+    words = normalize_query(text)
+    if not words:
+        return ""
+    if phrase:
+        return '"' + " ".join(words) + '"'
+    return (" OR " if any_terms else " ").join(f'"{word}"' for word in words)
+
+class StoreQuery:
+    """Query API over a content database built by content_store.py"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(f"file:{self.path.resolve().as_posix()}?mode=ro", uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def standards(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT standard FROM documents ORDER BY standard")]
+
+    def search(self, query: str, standard: Optional[str] = None, kind: Optional[str] = None, limit: int = 10,
+               phrase: bool = False, any_terms: bool = False, highlight=("[", "]"),
+               snippet_tokens: int = 16) -> List[Dict[str, Any]]:
+        """Best-ranked pages and sections for query (bm25, headings weighted up), best first.
+
+        kind limits results to "page" or "section" rows. Each result carries a
+        snippet of the matching text with the matched words wrapped in
+        highlight. Scores are negated bm25() values, so higher is better.
+        """
+        expression = match_expression(query, phrase, any_terms)
+        if not expression:
+            return []
+        sql = ("SELECT f.kind, f.ref, d.standard, f.heading, s.page_start, s.page_end, f.rank, "
+               "snippet(text_fts, 1, ?, ?, '…', ?) "
+               "FROM text_fts f JOIN documents d ON d.id = f.document_id "
+               "LEFT JOIN sections s ON f.kind = 'section' AND s.document_id = f.document_id AND s.position = f.ref "
+               "WHERE text_fts MATCH ?")
+        params = [highlight[0], highlight[1], snippet_tokens, expression]
+        if standard is not None:
+            sql += " AND d.standard = ?"
+            params.append(standard)
+        if kind is not None:
+            sql += " AND f.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY f.rank LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row_kind, ref, name, heading, page_start, page_end, rank, snippet in self.conn.execute(sql, params):
+            is_section = row_kind == "section"
+            results.append({
+                "kind": row_kind,
+                "standard": name,
+                "section": ref if is_section else None,
+                "heading": heading if is_section else None,
+                "page": page_start if is_section else ref,
+                "page_end": page_end if is_section else ref,
+                "score": round(-rank, 4),
+                "snippet": snippet
+            })
+        return results
+
+    def count(self, query: str, standard: Optional[str] = None, phrase: bool = False,
+              any_terms: bool = False) -> Dict[str, int]:
+        """Number of matching pages and sections"""
+        expression = match_expression(query, phrase, any_terms)
+        counts = {"page": 0, "section": 0}
+        if not expression:
+            return counts
+        sql = ("SELECT f.kind, count(*) FROM text_fts f JOIN documents d ON d.id = f.document_id "
+               "WHERE text_fts MATCH ?")
+        params = [expression]
+        if standard is not None:
+            sql += " AND d.standard = ?"
+            params.append(standard)
+        for row_kind, total in self.conn.execute(sql + " GROUP BY f.kind", params):
+            counts[row_kind] = total
+        return counts
+
+    def page(self, standard: str, page: int) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT p.text FROM pages p JOIN documents d ON d.id = p.document_id WHERE d.standard = ? AND p.page = ?",
+            (standard, page)).fetchone()
+        return row[0] if row else None
+
+    def section(self, standard: str, section: int, preview: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """One section's fields; with preview, only that many leading characters of its content"""
+        content = "s.content" if preview is None else "substr(s.content, 1, ?)"
+        params = ([] if preview is None else [preview]) + [standard, section]
+        row = self.conn.execute(
+            f"SELECT s.heading, s.level, s.page_start, s.page_end, {content}, s.keywords "
+            "FROM sections s JOIN documents d ON d.id = s.document_id WHERE d.standard = ? AND s.position = ?",
+            params).fetchone()
+        if not row:
+            return None
+        heading, level, page_start, page_end, text, keywords = row
+        return {"heading": heading, "level": level, "page_start": page_start, "page_end": page_end,
+                "content": text, "keywords": json.loads(keywords or "[]")}
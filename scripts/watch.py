@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Watch
+Polls assets/pdfs and, once changed PDFs have stopped changing, re-extracts
+them and updates only the comparisons that reference their standards
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from pipeline import (STATE_NAME, PipelineState, default_stages, find_project_dir, run_pipeline,
+                      working_directory)
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+def snapshot(pdf_dir: Path) -> Snapshot:
+    """(size, mtime_ns) of every PDF in pdf_dir"""
+    files = {}
+    for path in pdf_dir.glob("*.pdf"):
+        try:
+            stat = path.stat()
+        except OSError:
+            # Deleted between glob() and stat()
+            continue
+        files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+class ChangeTracker:
+    """Debounces PDF changes seen by successive snapshots.
+
+    A changed or added file is ready once it has looked the same for
+    `debounce` seconds, so a PDF still being copied or saved is not
+    extracted half-written.
+    """
+
+    def __init__(self, initial: Snapshot, debounce: float):
+        self.known = dict(initial)
+        self.debounce = debounce
+        self.pending = {}
+
+    def update(self, current: Snapshot, now: float) -> Tuple[List[Path], List[Path]]:
+        """Record a new snapshot; returns (settled changed files, removed files)"""
+        for path, signature in current.items():
+            if self.known.get(path) != signature:
+                pending = self.pending.get(path)
+                if pending is None or pending[0] != signature:
+                    self.pending[path] = (signature, now)
+        removed = [path for path in self.known if path not in current]
+        for path in removed:
+            del self.known[path]
+            self.pending.pop(path, None)
+
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            if path not in current:
+                del self.pending[path]
+            elif now - since >= self.debounce:
+                ready.append(path)
+                self.known[path] = signature
+                del self.pending[path]
+        return sorted(ready), sorted(removed)
+
+def compare_args(args) -> List[str]:
+    argv = ["--backend", args.backend]
+    if args.stub_latency:
+        argv += ["--stub-latency", str(args.stub_latency)]
+    return argv
+
+def process_changes(changed: List[Path], state: PipelineState, args) -> bool:
+    """Bring extraction, ranking and the index up to date, then update the affected comparisons"""
+    standards = [path.stem for path in changed]
+    update = [argument for name in standards for argument in ("--update", name)]
+    print(f"\n📄 Changed: {', '.join(path.name for path in changed)}")
+    return run_pipeline(default_stages(compare_args(args) + update), state)
+
+def watch(args) -> int:
+    pdf_dir = Path("assets/pdfs")
+    state = PipelineState(Path("assets") / STATE_NAME)
+    print(f"👀 Watching {pdf_dir.resolve()} (every {args.interval:g}s, debounce {args.debounce:g}s)")
+
+    # Catch up on anything that changed while nobody was watching
+    tracker = ChangeTracker(snapshot(pdf_dir), args.debounce)
+    if not run_pipeline(default_stages(compare_args(args)), state):
+        print("⚠️  Initial run failed; waiting for changes")
+
+    while True:
+        time.sleep(args.interval)
+        changed, removed = tracker.update(snapshot(pdf_dir), time.monotonic())
+        for path in removed:
+            print(f"↷ Removed: {path.name} (its extracted content is kept; delete it to drop the standard)")
+        if changed and not process_changes(changed, state, args):
+            print("⚠️  Update failed; it will be retried when the PDF changes again")
+        if changed:
+            print(f"\n👀 Watching {pdf_dir} ...")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-extract and re-compare PDFs as they change")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between scans of assets/pdfs")
+    parser.add_argument("--debounce", type=float, default=5.0,
+                        help="Seconds a changed PDF must stay unchanged before it is processed")
+    parser.add_argument("--backend", choices=["gemini", "stub", "none"], default="gemini",
+                        help="Comparison backend (see simple_comparison.py)")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+    with working_directory(find_project_dir()):
+        try:
+            return watch(args)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+            return 0
+
+if __name__ == "__main__":
+    sys.exit(main())